@@ -1,6 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import argparse
-import tempfile
 
 import cv2
 import mmcv
@@ -9,10 +8,10 @@ import torch
 from mmengine import DictAction
 from mmengine.utils import track_iter_progress
 
-from mmaction.apis import (detection_inference, inference_skeleton,
-                           init_recognizer, pose_inference)
+from mmaction.apis import (batch_detection_inference, batch_pose_inference,
+                           inference_skeleton, init_recognizer)
 from mmaction.registry import VISUALIZERS
-from mmaction.utils import frame_extract
+from mmaction.utils import frame_decode
 
 try:
     import moviepy.editor as mpy
@@ -78,6 +77,12 @@ def parse_args():
         help='label map file')
     parser.add_argument(
         '--device', type=str, default='cuda:0', help='CPU/CUDA device option')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=16,
+        help='number of frames of each batch of human detection and pose '
+        'estimation')
     parser.add_argument(
         '--short-side',
         type=int,
@@ -127,23 +132,29 @@ def visualize(args, frames, data_samples, action_label):
 def main():
     args = parse_args()
 
-    tmp_dir = tempfile.TemporaryDirectory()
-    frame_paths, frames = frame_extract(args.video, args.short_side,
-                                        tmp_dir.name)
+    frames = frame_decode(args.video, args.short_side)
 
     h, w, _ = frames[0].shape
 
     # Get Human detection results.
-    det_results, _ = detection_inference(args.det_config, args.det_checkpoint,
-                                         frame_paths, args.det_score_thr,
-                                         args.det_cat_id, args.device)
+    det_results, _ = batch_detection_inference(
+        args.det_config,
+        args.det_checkpoint,
+        frames,
+        args.det_score_thr,
+        args.det_cat_id,
+        args.device,
+        batch_size=args.batch_size)
     torch.cuda.empty_cache()
 
     # Get Pose estimation results.
-    pose_results, pose_data_samples = pose_inference(args.pose_config,
-                                                     args.pose_checkpoint,
-                                                     frame_paths, det_results,
-                                                     args.device)
+    pose_results, pose_data_samples = batch_pose_inference(
+        args.pose_config,
+        args.pose_checkpoint,
+        frames,
+        det_results,
+        args.device,
+        batch_size=args.batch_size)
     torch.cuda.empty_cache()
 
     config = mmengine.Config.fromfile(args.config)
@@ -158,8 +169,6 @@ def main():
 
     visualize(args, frames, pose_data_samples, action_label)
 
-    tmp_dir.cleanup()
-
 
 if __name__ == '__main__':
     main()
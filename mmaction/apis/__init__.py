@@ -1,9 +1,14 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .inference import (detection_inference, inference_recognizer,
+from .inference import (batch_detection_inference, batch_pose_inference,
+                        detection_inference, inference_recognizer,
                         inference_skeleton, init_recognizer, pose_inference)
 from .inferencers import *  # NOQA
+from .long_video import inference_long_video
+from .realtime import LatencyMeter, RealtimeInferenceRunner
 
 __all__ = [
     'init_recognizer', 'inference_recognizer', 'inference_skeleton',
-    'detection_inference', 'pose_inference'
+    'detection_inference', 'pose_inference', 'inference_long_video',
+    'RealtimeInferenceRunner', 'LatencyMeter', 'batch_detection_inference',
+    'batch_pose_inference'
 ]
@@ -1,8 +1,11 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import os.path as osp
+import queue
+import threading
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import mmcv
 import mmengine
 import numpy as np
 import torch
@@ -11,7 +14,7 @@ from mmengine.dataset import Compose, pseudo_collate
 from mmengine.registry import init_default_scope
 from mmengine.runner import load_checkpoint
 from mmengine.structures import InstanceData
-from mmengine.utils import track_iter_progress
+from mmengine.utils import ProgressBar, track_iter_progress
 
 from mmaction.registry import MODELS
 from mmaction.structures import ActionDataSample
@@ -168,6 +171,42 @@ def inference_skeleton(model: nn.Module,
     return inference_recognizer(model, fake_anno, test_pipeline)
 
 
+def _human_bboxes(det_data_sample, det_score_thr: float, det_cat_id: int,
+                  with_score: bool) -> np.ndarray:
+    """Get the human boxes of a detection result."""
+    pred_instance = det_data_sample.pred_instances.cpu().numpy()
+    bboxes = pred_instance.bboxes
+    scores = pred_instance.scores
+    # We only keep human detection bboxs with score larger
+    # than `det_score_thr` and category id equal to `det_cat_id`.
+    valid_idx = np.logical_and(pred_instance.labels == det_cat_id,
+                               pred_instance.scores > det_score_thr)
+    bboxes = bboxes[valid_idx]
+    scores = scores[valid_idx]
+
+    if with_score:
+        bboxes = np.concatenate((bboxes, scores[:, None]), axis=-1)
+    return bboxes
+
+
+def _merge_pose_samples(model: nn.Module, pose_data_samples: list):
+    """Merge the pose results of the persons of a frame."""
+    from mmpose.structures import merge_data_samples
+
+    pose_data_sample = merge_data_samples(pose_data_samples)
+    pose_data_sample.dataset_meta = model.dataset_meta
+    # make fake pred_instances
+    if not hasattr(pose_data_sample, 'pred_instances'):
+        num_keypoints = model.dataset_meta['num_keypoints']
+        pred_instances_data = dict(
+            keypoints=np.empty(shape=(0, num_keypoints, 2)),
+            keypoints_scores=np.empty(shape=(0, 17), dtype=np.float32),
+            bboxes=np.empty(shape=(0, 4), dtype=np.float32),
+            bbox_scores=np.empty(shape=(0), dtype=np.float32))
+        pose_data_sample.pred_instances = InstanceData(**pred_instances_data)
+    return pose_data_sample
+
+
 def detection_inference(det_config: Union[str, Path, mmengine.Config,
                                           nn.Module],
                         det_checkpoint: str,
@@ -216,19 +255,9 @@ def detection_inference(det_config: Union[str, Path, mmengine.Config,
     print('Performing Human Detection for each frame')
     for frame_path in track_iter_progress(frame_paths):
         det_data_sample: DetDataSample = inference_detector(model, frame_path)
-        pred_instance = det_data_sample.pred_instances.cpu().numpy()
-        bboxes = pred_instance.bboxes
-        scores = pred_instance.scores
-        # We only keep human detection bboxs with score larger
-        # than `det_score_thr` and category id equal to `det_cat_id`.
-        valid_idx = np.logical_and(pred_instance.labels == det_cat_id,
-                                   pred_instance.scores > det_score_thr)
-        bboxes = bboxes[valid_idx]
-        scores = scores[valid_idx]
-
-        if with_score:
-            bboxes = np.concatenate((bboxes, scores[:, None]), axis=-1)
-        results.append(bboxes)
+        results.append(
+            _human_bboxes(det_data_sample, det_score_thr, det_cat_id,
+                          with_score))
         data_samples.append(det_data_sample)
 
     return results, data_samples
@@ -259,7 +288,7 @@ def pose_inference(pose_config: Union[str, Path, mmengine.Config, nn.Module],
     """
     try:
         from mmpose.apis import inference_topdown, init_model
-        from mmpose.structures import PoseDataSample, merge_data_samples
+        from mmpose.structures import PoseDataSample
     except (ImportError, ModuleNotFoundError):
         raise ImportError('Failed to import `inference_topdown` and '
                           '`init_model` from `mmpose.apis`. These apis '
@@ -275,21 +304,247 @@ def pose_inference(pose_config: Union[str, Path, mmengine.Config, nn.Module],
     for f, d in track_iter_progress(list(zip(frame_paths, det_results))):
         pose_data_samples: List[PoseDataSample] \
             = inference_topdown(model, f, d[..., :4], bbox_format='xyxy')
-        pose_data_sample = merge_data_samples(pose_data_samples)
-        pose_data_sample.dataset_meta = model.dataset_meta
-        # make fake pred_instances
-        if not hasattr(pose_data_sample, 'pred_instances'):
-            num_keypoints = model.dataset_meta['num_keypoints']
-            pred_instances_data = dict(
-                keypoints=np.empty(shape=(0, num_keypoints, 2)),
-                keypoints_scores=np.empty(shape=(0, 17), dtype=np.float32),
-                bboxes=np.empty(shape=(0, 4), dtype=np.float32),
-                bbox_scores=np.empty(shape=(0), dtype=np.float32))
-            pose_data_sample.pred_instances = InstanceData(
-                **pred_instances_data)
-
-        poses = pose_data_sample.pred_instances.to_dict()
-        results.append(poses)
+        pose_data_sample = _merge_pose_samples(model, pose_data_samples)
+        results.append(pose_data_sample.pred_instances.to_dict())
         data_samples.append(pose_data_sample)
 
     return results, data_samples
+
+
+def _prefetch_batches(frames: Union[str, Sequence[Union[str, np.ndarray]]],
+                      batch_size: int,
+                      prepare: Callable,
+                      max_frames: Optional[int] = None,
+                      prefetch: int = 2) -> Iterator[tuple]:
+    """Decode the frames and prepare the inputs of each batch in a background
+    thread, overlapping the inference of the previous batches.
+
+    Args:
+        frames (str | Sequence[str | np.ndarray]): The video path, or the
+            frames or their paths.
+        batch_size (int): The number of frames of each batch.
+        prepare (Callable): Get the inputs from the index of the first frame
+            and the frames of a batch.
+        max_frames (int, optional): The number of frames to read at most.
+            Defaults to None.
+        prefetch (int): The number of batches prepared ahead. Defaults to 2.
+
+    Yields:
+        tuple: The frames of a batch and their inputs.
+    """
+    assert batch_size > 0
+    batch_queue = queue.Queue(maxsize=prefetch)
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            if isinstance(frames, str):
+                reader = mmcv.VideoReader(frames)
+            else:
+                reader = frames
+            batch = []
+            start = 0
+            for frame in reader:
+                if stopped.is_set() or (max_frames is not None
+                                        and start + len(batch) >= max_frames):
+                    break
+                if isinstance(frame, str):
+                    frame = mmcv.imread(frame)
+                batch.append(frame)
+                if len(batch) == batch_size:
+                    batch_queue.put((batch, prepare(start, batch)))
+                    start += len(batch)
+                    batch = []
+            if batch and not stopped.is_set():
+                batch_queue.put((batch, prepare(start, batch)))
+        except Exception as e:
+            batch_queue.put(e)
+        finally:
+            batch_queue.put(None)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = batch_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        # unblock the producer waiting for a free slot
+        while thread.is_alive():
+            try:
+                batch_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def batch_detection_inference(
+        det_config: Union[str, Path, mmengine.Config, nn.Module],
+        det_checkpoint: str,
+        frames: Union[str, Sequence[Union[str, np.ndarray]]],
+        det_score_thr: float = 0.9,
+        det_cat_id: int = 0,
+        device: Union[str, torch.device] = 'cuda:0',
+        with_score: bool = False,
+        batch_size: int = 16) -> tuple:
+    """Detect human boxes of the frames in batches.
+
+    The same as :func:`detection_inference`, except that the detector runs
+    on batches of ``batch_size`` frames, and that the frames are decoded and
+    preprocessed in a background thread while the previous batch is
+    detected.
+
+    Args:
+        det_config (Union[str, :obj:`Path`, :obj:`mmengine.Config`,
+            :obj:`torch.nn.Module`]):
+            Det config file path or Detection model object. It can be
+            a :obj:`Path`, a config object, or a module object.
+        det_checkpoint: Checkpoint path/url.
+        frames (str | Sequence[str | np.ndarray]): The video path, or the
+            BGR frames or their paths.
+        det_score_thr (float): The threshold of human detection score.
+            Defaults to 0.9.
+        det_cat_id (int): The category id for human detection. Defaults to 0.
+        device (Union[str, torch.device]): The desired device of returned
+            tensor. Defaults to ``'cuda:0'``.
+        with_score (bool): Whether to append detection score after box.
+            Defaults to None.
+        batch_size (int): The number of frames of each batch.
+            Defaults to 16.
+
+    Returns:
+        List[np.ndarray]: List of detected human boxes.
+        List[:obj:`DetDataSample`]: List of data samples, generally used
+            to visualize data.
+    """
+    try:
+        from mmdet.apis import init_detector
+        from mmdet.utils import get_test_pipeline_cfg
+    except (ImportError, ModuleNotFoundError):
+        raise ImportError('Failed to import `init_detector` from '
+                          '`mmdet.apis`. These apis are required in this '
+                          'inference api! ')
+    if isinstance(det_config, nn.Module):
+        model = det_config
+    else:
+        model = init_detector(
+            config=det_config, checkpoint=det_checkpoint, device=device)
+
+    test_pipeline = get_test_pipeline_cfg(model.cfg.copy())
+    test_pipeline[0].type = 'mmdet.LoadImageFromNDArray'
+    test_pipeline = Compose(test_pipeline)
+
+    def prepare(start, batch):
+        return pseudo_collate([
+            test_pipeline(dict(img=frame, img_id=idx))
+            for idx, frame in enumerate(batch, start)
+        ])
+
+    results = []
+    data_samples = []
+    print('Performing Human Detection for batches of frames')
+    progress_bar = ProgressBar(0 if isinstance(frames, str) else len(frames))
+    for batch, data in _prefetch_batches(frames, batch_size, prepare):
+        with torch.no_grad():
+            det_data_samples = model.test_step(data)
+        for det_data_sample in det_data_samples:
+            results.append(
+                _human_bboxes(det_data_sample, det_score_thr, det_cat_id,
+                              with_score))
+            data_samples.append(det_data_sample)
+        progress_bar.update(len(batch))
+
+    return results, data_samples
+
+
+def batch_pose_inference(
+        pose_config: Union[str, Path, mmengine.Config, nn.Module],
+        pose_checkpoint: str,
+        frames: Union[str, Sequence[Union[str, np.ndarray]]],
+        det_results: List[np.ndarray],
+        device: Union[str, torch.device] = 'cuda:0',
+        batch_size: int = 16) -> tuple:
+    """Perform Top-Down pose estimation in batches.
+
+    The same as :func:`pose_inference`, except that the persons of
+    ``batch_size`` frames are estimated in one forward, and that the frames
+    are decoded and preprocessed in a background thread while the previous
+    batch is estimated.
+
+    Args:
+        pose_config (Union[str, :obj:`Path`, :obj:`mmengine.Config`,
+            :obj:`torch.nn.Module`]): Pose config file path or
+            pose model object. It can be a :obj:`Path`, a config object,
+            or a module object.
+        pose_checkpoint: Checkpoint path/url.
+        frames (str | Sequence[str | np.ndarray]): The video path, or the
+            BGR frames or their paths.
+        det_results (List[np.ndarray]): List of detected human boxes.
+        device (Union[str, torch.device]): The desired device of returned
+            tensor. Defaults to ``'cuda:0'``.
+        batch_size (int): The number of frames of each batch.
+            Defaults to 16.
+
+    Returns:
+        List[List[Dict[str, np.ndarray]]]: List of pose estimation results.
+        List[:obj:`PoseDataSample`]: List of data samples, generally used
+            to visualize data.
+    """
+    try:
+        from mmpose.apis import init_model
+    except (ImportError, ModuleNotFoundError):
+        raise ImportError('Failed to import `init_model` from `mmpose.apis`. '
+                          'These apis are required in this inference api! ')
+    if isinstance(pose_config, nn.Module):
+        model = pose_config
+    else:
+        model = init_model(pose_config, pose_checkpoint, device)
+
+    scope = model.cfg.get('default_scope', 'mmpose')
+    if scope is not None:
+        init_default_scope(scope)
+    test_pipeline = Compose(model.cfg.test_dataloader.dataset.pipeline)
+
+    def prepare(start, batch):
+        data_list, num_persons = [], []
+        for frame, dets in zip(batch, det_results[start:start + len(batch)]):
+            bboxes = dets[..., :4]
+            # the whole frame is a person if none is detected
+            if len(bboxes) == 0:
+                h, w = frame.shape[:2]
+                bboxes = np.array([[0, 0, w, h]], dtype=np.float32)
+            for bbox in bboxes:
+                data_info = dict(
+                    img=frame,
+                    bbox=bbox[None],
+                    bbox_score=np.ones(1, dtype=np.float32))
+                data_info.update(model.dataset_meta)
+                data_list.append(test_pipeline(data_info))
+            num_persons.append(len(bboxes))
+        return pseudo_collate(data_list), num_persons
+
+    results = []
+    data_samples = []
+    print('Performing Human Pose Estimation for batches of frames')
+    num_frames = len(det_results)
+    if not isinstance(frames, str):
+        num_frames = min(num_frames, len(frames))
+    progress_bar = ProgressBar(num_frames)
+    for batch, (data, num_persons) in _prefetch_batches(
+            frames, batch_size, prepare, max_frames=len(det_results)):
+        with torch.no_grad():
+            pose_data_samples = model.test_step(data)
+        start = 0
+        for num in num_persons:
+            pose_data_sample = _merge_pose_samples(
+                model, pose_data_samples[start:start + num])
+            results.append(pose_data_sample.pred_instances.to_dict())
+            data_samples.append(pose_data_sample)
+            start += num
+        progress_bar.update(len(batch))
+
+    return results, data_samples
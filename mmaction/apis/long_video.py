@@ -0,0 +1,241 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+import torch.nn as nn
+from mmengine.dataset import Compose, pseudo_collate
+from mmengine.logging import print_log
+from mmengine.registry import init_default_scope
+
+from mmaction.structures import ActionDataSample
+
+
+def _build_clip_pipeline(pipeline_cfg: Sequence[dict],
+                         is_recognizer2d: bool) -> Tuple[list, int, int]:
+    """Replace the video loading steps of a test pipeline by
+    ``ArrayDecode``, which takes the frames of one clip.
+
+    Returns:
+        tuple: The clip pipeline, and the ``clip_len`` and ``frame_interval``
+        of its sampling step.
+    """
+    clip_pipeline = []
+    clip_len, frame_interval = None, 1
+    for step in pipeline_cfg:
+        if 'Init' in step['type']:
+            continue
+        if 'Sample' in step['type']:
+            # 2D recognizers see ``num_clips`` consecutive frames per clip
+            if is_recognizer2d:
+                clip_len = step.get('num_clips', 1)
+            else:
+                clip_len = step.get('clip_len', 1)
+                frame_interval = step.get('frame_interval', 1)
+        elif 'Decode' in step['type']:
+            clip_pipeline.append(dict(type='ArrayDecode'))
+        else:
+            clip_pipeline.append(step)
+    return clip_pipeline, clip_len, frame_interval
+
+
+def _cat_feats(feats: list) -> Union[torch.Tensor, tuple]:
+    """Concatenate features, which can be nested tuples of tensors."""
+    if isinstance(feats[0], torch.Tensor):
+        return torch.cat(feats)
+    return tuple(_cat_feats(list(elems)) for elems in zip(*feats))
+
+
+def _split_feats(feats: Union[torch.Tensor, tuple],
+                 num_clips: int) -> list:
+    """Split the features of a batch of clips into those of each clip."""
+    if isinstance(feats, torch.Tensor):
+        return list(feats.chunk(num_clips))
+    return list(zip(*[_split_feats(elem, num_clips) for elem in feats]))
+
+
+class _FrameSource:
+    """Decode the frames of a video sequentially in chunks."""
+
+    def __init__(self, video: Union[str, Sequence[np.ndarray]],
+                 chunk_size: int) -> None:
+        if isinstance(video, str):
+            try:
+                import decord
+            except ImportError:
+                raise ImportError(
+                    'Please run "pip install decord" to install Decord first.')
+            self.reader = decord.VideoReader(video)
+        else:
+            self.reader = video
+        self.chunk_size = chunk_size
+        self.num_frames = len(self.reader)
+        self.pos = 0
+
+    def next_chunk(self) -> Sequence[np.ndarray]:
+        end = min(self.pos + self.chunk_size, self.num_frames)
+        if hasattr(self.reader, 'get_batch'):
+            frames = self.reader.get_batch(list(range(self.pos,
+                                                      end))).asnumpy()
+        else:
+            frames = self.reader[self.pos:end]
+        self.pos = end
+        return frames
+
+
+def inference_long_video(
+        model: nn.Module,
+        video: Union[str, Sequence[np.ndarray]],
+        window_clips: int = 8,
+        window_stride: int = 1,
+        clip_interval: Optional[int] = None,
+        batch_size: int = 8,
+        decode_chunk: int = 64,
+        test_pipeline: Optional[Sequence[dict]] = None
+) -> Tuple[List[ActionDataSample], Dict]:
+    """Inference sliding windows of a long video with the recognizer.
+
+    The video is covered by clips sampled like ``UntrimmedSampleFrames``,
+    whose ``clip_len`` and ``frame_interval`` are those of the sampling step
+    of the test pipeline. Each window of ``window_clips`` consecutive clips
+    gives a prediction, averaged over its clips by the head like a
+    multi-clip test, and the next window starts ``window_stride`` clips
+    later.
+
+    Instead of running the whole model on every window, the frames are
+    decoded once in order, the backbone features of each clip are computed
+    once in batches of clips and kept in a ring buffer of the last
+    ``window_clips`` clips, and the head predicts each window from the
+    buffered features.
+
+    Args:
+        model (nn.Module): The loaded recognizer.
+        video (str | Sequence[np.ndarray]): The video file path, decoded by
+            decord, or the RGB frames.
+        window_clips (int): The number of clips of each window.
+            Defaults to 8.
+        window_stride (int): The number of clips between the starts of
+            adjacent windows. Defaults to 1.
+        clip_interval (int, optional): The number of frames between the
+            centers of adjacent clips. Defaults to None, which places the
+            clips next to each other.
+        batch_size (int): The number of clips of each backbone forward.
+            Defaults to 8.
+        decode_chunk (int): The number of frames decoded at a time.
+            Defaults to 64.
+        test_pipeline (Sequence[dict], optional): The test pipeline config.
+            If not specified, the test pipeline in the config will be used.
+            Defaults to None.
+
+    Returns:
+        tuple[list[:obj:`ActionDataSample`], dict]: The prediction of each
+        window, whose ``clip_inds`` and ``frame_range`` meta information are
+        the clips and the frames it covers, and the statistics of the run,
+        including the throughput ``fps``. If the video is shorter than a
+        window, a single window covers all its clips.
+    """
+    assert window_clips > 0 and window_stride > 0 and batch_size > 0
+    cfg = model.cfg
+    init_default_scope(cfg.get('default_scope', 'mmaction'))
+    if test_pipeline is None:
+        test_pipeline = cfg.test_pipeline
+    clip_pipeline, clip_len, frame_interval = _build_clip_pipeline(
+        test_pipeline, cfg.model.type == 'Recognizer2D')
+    assert clip_len is not None, 'No sampling step in the test pipeline'
+    clip_pipeline = Compose(clip_pipeline)
+    if clip_interval is None:
+        clip_interval = clip_len * frame_interval
+
+    tic = time.perf_counter()
+    source = _FrameSource(video, decode_chunk)
+    num_frames = source.num_frames
+    clip_centers = np.arange(clip_interval // 2, num_frames, clip_interval)
+    offsets = np.arange(-(clip_len // 2 * frame_interval),
+                        frame_interval * (clip_len - clip_len // 2),
+                        frame_interval)
+    clip_frame_inds = np.clip(clip_centers[:, None] + offsets, 0,
+                              num_frames - 1)
+    num_clips = len(clip_frame_inds)
+    # the frames of a clip are all decoded once its last one is
+    ready_pos = clip_frame_inds.max(axis=1) + 1
+    needed = np.zeros(num_frames, dtype=bool)
+    needed[clip_frame_inds] = True
+
+    frames = dict()
+    pending = []
+    feat_ring = deque(maxlen=min(window_clips, num_clips))
+    predict_kwargs = dict()
+    results = []
+
+    def predict_window(last_clip: int) -> None:
+        first_clip = last_clip - len(feat_ring) + 1
+        data_sample = ActionDataSample()
+        data_sample.set_metainfo(
+            dict(
+                clip_inds=(first_clip, last_clip + 1),
+                frame_range=(int(clip_frame_inds[first_clip].min()),
+                             int(clip_frame_inds[last_clip].max()) + 1)))
+        with torch.no_grad():
+            result = model.cls_head.predict(
+                _cat_feats(list(feat_ring)), [data_sample], **predict_kwargs)
+        results.append(result[0])
+
+    def forward_clips(clip_inds: List[int]) -> None:
+        data = []
+        for clip_idx in clip_inds:
+            clip = dict(
+                array=[frames[idx] for idx in clip_frame_inds[clip_idx]],
+                frame_inds=np.arange(clip_len),
+                total_frames=clip_len,
+                num_clips=1,
+                clip_len=clip_len,
+                start_index=0,
+                modality='RGB',
+                label=-1)
+            data.append(clip_pipeline(clip))
+        with torch.no_grad():
+            inputs = model.data_preprocessor(pseudo_collate(data))['inputs']
+            if inputs.ndim == 6:
+                # [N, num_crops, C, T, H, W] -> [1, N * num_crops, C, T, H, W]
+                # so that ``max_testing_views`` bounds the backbone batches
+                inputs = inputs.view((1, -1) + inputs.shape[2:])
+            feats, kwargs = model.extract_feat(inputs, test_mode=True)
+        predict_kwargs.update(kwargs)
+        for clip_idx, feat in zip(clip_inds,
+                                  _split_feats(feats, len(clip_inds))):
+            feat_ring.append(feat)
+            first_clip = clip_idx + 1 - feat_ring.maxlen
+            if first_clip >= 0 and first_clip % window_stride == 0:
+                predict_window(clip_idx)
+
+    next_clip = 0
+    while next_clip < num_clips:
+        chunk_start = source.pos
+        for idx, frame in enumerate(source.next_chunk(), chunk_start):
+            if needed[idx]:
+                frames[idx] = frame
+        while next_clip < num_clips and ready_pos[next_clip] <= source.pos:
+            pending.append(next_clip)
+            next_clip += 1
+        if len(pending) >= batch_size or next_clip == num_clips:
+            forward_clips(pending)
+            pending = []
+            # drop the frames before the first one of the next clip
+            if next_clip < num_clips:
+                first_frame = clip_frame_inds[next_clip, 0]
+                for idx in [idx for idx in frames if idx < first_frame]:
+                    del frames[idx]
+
+    elapsed = time.perf_counter() - tic
+    stats = dict(
+        num_frames=num_frames,
+        num_clips=num_clips,
+        num_windows=len(results),
+        fps=num_frames / elapsed if elapsed > 0 else float('inf'))
+    print_log(
+        f'Inferred {stats["num_windows"]} windows of {num_clips} clips on '
+        f'{num_frames} frames at {stats["fps"]:.1f} frames per second',
+        logger='current')
+    return results, stats
@@ -0,0 +1,292 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import torch
+import torch.nn as nn
+from mmengine.dataset import Compose, pseudo_collate
+from mmengine.registry import init_default_scope
+
+from mmaction.structures import ActionDataSample
+from mmaction.utils import get_str_type
+
+
+class LatencyMeter:
+    """Record the latency of the stages of a pipeline, from several
+    threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._total = defaultdict(float)
+        self._count = defaultdict(int)
+        self._last = dict()
+
+    def update(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._total[stage] += seconds
+            self._count[stage] += 1
+            self._last[stage] = seconds
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Get the mean and last latency in milliseconds and the count of
+        each stage."""
+        with self._lock:
+            return {
+                stage: dict(
+                    mean=self._total[stage] / self._count[stage] * 1000,
+                    last=self._last[stage] * 1000,
+                    count=self._count[stage])
+                for stage in self._count
+            }
+
+
+class RealtimeInferenceRunner:
+    """Recognize the latest window of a live video stream.
+
+    Frames are handed to :meth:`push` by the capture loop and written into a
+    preallocated ring buffer of the last ``sample_length`` frames. A
+    preprocessing thread, woken by a condition variable, takes the latest
+    window from the ring buffer and runs the test pipeline, and a model
+    thread runs the recognizer on it, so the preprocessing of a window
+    overlaps the forward of the previous one. A window that is not picked by
+    the model thread before the next one is ready is dropped, to keep the
+    latency low.
+
+    The recognition scores are averaged over the last ``average_size``
+    windows. The latest result is returned by :meth:`get_result`, and the
+    latency of each stage by :meth:`latency`:
+
+    - ``snapshot``: Copy the window out of the ring buffer.
+    - ``preprocess``: Run the test pipeline.
+    - ``queue``: Wait for the model thread.
+    - ``forward``: Run the recognizer.
+    - ``total``: From the arrival of the last frame of the window to its
+      result.
+
+    Example:
+        >>> runner = RealtimeInferenceRunner(model)
+        >>> with runner:
+        >>>     while True:
+        >>>         _, frame = camera.read()
+        >>>         runner.push(frame[:, :, ::-1])
+        >>>         result = runner.get_result()
+
+    Args:
+        model (nn.Module): The loaded recognizer.
+        sample_length (int, optional): The number of frames of each window.
+            Defaults to None, which is ``clip_len * num_clips`` of the
+            sampling step of the test pipeline.
+        stride (int): The minimum number of new frames between windows.
+            Defaults to 1.
+        average_size (int): The number of the latest windows whose scores
+            are averaged. Defaults to 1.
+        test_pipeline (Sequence[dict], optional): The test pipeline config,
+            whose loading steps are removed. If not specified, the test
+            pipeline in the config will be used. Defaults to None.
+        max_fps (float): The upper bound of the windows recognized per
+            second, or 0 for no limit. Defaults to 0.
+        callback (Callable, optional): Called with each result in the model
+            thread. Defaults to None.
+    """
+
+    def __init__(self,
+                 model: nn.Module,
+                 sample_length: Optional[int] = None,
+                 stride: int = 1,
+                 average_size: int = 1,
+                 test_pipeline: Optional[Sequence[dict]] = None,
+                 max_fps: float = 0,
+                 callback: Optional[Callable] = None) -> None:
+        assert stride > 0 and average_size > 0 and max_fps >= 0
+        self.model = model
+        cfg = model.cfg
+        init_default_scope(cfg.get('default_scope', 'mmaction'))
+        if test_pipeline is None:
+            test_pipeline = cfg.test_pipeline
+
+        self._data = dict(modality='RGB', label=-1)
+        window_pipeline = []
+        for step in test_pipeline:
+            step_type = get_str_type(step['type'])
+            if 'SampleFrames' in step_type:
+                self._data['num_clips'] = step.get('num_clips', 1)
+                self._data['clip_len'] = step.get('clip_len', 1)
+            elif 'Init' not in step_type and 'Decode' not in step_type:
+                window_pipeline.append(step)
+        if sample_length is None:
+            assert 'clip_len' in self._data, (
+                'No SampleFrames in the test pipeline, please specify '
+                '`sample_length`')
+            sample_length = self._data['clip_len'] * self._data['num_clips']
+        self.sample_length = sample_length
+        self.stride = stride
+        self.max_fps = max_fps
+        self.pipeline = Compose(window_pipeline)
+        self.callback = callback
+        self.meter = LatencyMeter()
+        self.num_dropped = 0
+
+        self._frame_cond = threading.Condition()
+        self._ring = None
+        self._arrivals = np.zeros(sample_length)
+        self._num_frames = 0
+
+        self._input_cond = threading.Condition()
+        self._input = None
+
+        self._result_lock = threading.Lock()
+        self._result = None
+        self._scores = deque(maxlen=average_size)
+
+        self._stopped = False
+        self._error = None
+        self._threads = []
+
+    def push(self, frame: np.ndarray) -> None:
+        """Write a frame into the ring buffer and wake the preprocessing.
+
+        Args:
+            frame (np.ndarray): The frame, in the channel order of the test
+                pipeline, usually RGB.
+        """
+        with self._frame_cond:
+            if self._ring is None:
+                self._ring = np.empty((self.sample_length, ) + frame.shape,
+                                      dtype=frame.dtype)
+            slot = self._num_frames % self.sample_length
+            self._ring[slot] = frame
+            self._arrivals[slot] = time.perf_counter()
+            self._num_frames += 1
+            self._frame_cond.notify()
+
+    def _preprocess_loop(self) -> None:
+        last = 0
+
+        def ready() -> bool:
+            num_frames = self._num_frames
+            return self._stopped or (num_frames >= self.sample_length
+                                     and num_frames - last >= self.stride)
+
+        while True:
+            with self._frame_cond:
+                self._frame_cond.wait_for(ready)
+                if self._stopped:
+                    return
+                tic = time.perf_counter()
+                last = self._num_frames
+                # the ring buffer in time order
+                order = np.arange(last - self.sample_length,
+                                  last) % self.sample_length
+                window = self._ring[order]
+                arrival = self._arrivals[order[-1]]
+            toc = time.perf_counter()
+            self.meter.update('snapshot', toc - tic)
+
+            data = dict(
+                self._data,
+                imgs=list(window),
+                img_shape=window.shape[1:3],
+                original_shape=window.shape[1:3])
+            data = self.pipeline(data)
+            data['data_samples'].set_metainfo(
+                dict(frame_range=(last - self.sample_length, last)))
+            tic = time.perf_counter()
+            self.meter.update('preprocess', tic - toc)
+
+            with self._input_cond:
+                if self._input is not None:
+                    self.num_dropped += 1
+                self._input = (data, arrival, tic)
+                self._input_cond.notify()
+
+    def _model_loop(self) -> None:
+        last_start = 0
+        while True:
+            if self.max_fps > 0:
+                sleep_time = 1 / self.max_fps - (
+                    time.perf_counter() - last_start)
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+            with self._input_cond:
+                self._input_cond.wait_for(
+                    lambda: self._stopped or self._input is not None)
+                if self._stopped:
+                    return
+                data, arrival, queued = self._input
+                self._input = None
+            tic = last_start = time.perf_counter()
+            self.meter.update('queue', tic - queued)
+
+            with torch.no_grad():
+                result = self.model.test_step(pseudo_collate([data]))[0]
+            toc = time.perf_counter()
+            self.meter.update('forward', toc - tic)
+
+            self._scores.append(result.pred_score.cpu())
+            result.set_pred_score(torch.stack(list(self._scores)).mean(0))
+            with self._result_lock:
+                self._result = result
+            if self.callback is not None:
+                self.callback(result)
+            self.meter.update('total', time.perf_counter() - arrival)
+
+    def _run(self, target: Callable) -> None:
+        try:
+            target()
+        except Exception as e:
+            self._error = e
+            self.stop(join=False)
+
+    def start(self) -> None:
+        """Start the preprocessing and model threads."""
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._run, args=(loop, ), daemon=True)
+            for loop in (self._preprocess_loop, self._model_loop)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, join: bool = True) -> None:
+        """Stop the threads.
+
+        Args:
+            join (bool): Whether to wait for the threads to exit.
+                Defaults to True.
+        """
+        self._stopped = True
+        for cond in (self._frame_cond, self._input_cond):
+            with cond:
+                cond.notify_all()
+        if join:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def get_result(self) -> Optional[ActionDataSample]:
+        """Get the result of the latest window, whose ``frame_range`` meta
+        information is the indices of its frames in the stream.
+
+        Returns:
+            :obj:`ActionDataSample`, optional: The latest result with the
+            averaged ``pred_score``, or None before the first one.
+        """
+        if self._error is not None:
+            raise self._error
+        with self._result_lock:
+            return self._result
+
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        """Get the mean and last latency in milliseconds and the count of
+        each stage."""
+        return self.meter.summary()
+
+    def __enter__(self) -> 'RealtimeInferenceRunner':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
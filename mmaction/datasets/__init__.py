@@ -8,6 +8,7 @@ from .msrvtt_datasets import MSRVTTVQA, MSRVTTVQAMC, MSRVTTRetrieval
 from .pose_dataset import PoseDataset
 from .rawframe_dataset import RawframeDataset
 from .repeat_aug_dataset import RepeatAugDataset, repeat_pseudo_collate
+from .shm_collate import SharedMemorySlabPool, shm_stack_collate
 from .transforms import *  # noqa: F401, F403
 from .video_dataset import VideoDataset
 from .video_text_dataset import VideoTextDataset
@@ -16,5 +17,6 @@ __all__ = [
     'AVADataset', 'AVAKineticsDataset', 'ActivityNetDataset', 'AudioDataset',
     'BaseActionDataset', 'PoseDataset', 'RawframeDataset', 'RepeatAugDataset',
     'VideoDataset', 'repeat_pseudo_collate', 'VideoTextDataset',
-    'MSRVTTRetrieval', 'MSRVTTVQA', 'MSRVTTVQAMC', 'CharadesSTADataset'
+    'MSRVTTRetrieval', 'MSRVTTVQA', 'MSRVTTVQAMC', 'CharadesSTADataset',
+    'SharedMemorySlabPool', 'shm_stack_collate'
 ]
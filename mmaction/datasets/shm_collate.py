@@ -0,0 +1,127 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+from typing import Any, Sequence
+
+import torch
+from mmengine.dataset import COLLATE_FUNCTIONS, pseudo_collate
+from torch.utils.data import get_worker_info
+
+
+class SharedMemorySlabPool:
+    """A ring of reusable shared-memory slabs of one process.
+
+    Each slab is a tensor in shared memory holding the stacked inputs of one
+    batch. When a dataloader worker returns a batch, only the handle of the
+    slab is sent to the main process, which maps it once and reuses the
+    mapping for later batches of the same slab, so the inputs are neither
+    pickled nor copied into a new shared memory segment per sample.
+
+    A slab is overwritten ``num_slabs`` batches later, so the main process
+    must have consumed a batch by then, e.g. by moving it to the GPU. With
+    the default ``prefetch_factor=2`` of the dataloader, at most 3 batches
+    of a worker are in flight.
+
+    Args:
+        num_slabs (int): The number of slabs in the ring. Defaults to 4.
+    """
+
+    def __init__(self, num_slabs: int = 4) -> None:
+        assert num_slabs > 0
+        self.num_slabs = num_slabs
+        self.pid = os.getpid()
+        self._key = None
+        self._slabs = []
+        self._cursor = 0
+
+    def get(self, batch_size: int, sample_shape: Sequence[int],
+            dtype: torch.dtype) -> torch.Tensor:
+        """Get the next slab for a batch.
+
+        The slabs are only kept for the last sample shape and dtype, and grow
+        with the batch size.
+
+        Args:
+            batch_size (int): The number of samples of the batch.
+            sample_shape (Sequence[int]): The shape of each sample.
+            dtype (torch.dtype): The dtype of the samples.
+
+        Returns:
+            torch.Tensor: A shared-memory tensor with the shape of
+            ``(batch_size, *sample_shape)``.
+        """
+        key = (tuple(sample_shape), dtype)
+        if key != self._key:
+            # the slabs in flight stay mapped by the main process
+            self._key = key
+            self._slabs = []
+            self._cursor = 0
+
+        index = self._cursor % self.num_slabs
+        self._cursor += 1
+        if index == len(self._slabs) or len(self._slabs[index]) < batch_size:
+            slab = torch.empty((batch_size, ) + key[0],
+                               dtype=dtype).share_memory_()
+            if index == len(self._slabs):
+                self._slabs.append(slab)
+            else:
+                self._slabs[index] = slab
+        return self._slabs[index][:batch_size]
+
+
+_slab_pool = None
+
+
+def _get_slab_pool(num_slabs: int) -> SharedMemorySlabPool:
+    """Get the slab pool of the current process, which is not inherited
+    from the parent of a forked dataloader worker."""
+    global _slab_pool
+    if (_slab_pool is None or _slab_pool.pid != os.getpid()
+            or _slab_pool.num_slabs != num_slabs):
+        _slab_pool = SharedMemorySlabPool(num_slabs)
+    return _slab_pool
+
+
+@COLLATE_FUNCTIONS.register_module()
+def shm_stack_collate(data_batch: Sequence, num_slabs: int = 4) -> Any:
+    """Stack the inputs of a batch into a shared-memory slab.
+
+    In dataloader workers, the ``inputs`` tensors packed by
+    ``PackActionInputs`` are written into a slab of a
+    :class:`SharedMemorySlabPool`, and the batch carries the stacked tensor,
+    whose handle is all that is sent to the main process.
+    ``ActionDataPreprocessor`` takes the stacked tensor as the batch inputs.
+    Without workers, the inputs are stacked into a regular tensor.
+
+    The other fields are collated by ``pseudo_collate``, as are the batches
+    whose inputs are not tensors of the same shape and dtype.
+
+    Example:
+        >>> train_dataloader = dict(
+        >>>     num_workers=8,
+        >>>     collate_fn=dict(type='shm_stack_collate', num_slabs=4),
+        >>>     ...)
+
+    Args:
+        data_batch (Sequence): The packed samples of the batch.
+        num_slabs (int): The number of slabs of each worker, which must be
+            larger than the batches of a worker in flight, i.e. the
+            ``prefetch_factor`` of the dataloader plus one. Defaults to 4.
+
+    Returns:
+        Any: The collated batch.
+    """
+    inputs = [sample['inputs'] for sample in data_batch]
+    if not (all(isinstance(x, torch.Tensor) for x in inputs)
+            and len({(x.shape, x.dtype) for x in inputs}) == 1):
+        return pseudo_collate(data_batch)
+
+    others = pseudo_collate([{k: v
+                              for k, v in sample.items() if k != 'inputs'}
+                             for sample in data_batch])
+    if get_worker_info() is None:
+        others['inputs'] = torch.stack(inputs)
+    else:
+        slab = _get_slab_pool(num_slabs).get(
+            len(inputs), inputs[0].shape, inputs[0].dtype)
+        others['inputs'] = torch.stack(inputs, out=slab)
+    return others
@@ -5,10 +5,12 @@ from .loading import (ArrayDecode, AudioFeatureSelector, BuildPseudoClip,
                       DecordDecode, DecordInit, DenseSampleFrames,
                       GenerateLocalizationLabels, ImageDecode,
                       LoadAudioFeature, LoadHVULabel, LoadLocalizationFeature,
-                      LoadProposals, LoadRGBFromFile, OpenCVDecode, OpenCVInit,
-                      PIMSDecode, PIMSInit, PyAVDecode, PyAVDecodeMotionVector,
-                      PyAVInit, RawFrameDecode, SampleAVAFrames, SampleFrames,
-                      UniformSample, UntrimmedSampleFrames)
+                      LoadPackedLocalizationFeature, LoadProposals,
+                      LoadRGBFromFile, OpenCVDecode, OpenCVInit,
+                      PackedFrameDecode, PIMSDecode, PIMSInit, PyAVDecode,
+                      PyAVDecodeMotionVector, PyAVInit, RawFrameDecode,
+                      SampleAVAFrames, SampleFrames, UniformSample,
+                      UntrimmedSampleFrames)
 from .pose_transforms import (DecompressPose, GeneratePoseTarget, GenSkeFeat,
                               JointToBone, MergeSkeFeat, MMCompact, MMDecode,
                               MMUniformSampleFrames, PadTo, PoseCompact,
@@ -18,7 +20,8 @@ from .processing import (CenterCrop, ColorJitter, Flip, Fuse, MultiScaleCrop,
                          RandomCrop, RandomRescale, RandomResizedCrop, Resize,
                          TenCrop, ThreeCrop)
 from .text_transforms import CLIPTokenize
-from .wrappers import ImgAug, PytorchVideoWrapper, TorchVisionWrapper
+from .wrappers import (CacheDecodedClip, ImgAug, PytorchVideoWrapper,
+                       TorchVisionWrapper)
 
 __all__ = [
     'ArrayDecode', 'AudioFeatureSelector', 'BuildPseudoClip', 'CenterCrop',
@@ -27,15 +30,16 @@ __all__ = [
     'FormatShape', 'Fuse', 'GenSkeFeat', 'GenerateLocalizationLabels',
     'GeneratePoseTarget', 'ImageDecode', 'ImgAug', 'JointToBone',
     'LoadAudioFeature', 'LoadHVULabel', 'DecompressPose',
-    'LoadLocalizationFeature', 'LoadProposals', 'LoadRGBFromFile',
-    'MergeSkeFeat', 'MultiScaleCrop', 'OpenCVDecode', 'OpenCVInit',
-    'OpenCVInit', 'PIMSDecode', 'PIMSInit', 'PackActionInputs',
-    'PackLocalizationInputs', 'PadTo', 'PoseCompact', 'PoseDecode',
-    'PreNormalize2D', 'PreNormalize3D', 'PyAVDecode', 'PyAVDecodeMotionVector',
-    'PyAVInit', 'PyAVInit', 'PytorchVideoWrapper', 'RandomCrop',
-    'RandomRescale', 'RandomResizedCrop', 'RawFrameDecode', 'Resize',
-    'SampleAVAFrames', 'SampleFrames', 'TenCrop', 'ThreeCrop', 'ToMotion',
-    'TorchVisionWrapper', 'Transpose', 'UniformSample', 'UniformSampleFrames',
-    'UntrimmedSampleFrames', 'MMUniformSampleFrames', 'MMDecode', 'MMCompact',
-    'CLIPTokenize'
+    'LoadLocalizationFeature', 'LoadPackedLocalizationFeature',
+    'LoadProposals', 'LoadRGBFromFile', 'MergeSkeFeat', 'MultiScaleCrop',
+    'OpenCVDecode', 'OpenCVInit', 'OpenCVInit', 'PIMSDecode', 'PIMSInit',
+    'PackActionInputs', 'PackLocalizationInputs', 'PackedFrameDecode', 'PadTo',
+    'PoseCompact', 'PoseDecode', 'PreNormalize2D', 'PreNormalize3D',
+    'PyAVDecode', 'PyAVDecodeMotionVector', 'PyAVInit', 'PyAVInit',
+    'PytorchVideoWrapper', 'RandomCrop', 'RandomRescale', 'RandomResizedCrop',
+    'RawFrameDecode', 'Resize', 'SampleAVAFrames', 'SampleFrames', 'TenCrop',
+    'ThreeCrop', 'ToMotion', 'TorchVisionWrapper', 'Transpose',
+    'UniformSample', 'UniformSampleFrames', 'UntrimmedSampleFrames',
+    'MMUniformSampleFrames', 'MMDecode', 'MMCompact', 'CLIPTokenize',
+    'CacheDecodedClip'
 ]
@@ -243,6 +243,12 @@ class FormatShape(BaseTransform):
         """
         if not isinstance(results['imgs'], np.ndarray):
             results['imgs'] = np.array(results['imgs'])
+        elif any(stride < 0 for stride in results['imgs'].strides):
+            # ``to_tensor`` does not accept reversed views
+            results['imgs'] = np.ascontiguousarray(results['imgs'])
+        # A clip buffer, or a cropped view of it, is only split along the
+        # first axis and transposed below, which gives views of it without
+        # copying the frames. They are copied once when batched.
 
         # [M x H x W x C]
         # M = 1 * N_crops * N_clips * T
@@ -1,11 +1,13 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-import copy as cp
+import hashlib
 import io
 import os
 import logging
 import os.path as osp
 import shutil
-from typing import Dict, List, Optional, Union
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
 
 import mmcv
 import numpy as np
@@ -14,7 +16,9 @@ from mmcv.transforms import BaseTransform
 from mmengine.fileio import FileClient
 
 from mmaction.registry import TRANSFORMS
-from mmaction.utils import get_random_string, get_shm_dir, get_thread_id
+from mmaction.utils import (FRAME_ARCHIVE_EXT, FrameArchiveReader,
+                            PackedArrayReader, VideoReaderPool,
+                            get_random_string, get_shm_dir, get_thread_id)
 
 
 @TRANSFORMS.register_module()
@@ -783,6 +787,54 @@ class SampleAVAFrames(SampleFrames):
         return repr_str
 
 
+def _plan_seeks(frame_inds: np.ndarray,
+                key_inds: np.ndarray) -> List[tuple]:
+    """Plan the seeks to decode exact frames of a video in one forward pass.
+
+    The requested frames are visited in ascending order. A seek to the key
+    frame of the GOP holding a frame is only planned when that key frame lies
+    after the current decoding position, or when the frame is behind it, so
+    frames sharing a GOP are reached by decoding forward from a single seek.
+
+    Args:
+        frame_inds (np.ndarray): Indices of the frames to decode.
+        key_inds (np.ndarray): Sorted indices of the key frames of the video.
+
+    Returns:
+        list[tuple]: ``(frame_idx, seek_idx)`` pairs in decoding order, where
+        ``seek_idx`` is the key frame to seek to before decoding
+        ``frame_idx``, or None to decode forward from the current position.
+    """
+    frame_inds = np.unique(frame_inds.astype(np.int64))
+    gop_inds = np.searchsorted(key_inds, frame_inds, side='right') - 1
+    plan = []
+    # index of the next frame the decoder returns, -1 before the first seek
+    pos = -1
+    for frame_idx, gop_idx in zip(frame_inds.tolist(), gop_inds.tolist()):
+        key_idx = int(key_inds[max(gop_idx, 0)])
+        if pos < 0 or frame_idx < pos or key_idx > pos:
+            plan.append((frame_idx, min(key_idx, frame_idx)))
+        else:
+            plan.append((frame_idx, None))
+        pos = frame_idx + 1
+    return plan
+
+
+def _gather_frames(frames: Dict[int, np.ndarray],
+                   frame_inds: np.ndarray) -> List[np.ndarray]:
+    """Arrange the decoded frames in the requested order.
+
+    Repeated indices get a copy of the frame, as later transforms may modify
+    frames in place.
+    """
+    imgs, used = [], set()
+    for idx in frame_inds.tolist():
+        idx = int(idx)
+        imgs.append(frames[idx].copy() if idx in used else frames[idx])
+        used.add(idx)
+    return imgs
+
+
 @TRANSFORMS.register_module()
 class PyAVInit(BaseTransform):
     """Using pyav to initialize the video.
@@ -795,13 +847,26 @@ class PyAVInit(BaseTransform):
     Args:
         io_backend (str): io backend where frames are store.
             Default: 'disk'.
+        reader_pool_size (int): Max number of opened containers kept by each
+            worker and reused when the same video is loaded again. 0 means
+            a new container is opened for every call. Default: 0.
         kwargs (dict): Args for file client.
     """
 
-    def __init__(self, io_backend='disk', **kwargs):
+    def __init__(self, io_backend='disk', reader_pool_size=0, **kwargs):
         self.io_backend = io_backend
+        self.reader_pool_size = reader_pool_size
         self.kwargs = kwargs
         self.file_client = None
+        self.reader_pool = None
+        if reader_pool_size > 0:
+            self.reader_pool = VideoReaderPool(
+                reader_pool_size, on_evict=self._close_container)
+
+    @staticmethod
+    def _close_container(container):
+        """Close a container evicted from the reader pool."""
+        container.close()
 
     def transform(self, results):
         """Perform the PyAV initialization.
@@ -819,8 +884,15 @@ class PyAVInit(BaseTransform):
         if self.file_client is None:
             self.file_client = FileClient(self.io_backend, **self.kwargs)
 
-        file_obj = io.BytesIO(self.file_client.get(results['filename']))
-        container = av.open(file_obj)
+        filename = results['filename']
+        if self.reader_pool is None:
+            container = av.open(io.BytesIO(self.file_client.get(filename)))
+        else:
+            container = self.reader_pool.get(
+                filename,
+                lambda: av.open(io.BytesIO(self.file_client.get(filename))))
+            # a reused container is left where the last decoding stopped
+            container.seek(0)
 
         results['video_reader'] = container
         results['total_frames'] = container.streams.video[0].frames
@@ -828,7 +900,9 @@ class PyAVInit(BaseTransform):
         return results
 
     def __repr__(self):
-        repr_str = f'{self.__class__.__name__}(io_backend={self.io_backend})'
+        repr_str = (f'{self.__class__.__name__}('
+                    f'io_backend={self.io_backend}, '
+                    f'reader_pool_size={self.reader_pool_size})')
         return repr_str
 
 
@@ -844,18 +918,24 @@ class PyAVDecode(BaseTransform):
     Args:
         multi_thread (bool): If set to True, it will apply multi
             thread processing. Default: False.
-        mode (str): Decoding mode. Options are 'accurate' and 'efficient'.
+        mode (str): Decoding mode. Options are 'accurate', 'efficient' and
+            'seek'.
             If set to 'accurate', it will decode videos into accurate frames.
             If set to 'efficient', it will adopt fast seeking but only return
             the nearest key frames, which may be duplicated and inaccurate,
             and more suitable for large scene-based video datasets.
+            If set to 'seek', it will seek once per GOP holding requested
+            frames and decode forward to them, which returns accurate frames
+            and is much faster for sparse sampling of long videos. Videos
+            whose frames can not be located by their pts, e.g. with a
+            variable frame rate, are decoded as in 'accurate' mode.
             Default: 'accurate'.
     """
 
     def __init__(self, multi_thread=False, mode='accurate'):
         self.multi_thread = multi_thread
         self.mode = mode
-        assert mode in ['accurate', 'efficient']
+        assert mode in ['accurate', 'efficient', 'seek']
 
     @staticmethod
     def frame_generator(container, stream):
@@ -865,6 +945,88 @@ class PyAVDecode(BaseTransform):
                 if frame:
                     return frame.to_rgb().to_ndarray()
 
+    @staticmethod
+    def _accurate_decode(container, frame_inds):
+        """Decode all the frames up to the last requested one."""
+        # set max indice to make early stop
+        max_inds = max(frame_inds)
+        imgs = list()
+        i = 0
+        for frame in container.decode(video=0):
+            if i > max_inds + 1:
+                break
+            imgs.append(frame.to_rgb().to_ndarray())
+            i += 1
+
+        # the available frame in pyav may be less than its length,
+        # which may raise error
+        return [imgs[i % len(imgs)] for i in frame_inds]
+
+    @staticmethod
+    def _seek_decode(container, frame_inds):
+        """Decode exact frames with one seek per GOP of requested frames.
+
+        The requested frames are visited in ascending order. The key frames
+        are not listed beforehand, which would read the whole video: the
+        longest GOP seen while decoding is kept instead, and a frame is
+        reached by decoding forward from the previous one if it is at most
+        that far, or by a seek to its key frame otherwise.
+
+        The frame indices are computed from the pts, and checked to follow
+        each other one by one. Returns None if they do not, e.g. for streams
+        with a variable frame rate or without pts, or if a frame is past the
+        end of the stream, so that the frames can be decoded accurately.
+        """
+        stream = container.streams.video[0]
+        if stream.average_rate is None:
+            return None
+        pts_scale = stream.average_rate * stream.time_base
+        start_pts = stream.start_time or 0
+
+        def pts_to_index(pts):
+            if pts is None:
+                return None
+            index = float((pts - start_pts) * pts_scale)
+            # off the grid of a constant frame rate
+            if abs(index - round(index)) > 0.1:
+                return None
+            return int(round(index))
+
+        frames = dict()
+        decoder = None
+        # index of the last decoded frame and of the last key frame
+        pos, key_idx = -1, None
+        key_interval = 0
+        for frame_idx in np.unique(frame_inds.astype(np.int64)).tolist():
+            if decoder is None or frame_idx <= pos or \
+                    frame_idx - pos > key_interval:
+                container.seek(
+                    start_pts + int(frame_idx / pts_scale),
+                    any_frame=False,
+                    backward=True,
+                    stream=stream)
+                decoder = container.decode(stream)
+                pos, key_idx = -1, None
+
+            for frame in decoder:
+                idx = pts_to_index(frame.pts)
+                if idx is None or idx > frame_idx or (pos >= 0
+                                                      and idx != pos + 1):
+                    return None
+                if frame.key_frame:
+                    if key_idx is not None:
+                        key_interval = max(key_interval, idx - key_idx)
+                    key_idx = idx
+                elif key_idx is not None:
+                    key_interval = max(key_interval, idx - key_idx + 1)
+                pos = idx
+                if idx == frame_idx:
+                    frames[frame_idx] = frame.to_rgb().to_ndarray()
+                    break
+            else:
+                return None
+        return _gather_frames(frames, frame_inds)
+
     def transform(self, results):
         """Perform the PyAV decoding.
 
@@ -881,20 +1043,8 @@ class PyAVDecode(BaseTransform):
             results['frame_inds'] = np.squeeze(results['frame_inds'])
 
         if self.mode == 'accurate':
-            # set max indice to make early stop
-            max_inds = max(results['frame_inds'])
-            i = 0
-            for frame in container.decode(video=0):
-                if i > max_inds + 1:
-                    break
-                imgs.append(frame.to_rgb().to_ndarray())
-                i += 1
-
-            # the available frame in pyav may be less than its length,
-            # which may raise error
-            results['imgs'] = [
-                imgs[i % len(imgs)] for i in results['frame_inds']
-            ]
+            imgs = self._accurate_decode(container, results['frame_inds'])
+            results['imgs'] = imgs
         elif self.mode == 'efficient':
             for frame in container.decode(video=0):
                 backup_frame = frame
@@ -912,6 +1062,15 @@ class PyAVDecode(BaseTransform):
                 else:
                     imgs.append(backup_frame)
             results['imgs'] = imgs
+        elif self.mode == 'seek':
+            imgs = self._seek_decode(container, results['frame_inds'])
+            if imgs is None:
+                warnings.warn(
+                    f'Can not seek the exact frames of '
+                    f'{results.get("filename")}, decode it accurately')
+                container.seek(0)
+                imgs = self._accurate_decode(container, results['frame_inds'])
+            results['imgs'] = imgs
         results['original_shape'] = imgs[0].shape[:2]
         results['img_shape'] = imgs[0].shape[:2]
         results['video_reader'] = None
@@ -1117,17 +1276,27 @@ class DecordInit(BaseTransform):
         io_backend (str): io backend where frames are store.
             Defaults to ``'disk'``.
         num_threads (int): Number of thread to decode the video. Defaults to 1.
+        reader_pool_size (int): Max number of video readers kept by each
+            worker and reused when the same video is loaded again, which
+            saves the container parsing for datasets sampling many clips of
+            one video. Each reader holds the encoded video in memory. 0 means
+            a new reader is created for every call. Defaults to 0.
         kwargs (dict): Args for file client.
     """
 
     def __init__(self,
                  io_backend: str = 'disk',
                  num_threads: int = 1,
+                 reader_pool_size: int = 0,
                  **kwargs) -> None:
         self.io_backend = io_backend
         self.num_threads = num_threads
+        self.reader_pool_size = reader_pool_size
         self.kwargs = kwargs
         self.file_client = None
+        self.reader_pool = None
+        if reader_pool_size > 0:
+            self.reader_pool = VideoReaderPool(reader_pool_size)
 
     def _get_video_reader(self, filename: str) -> object:
         if osp.splitext(filename)[0] == filename:
@@ -1154,7 +1323,12 @@ class DecordInit(BaseTransform):
         Returns:
             dict: The result dict.
         """
-        container = self._get_video_reader(results['filename'])
+        filename = results['filename']
+        if self.reader_pool is None:
+            container = self._get_video_reader(filename)
+        else:
+            container = self.reader_pool.get(
+                filename, lambda: self._get_video_reader(filename))
         results['total_frames'] = len(container)
 
         results['video_reader'] = container
@@ -1164,7 +1338,8 @@ class DecordInit(BaseTransform):
     def __repr__(self) -> str:
         repr_str = (f'{self.__class__.__name__}('
                     f'io_backend={self.io_backend}, '
-                    f'num_threads={self.num_threads})')
+                    f'num_threads={self.num_threads}, '
+                    f'reader_pool_size={self.reader_pool_size})')
         return repr_str
 
 
@@ -1186,23 +1361,35 @@ class DecordDecode(BaseTransform):
         - img_shape
 
     Args:
-        mode (str): Decoding mode. Options are 'accurate' and 'efficient'.
+        mode (str): Decoding mode. Options are 'accurate', 'efficient' and
+            'seek'.
             If set to 'accurate', it will decode videos into accurate frames.
             If set to 'efficient', it will adopt fast seeking but only return
             key frames, which may be duplicated and inaccurate, and more
             suitable for large scene-based video datasets.
+            If set to 'seek', it will seek once per GOP holding requested
+            frames and decode forward to them, which returns accurate frames
+            and is much faster for sparse sampling of long videos.
             Defaults to ``'accurate'``.
+        contiguous (bool): Whether to return the frames as one contiguous
+            ``T x H x W x C`` array, the clip buffer, instead of a list of
+            arrays. Crops, resizes and flips then work on the buffer and
+            ``FormatShape`` only creates views of it. Defaults to False.
     """
 
-    def __init__(self, mode: str = 'accurate') -> None:
+    def __init__(self,
+                 mode: str = 'accurate',
+                 contiguous: bool = False) -> None:
         self.mode = mode
-        assert mode in ['accurate', 'efficient']
+        self.contiguous = contiguous
+        assert mode in ['accurate', 'efficient', 'seek']
 
     def _decord_load_frames(self, container: object,
                             frame_inds: np.ndarray) -> List[np.ndarray]:
         if self.mode == 'accurate':
             imgs = container.get_batch(frame_inds).asnumpy()
-            imgs = list(imgs)
+            if not self.contiguous:
+                imgs = list(imgs)
         elif self.mode == 'efficient':
             # This mode is faster, however it always returns I-FRAME
             container.seek(0)
@@ -1211,6 +1398,26 @@ class DecordDecode(BaseTransform):
                 container.seek(idx)
                 frame = container.next()
                 imgs.append(frame.asnumpy())
+        elif self.mode == 'seek':
+            key_inds = np.asarray(container.get_key_indices(), dtype=np.int64)
+            if len(key_inds) == 0:
+                key_inds = np.zeros(1, dtype=np.int64)
+            frames = dict()
+            pos = 0
+            for frame_idx, seek_idx in _plan_seeks(frame_inds, key_inds):
+                if seek_idx is not None:
+                    # lands on the key frame and decodes up to ``frame_idx``
+                    container.seek_accurate(frame_idx)
+                elif frame_idx > pos:
+                    container.skip_frames(frame_idx - pos)
+                frames[frame_idx] = container.next().asnumpy()
+                pos = frame_idx + 1
+            if self.contiguous:
+                imgs = [frames[frame_idx] for frame_idx in frame_inds]
+            else:
+                imgs = _gather_frames(frames, frame_inds)
+        if self.contiguous and isinstance(imgs, list):
+            imgs = np.stack(imgs)
         return imgs
 
     def transform(self, results: Dict) -> Dict:
@@ -1252,7 +1459,8 @@ class DecordDecode(BaseTransform):
         return results
 
     def __repr__(self) -> str:
-        repr_str = f'{self.__class__.__name__}(mode={self.mode})'
+        repr_str = (f'{self.__class__.__name__}(mode={self.mode}, '
+                    f'contiguous={self.contiguous})')
         return repr_str
 
 
@@ -1266,12 +1474,25 @@ class OpenCVInit(BaseTransform):
     Args:
         io_backend (str): io backend where frames are store.
             Defaults to ``'disk'``.
+        reader_pool_size (int): Max number of video readers kept by each
+            worker and reused when the same video is loaded again. With a
+            non-disk ``io_backend``, the video of each pooled reader is kept
+            in the temporary folder until the reader is evicted. 0 means a
+            new reader is created for every call. Defaults to 0.
     """
 
-    def __init__(self, io_backend: str = 'disk', **kwargs) -> None:
+    def __init__(self,
+                 io_backend: str = 'disk',
+                 reader_pool_size: int = 0,
+                 **kwargs) -> None:
         self.io_backend = io_backend
+        self.reader_pool_size = reader_pool_size
         self.kwargs = kwargs
         self.file_client = None
+        self.reader_pool = None
+        if reader_pool_size > 0:
+            self.reader_pool = VideoReaderPool(
+                reader_pool_size, on_evict=self._remove_tmp_file)
         self.tmp_folder = None
         if self.io_backend != 'disk':
             random_string = get_random_string()
@@ -1287,24 +1508,44 @@ class OpenCVInit(BaseTransform):
             results (dict): The resulting dict to be modified and passed
                 to the next transform in pipeline.
         """
+        filename = results['filename']
+        if self.reader_pool is None:
+            new_path, container = self._open_video(filename)
+        else:
+            new_path, container = self.reader_pool.get(
+                filename, lambda: self._open_video(filename))
+        results['new_path'] = new_path
+        results['video_reader'] = container
+        results['total_frames'] = len(container)
+
+        return results
+
+    def _open_video(self, filename: str) -> tuple:
+        """Open the video and return its local path and reader."""
         if self.io_backend == 'disk':
-            new_path = results['filename']
+            new_path = filename
         else:
             if self.file_client is None:
                 self.file_client = FileClient(self.io_backend, **self.kwargs)
 
-            thread_id = get_thread_id()
-            # save the file of same thread at the same place
-            new_path = osp.join(self.tmp_folder, f'tmp_{thread_id}.mp4')
+            if self.reader_pool is None:
+                thread_id = get_thread_id()
+                # save the file of same thread at the same place
+                tmp_name = f'tmp_{thread_id}.mp4'
+            else:
+                # pooled readers keep their files, one per video
+                tmp_name = hashlib.md5(filename.encode()).hexdigest() + '.mp4'
+            new_path = osp.join(self.tmp_folder, tmp_name)
             with open(new_path, 'wb') as f:
-                f.write(self.file_client.get(results['filename']))
+                f.write(self.file_client.get(filename))
 
-        container = mmcv.VideoReader(new_path)
-        results['new_path'] = new_path
-        results['video_reader'] = container
-        results['total_frames'] = len(container)
+        return new_path, mmcv.VideoReader(new_path)
 
-        return results
+    def _remove_tmp_file(self, reader: tuple) -> None:
+        """Remove the temporary file of a reader evicted from the pool."""
+        new_path = reader[0]
+        if self.io_backend != 'disk' and osp.exists(new_path):
+            os.remove(new_path)
 
     def __del__(self):
         if self.tmp_folder and osp.exists(self.tmp_folder):
@@ -1312,7 +1553,8 @@ class OpenCVInit(BaseTransform):
 
     def __repr__(self):
         repr_str = (f'{self.__class__.__name__}('
-                    f'io_backend={self.io_backend})')
+                    f'io_backend={self.io_backend}, '
+                    f'reader_pool_size={self.reader_pool_size})')
         return repr_str
 
 
@@ -1382,26 +1624,46 @@ class RawFrameDecode(BaseTransform):
             Defaults to ``'disk'``.
         decoding_backend (str): Backend used for image decoding.
             Defaults to ``'cv2'``.
+        num_threads (int): Number of threads to fetch and decode the frames
+            of a clip concurrently. 0 means the frames are loaded one by one
+            in the calling thread. Defaults to 0.
+        share_duplicates (bool): Whether repeated frame indices share one
+            decoded array instead of getting a copy each. Only enable it if
+            no later transform modifies frames in place, e.g. ``Flip`` or
+            ``RandomErasing`` applied before any crop or resize.
+            Defaults to False.
+        contiguous (bool): Whether to write the frames into one contiguous
+            ``T x H x W x C`` array, the clip buffer, instead of returning a
+            list of arrays. Crops, resizes and flips then work on the buffer
+            and ``FormatShape`` only creates views of it. Defaults to False.
     """
 
     def __init__(self,
                  io_backend: str = 'disk',
                  decoding_backend: str = 'cv2',
+                 num_threads: int = 0,
+                 share_duplicates: bool = False,
+                 contiguous: bool = False,
                  **kwargs) -> None:
         self.io_backend = io_backend
         self.decoding_backend = decoding_backend
+        self.num_threads = num_threads
+        self.share_duplicates = share_duplicates
+        self.contiguous = contiguous
         self.kwargs = kwargs
         self.file_client = None
-
-    def transform(self, results: dict) -> dict:
-        """Perform the ``RawFrameDecode`` to pick frames given indices.
-
-        Args:
-            results (dict): The resulting dict to be modified and passed
-                to the next transform in pipeline.
-        """
-        mmcv.use_backend(self.decoding_backend)
-
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool, created lazily in each worker process."""
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(self.num_threads)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _get_frame_loader(self, results: dict) -> Callable[[int], np.ndarray]:
+        """Get the function to fetch and decode a frame by its index."""
         directory = results['frame_dir']
         filename_tmpl = results['filename_tmpl']
         modality = results['modality']
@@ -1409,42 +1671,70 @@ class RawFrameDecode(BaseTransform):
         if self.file_client is None:
             self.file_client = FileClient(self.io_backend, **self.kwargs)
 
-        imgs = list()
-
-        if results['frame_inds'].ndim != 1:
-            results['frame_inds'] = np.squeeze(results['frame_inds'])
-
-        offset = results.get('offset', 0)
-
-        cache = {}
-        for i, frame_idx in enumerate(results['frame_inds']):
-            # Avoid loading duplicated frames
-            if frame_idx in cache:
-                imgs.append(cp.deepcopy(imgs[cache[frame_idx]]))
-                continue
-            else:
-                cache[frame_idx] = i
-
-            frame_idx += offset
+        def load_frame(frame_idx):
             if modality == 'RGB':
                 filepath = osp.join(directory, filename_tmpl.format(frame_idx))
                 img_bytes = self.file_client.get(filepath)
                 # Get frame with channel order RGB directly.
-                cur_frame = mmcv.imfrombytes(img_bytes, channel_order='rgb')
-                imgs.append(cur_frame)
+                return mmcv.imfrombytes(img_bytes, channel_order='rgb')
             elif modality == 'Flow':
-                x_filepath = osp.join(directory,
-                                      filename_tmpl.format('flow_x', frame_idx))
-                y_filepath = osp.join(directory,
-                                      filename_tmpl.format('flow_y', frame_idx))
+                x_filepath = osp.join(
+                    directory, filename_tmpl.format('flow_x', frame_idx))
+                y_filepath = osp.join(
+                    directory, filename_tmpl.format('flow_y', frame_idx))
                 x_img_bytes = self.file_client.get(x_filepath)
                 x_frame = mmcv.imfrombytes(x_img_bytes, flag='grayscale')
                 y_img_bytes = self.file_client.get(y_filepath)
                 y_frame = mmcv.imfrombytes(y_img_bytes, flag='grayscale')
-                imgs.append(np.stack([x_frame, y_frame], axis=-1))
+                return np.stack([x_frame, y_frame], axis=-1)
             else:
                 raise NotImplementedError
 
+        return load_frame
+
+    def transform(self, results: dict) -> dict:
+        """Perform the ``RawFrameDecode`` to pick frames given indices.
+
+        Args:
+            results (dict): The resulting dict to be modified and passed
+                to the next transform in pipeline.
+        """
+        mmcv.use_backend(self.decoding_backend)
+
+        if results['frame_inds'].ndim != 1:
+            results['frame_inds'] = np.squeeze(results['frame_inds'])
+
+        offset = results.get('offset', 0)
+
+        # Avoid loading duplicated frames
+        cache = {}
+        unique_inds = []
+        for frame_idx in results['frame_inds']:
+            if frame_idx not in cache:
+                cache[frame_idx] = len(unique_inds)
+                unique_inds.append(frame_idx + offset)
+
+        load_frame = self._get_frame_loader(results)
+        if self.num_threads > 0 and len(unique_inds) > 1:
+            frames = list(self._get_executor().map(load_frame, unique_inds))
+        else:
+            frames = [load_frame(frame_idx) for frame_idx in unique_inds]
+
+        if self.contiguous:
+            imgs = np.empty((len(results['frame_inds']), ) + frames[0].shape,
+                            dtype=frames[0].dtype)
+            for img, frame_idx in zip(imgs, results['frame_inds']):
+                img[...] = frames[cache[frame_idx]]
+        else:
+            imgs = list()
+            loaded = set()
+            for frame_idx in results['frame_inds']:
+                frame = frames[cache[frame_idx]]
+                if frame_idx in loaded and not self.share_duplicates:
+                    frame = frame.copy()
+                loaded.add(frame_idx)
+                imgs.append(frame)
+
         results['imgs'] = imgs
         results['original_shape'] = imgs[0].shape[:2]
         results['img_shape'] = imgs[0].shape[:2]
@@ -1463,10 +1753,125 @@ class RawFrameDecode(BaseTransform):
 
         return results
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_executor_pid'] = None
+        return state
+
     def __repr__(self):
         repr_str = (f'{self.__class__.__name__}('
                     f'io_backend={self.io_backend}, '
-                    f'decoding_backend={self.decoding_backend})')
+                    f'decoding_backend={self.decoding_backend}, '
+                    f'num_threads={self.num_threads}, '
+                    f'share_duplicates={self.share_duplicates}, '
+                    f'contiguous={self.contiguous})')
+        return repr_str
+
+
+@TRANSFORMS.register_module()
+class PackedFrameDecode(RawFrameDecode):
+    """Load and decode frames with given indices from packed frame archives.
+
+    Each video is stored as a single archive file holding the encoded bytes
+    of all its frames, built by ``tools/data/build_rawframes.py`` with
+    ``--out-format packed``. The archive of a video is opened and
+    memory-mapped once per sample instead of opening one file per frame, and
+    closed after decoding, unless it is kept in the reader pool.
+
+    Required Keys:
+
+    - frame_dir
+    - frame_inds
+    - modality
+    - start_index (optional)
+    - offset (optional)
+
+    Added Keys:
+
+    - img
+    - img_shape
+    - original_shape
+
+    Args:
+        archive_ext (str): Extension appended to ``frame_dir`` to get the
+            path of the archive. Defaults to ``'.frames'``.
+        decoding_backend (str): Backend used for image decoding.
+            Defaults to ``'cv2'``.
+        num_threads (int): Number of threads to decode the frames of a clip
+            concurrently. Defaults to 0.
+        share_duplicates (bool): Whether repeated frame indices share one
+            decoded array. Defaults to False.
+        contiguous (bool): Whether to write the frames into one contiguous
+            clip buffer. Defaults to False.
+        reader_pool_size (int): Max number of opened archives kept by each
+            worker and reused when the same video is loaded again. 0 means
+            an archive is opened for every sample. Defaults to 0.
+    """
+
+    def __init__(self,
+                 archive_ext: str = FRAME_ARCHIVE_EXT,
+                 decoding_backend: str = 'cv2',
+                 num_threads: int = 0,
+                 share_duplicates: bool = False,
+                 contiguous: bool = False,
+                 reader_pool_size: int = 0) -> None:
+        super().__init__(
+            decoding_backend=decoding_backend,
+            num_threads=num_threads,
+            share_duplicates=share_duplicates,
+            contiguous=contiguous)
+        self.archive_ext = archive_ext
+        self.reader_pool_size = reader_pool_size
+        self.reader_pool = None
+        if reader_pool_size > 0:
+            self.reader_pool = VideoReaderPool(
+                reader_pool_size, on_evict=FrameArchiveReader.close)
+        # the archive opened for the current sample, outside the pool
+        self._reader = None
+
+    def _get_frame_loader(self, results: dict) -> Callable[[int], np.ndarray]:
+        """Get the function to decode a frame from the archive by index."""
+        if results['modality'] != 'RGB':
+            raise NotImplementedError(
+                'PackedFrameDecode only supports RGB frames')
+        archive_path = results['frame_dir'] + self.archive_ext
+        if self.reader_pool is None:
+            reader = self._reader = FrameArchiveReader(archive_path)
+        else:
+            reader = self.reader_pool.get(
+                archive_path, lambda: FrameArchiveReader(archive_path))
+        # frames are stored from the first one, whose index is start_index
+        start_index = results.get('start_index', 1)
+
+        def load_frame(frame_idx):
+            img_bytes = reader.get(frame_idx - start_index)
+            return mmcv.imfrombytes(img_bytes, channel_order='rgb')
+
+        return load_frame
+
+    def transform(self, results: dict) -> dict:
+        """Perform the ``PackedFrameDecode`` to pick frames given indices.
+
+        Args:
+            results (dict): The resulting dict to be modified and passed
+                to the next transform in pipeline.
+        """
+        try:
+            return super().transform(results)
+        finally:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def __repr__(self):
+        repr_str = (f'{self.__class__.__name__}('
+                    f'archive_ext={self.archive_ext}, '
+                    f'decoding_backend={self.decoding_backend}, '
+                    f'num_threads={self.num_threads}, '
+                    f'share_duplicates={self.share_duplicates}, '
+                    f'contiguous={self.contiguous}, '
+                    f'reader_pool_size={self.reader_pool_size})')
         return repr_str
 
 
@@ -1817,6 +2222,42 @@ class LoadLocalizationFeature(BaseTransform):
         return repr_str
 
 
+@TRANSFORMS.register_module()
+class LoadPackedLocalizationFeature(BaseTransform):
+    """Load video features for localizer from a packed feature store.
+
+    The store is a directory holding the features of all videos in one
+    memory-mapped file, built by
+    ``tools/data/activitynet/pack_localization_features.py``. Features are
+    stored with shape (feat_dim, temporal_dim), so the loaded "raw_feature"
+    is a zero-copy view of the mapping instead of a parsed text file.
+
+    Required key is "video_name", added or modified key is "raw_feature".
+
+    Args:
+        store_path (str): Directory of the packed feature store.
+    """
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self.reader = PackedArrayReader(store_path)
+
+    def transform(self, results):
+        """Perform the LoadPackedLocalizationFeature loading.
+
+        Args:
+            results (dict): The resulting dict to be modified and passed
+                to the next transform in pipeline.
+        """
+        results['raw_feature'] = self.reader[results['video_name']]
+        return results
+
+    def __repr__(self):
+        repr_str = (f'{self.__class__.__name__}('
+                    f'store_path={self.store_path})')
+        return repr_str
+
+
 @TRANSFORMS.register_module()
 class GenerateLocalizationLabels(BaseTransform):
     """Load video label for localizer with given video_name list.
@@ -14,6 +14,13 @@ from torch.nn.modules.utils import _pair
 
 from mmaction.registry import TRANSFORMS
 
+_CV2_INTERP_CODES = {
+    'nearest': cv2.INTER_NEAREST,
+    'bilinear': cv2.INTER_LINEAR,
+    'bicubic': cv2.INTER_CUBIC,
+    'lanczos': cv2.INTER_LANCZOS4
+}
+
 
 def _combine_quadruple(a, b):
     return a[0] + a[2] * b[0], a[1] + a[3] * b[1], a[2] * b[2], a[3] * b[3]
@@ -57,6 +64,63 @@ def _init_lazy_if_proper(results, lazy):
         assert 'lazy' not in results, 'Use Fuse after lazy operations'
 
 
+def _lazy_crop(lazyop, crop_bbox, img_shape):
+    """Compose a crop into the lazy operation.
+
+    The crop is recorded as a bbox of the original images, so that the
+    images are only cropped once in ``Fuse``. A crop of flipped images is
+    mapped back to the unflipped ones, as the flip is applied last.
+
+    Args:
+        lazyop (dict): The lazy operation, whose "crop_bbox" is modified.
+        crop_bbox (np.ndarray): The crop bbox in the current images.
+        img_shape (tuple[int]): The current image shape before cropping.
+    """
+    img_h, img_w = img_shape
+    left, top, right, bottom = crop_bbox
+    if lazyop['flip']:
+        if lazyop['flip_direction'] == 'horizontal':
+            left, right = img_w - right, img_w - left
+        else:
+            top, bottom = img_h - bottom, img_h - top
+
+    lazy_left, lazy_top, lazy_right, lazy_bottom = lazyop['crop_bbox']
+    left = left * (lazy_right - lazy_left) / img_w
+    right = right * (lazy_right - lazy_left) / img_w
+    top = top * (lazy_bottom - lazy_top) / img_h
+    bottom = bottom * (lazy_bottom - lazy_top) / img_h
+    lazyop['crop_bbox'] = np.array([(lazy_left + left), (lazy_top + top),
+                                    (lazy_left + right), (lazy_top + bottom)],
+                                   dtype=np.float32)
+
+
+def _map_frames(func, imgs, out_shape):
+    """Apply ``func`` to each frame.
+
+    A list of frames gives a list of the outputs. Frames stacked in one clip
+    buffer, a ``T x H x W x C`` array, give a new clip buffer, which ``func``
+    writes into through its ``out`` argument when the backend supports it.
+
+    Args:
+        func (callable): Called as ``func(img, out)`` with a frame and its
+            output slot, or None for a list of frames.
+        imgs (list[np.ndarray] | np.ndarray): The frames.
+        out_shape (tuple[int]): (h, w) of the outputs.
+
+    Returns:
+        list[np.ndarray] | np.ndarray: The outputs.
+    """
+    if not isinstance(imgs, np.ndarray):
+        return [func(img, None) for img in imgs]
+    out = np.empty((len(imgs), ) + tuple(out_shape) + imgs.shape[3:],
+                   dtype=imgs.dtype)
+    for img, slot in zip(imgs, out):
+        result = func(img, slot)
+        if not np.shares_memory(result, slot):
+            slot[...] = result.reshape(slot.shape)
+    return out
+
+
 @TRANSFORMS.register_module()
 class Fuse(BaseTransform):
     """Fuse lazy operations.
@@ -64,11 +128,39 @@ class Fuse(BaseTransform):
     Fusion order:
         crop -> resize -> flip
 
+    The crop, resize and flip are composed into one affine transform, so each
+    output image is produced by a single ``cv2.warpAffine`` from the original
+    image, without intermediate copies. A crop without resizing only slices
+    the images, which gives a view of a clip buffer.
+
     Required keys are "imgs", "img_shape" and "lazy", added or modified keys
     are "imgs", "lazy".
     Required keys in "lazy" are "crop_bbox", "interpolation", "flip_direction".
     """
 
+    @staticmethod
+    def _affine_matrix(crop_bbox, img_shape, flip, flip_direction):
+        """Get the matrix mapping the output pixels to the input pixels.
+
+        The pixel centers are aligned the same way as ``cv2.resize``.
+        """
+        left, top, right, bottom = crop_bbox
+        img_h, img_w = img_shape
+        scale_x = (right - left) / img_w
+        scale_y = (bottom - top) / img_h
+        matrix = np.array([[scale_x, 0, left + 0.5 * scale_x - 0.5],
+                           [0, scale_y, top + 0.5 * scale_y - 0.5]],
+                          dtype=np.float64)
+        if flip:
+            # map the output coordinate v to (size - 1 - v) before scaling
+            if flip_direction == 'horizontal':
+                row, size = 0, img_w
+            else:
+                row, size = 1, img_h
+            matrix[row, 2] += matrix[row, row] * (size - 1)
+            matrix[row, row] *= -1
+        return matrix
+
     def transform(self, results):
         """Fuse lazy operations.
 
@@ -81,25 +173,55 @@ class Fuse(BaseTransform):
         lazyop = results['lazy']
         imgs = results['imgs']
 
-        # crop
-        left, top, right, bottom = lazyop['crop_bbox'].round().astype(int)
-        imgs = [img[top:bottom, left:right] for img in imgs]
-
-        # resize
+        crop_bbox = lazyop['crop_bbox'].round().astype(int)
+        left, top, right, bottom = crop_bbox
         img_h, img_w = results['img_shape']
+        flip, flip_direction = lazyop['flip'], lazyop['flip_direction']
         if lazyop['interpolation'] is None:
             interpolation = 'bilinear'
         else:
             interpolation = lazyop['interpolation']
-        imgs = [
-            mmcv.imresize(img, (img_w, img_h), interpolation=interpolation)
-            for img in imgs
-        ]
 
-        # flip
-        if lazyop['flip']:
-            for img in imgs:
-                mmcv.imflip_(img, lazyop['flip_direction'])
+        if (right - left, bottom - top) == (img_w, img_h):
+            # crop only
+            if isinstance(imgs, np.ndarray):
+                imgs = imgs[:, top:bottom, left:right]
+                if flip:
+                    axis = 2 if flip_direction == 'horizontal' else 1
+                    imgs = np.ascontiguousarray(np.flip(imgs, axis))
+            else:
+                imgs = [img[top:bottom, left:right] for img in imgs]
+                if flip:
+                    imgs = [
+                        np.ascontiguousarray(mmcv.imflip(img, flip_direction))
+                        for img in imgs
+                    ]
+        elif interpolation not in _CV2_INTERP_CODES:
+            # area interpolation is not supported by ``cv2.warpAffine``
+            imgs = _map_frames(
+                lambda img, out: mmcv.imresize(
+                    img[top:bottom, left:right], (img_w, img_h),
+                    interpolation=interpolation,
+                    out=out), imgs, (img_h, img_w))
+            if flip:
+                for img in imgs:
+                    mmcv.imflip_(img, flip_direction)
+        else:
+            matrix = self._affine_matrix(crop_bbox, (img_h, img_w), flip,
+                                         flip_direction)
+            flags = _CV2_INTERP_CODES[interpolation] | cv2.WARP_INVERSE_MAP
+            imgs = _map_frames(
+                lambda img, out: cv2.warpAffine(
+                    img,
+                    matrix, (img_w, img_h),
+                    dst=out,
+                    flags=flags,
+                    borderMode=cv2.BORDER_REPLICATE), imgs, (img_h, img_w))
+
+        if flip and results.get('modality') == 'Flow':
+            # The 1st frame of each 2 frames is flow-x
+            for i in range(0, len(imgs), 2):
+                imgs[i] = mmcv.iminvert(imgs[i])
 
         results['imgs'] = imgs
         del results['lazy']
@@ -134,8 +256,13 @@ class RandomCrop(BaseTransform):
 
     @staticmethod
     def _crop_imgs(imgs, crop_bbox):
-        """Static method for cropping images."""
+        """Static method for cropping images.
+
+        A clip buffer is cropped to a view of it.
+        """
         x1, y1, x2, y2 = crop_bbox
+        if isinstance(imgs, np.ndarray):
+            return imgs[:, y1:y2, x1:x2]
         return [img[y1:y2, x1:x2] for img in imgs]
 
     @staticmethod
@@ -226,21 +353,7 @@ class RandomCrop(BaseTransform):
             if 'imgs' in results:
                 results['imgs'] = self._crop_imgs(results['imgs'], crop_bbox)
         else:
-            lazyop = results['lazy']
-            if lazyop['flip']:
-                raise NotImplementedError('Put Flip at last for now')
-
-            # record crop_bbox in lazyop dict to ensure only crop once in Fuse
-            lazy_left, lazy_top, lazy_right, lazy_bottom = lazyop['crop_bbox']
-            left = x_offset * (lazy_right - lazy_left) / img_w
-            right = (x_offset + new_w) * (lazy_right - lazy_left) / img_w
-            top = y_offset * (lazy_bottom - lazy_top) / img_h
-            bottom = (y_offset + new_h) * (lazy_bottom - lazy_top) / img_h
-            lazyop['crop_bbox'] = np.array([(lazy_left + left),
-                                            (lazy_top + top),
-                                            (lazy_left + right),
-                                            (lazy_top + bottom)],
-                                           dtype=np.float32)
+            _lazy_crop(results['lazy'], crop_bbox, (img_h, img_w))
 
         # Process entity boxes
         if 'gt_bboxes' in results:
@@ -385,21 +498,7 @@ class RandomResizedCrop(RandomCrop):
             if 'imgs' in results:
                 results['imgs'] = self._crop_imgs(results['imgs'], crop_bbox)
         else:
-            lazyop = results['lazy']
-            if lazyop['flip']:
-                raise NotImplementedError('Put Flip at last for now')
-
-            # record crop_bbox in lazyop dict to ensure only crop once in Fuse
-            lazy_left, lazy_top, lazy_right, lazy_bottom = lazyop['crop_bbox']
-            left = left * (lazy_right - lazy_left) / img_w
-            right = right * (lazy_right - lazy_left) / img_w
-            top = top * (lazy_bottom - lazy_top) / img_h
-            bottom = bottom * (lazy_bottom - lazy_top) / img_h
-            lazyop['crop_bbox'] = np.array([(lazy_left + left),
-                                            (lazy_top + top),
-                                            (lazy_left + right),
-                                            (lazy_top + bottom)],
-                                           dtype=np.float32)
+            _lazy_crop(results['lazy'], crop_bbox, (img_h, img_w))
 
         if 'gt_bboxes' in results:
             assert not self.lazy
@@ -562,21 +661,7 @@ class MultiScaleCrop(RandomCrop):
             if 'imgs' in results:
                 results['imgs'] = self._crop_imgs(results['imgs'], crop_bbox)
         else:
-            lazyop = results['lazy']
-            if lazyop['flip']:
-                raise NotImplementedError('Put Flip at last for now')
-
-            # record crop_bbox in lazyop dict to ensure only crop once in Fuse
-            lazy_left, lazy_top, lazy_right, lazy_bottom = lazyop['crop_bbox']
-            left = x_offset * (lazy_right - lazy_left) / img_w
-            right = (x_offset + new_w) * (lazy_right - lazy_left) / img_w
-            top = y_offset * (lazy_bottom - lazy_top) / img_h
-            bottom = (y_offset + new_h) * (lazy_bottom - lazy_top) / img_h
-            lazyop['crop_bbox'] = np.array([(lazy_left + left),
-                                            (lazy_top + top),
-                                            (lazy_left + right),
-                                            (lazy_top + bottom)],
-                                           dtype=np.float32)
+            _lazy_crop(results['lazy'], crop_bbox, (img_h, img_w))
 
         if 'gt_bboxes' in results:
             assert not self.lazy
@@ -642,12 +727,11 @@ class Resize(BaseTransform):
         self.lazy = lazy
 
     def _resize_imgs(self, imgs, new_w, new_h):
-        """Static method for resizing keypoint."""
-        return [
-            mmcv.imresize(
-                img, (new_w, new_h), interpolation=self.interpolation)
-            for img in imgs
-        ]
+        """Resize the images, into a new clip buffer for a clip buffer."""
+        return _map_frames(
+            lambda img, out: mmcv.imresize(
+                img, (new_w, new_h), interpolation=self.interpolation,
+                out=out), imgs, (new_h, new_w))
 
     @staticmethod
     def _resize_kps(kps, scale_factor):
@@ -703,10 +787,7 @@ class Resize(BaseTransform):
                 results['keypoint'] = self._resize_kps(results['keypoint'],
                                                        self.scale_factor)
         else:
-            lazyop = results['lazy']
-            if lazyop['flip']:
-                raise NotImplementedError('Put Flip at last for now')
-            lazyop['interpolation'] = self.interpolation
+            results['lazy']['interpolation'] = self.interpolation
 
         if 'gt_bboxes' in results:
             assert not self.lazy
@@ -741,9 +822,10 @@ class RandomRescale(BaseTransform):
             interval.
         interpolation (str): Algorithm used for interpolation:
             "nearest" | "bilinear". Default: "bilinear".
+        lazy (bool): Determine whether to apply lazy operation. Default: False.
     """
 
-    def __init__(self, scale_range, interpolation='bilinear'):
+    def __init__(self, scale_range, interpolation='bilinear', lazy=False):
         self.scale_range = scale_range
         # make sure scale_range is legal, first make sure the type is OK
         assert mmengine.is_tuple_of(scale_range, int)
@@ -753,6 +835,7 @@ class RandomRescale(BaseTransform):
 
         self.keep_ratio = True
         self.interpolation = interpolation
+        self.lazy = lazy
 
     def transform(self, results):
         """Performs the Resize augmentation.
@@ -766,7 +849,7 @@ class RandomRescale(BaseTransform):
         resize = Resize((-1, short_edge),
                         keep_ratio=True,
                         interpolation=self.interpolation,
-                        lazy=False)
+                        lazy=self.lazy)
         results = resize(results)
 
         results['short_edge'] = short_edge
@@ -776,7 +859,8 @@ class RandomRescale(BaseTransform):
         scale_range = self.scale_range
         repr_str = (f'{self.__class__.__name__}('
                     f'scale_range=({scale_range[0]}, {scale_range[1]}), '
-                    f'interpolation={self.interpolation})')
+                    f'interpolation={self.interpolation}, '
+                    f'lazy={self.lazy})')
         return repr_str
 
 
@@ -905,10 +989,15 @@ class Flip(BaseTransform):
                         results['keypoint_score'] = kpscore
         else:
             lazyop = results['lazy']
-            if lazyop['flip']:
-                raise NotImplementedError('Use one Flip please')
-            lazyop['flip'] = flip
-            lazyop['flip_direction'] = self.direction
+            if not lazyop['flip']:
+                lazyop['flip'] = flip
+                lazyop['flip_direction'] = self.direction
+            elif flip:
+                if lazyop['flip_direction'] != self.direction:
+                    raise NotImplementedError(
+                        'Flips of different directions are not supported')
+                # two flips of the same direction cancel out
+                lazyop['flip'] = False
 
         if 'gt_bboxes' in results and flip:
             assert not self.lazy and self.direction == 'horizontal'
@@ -1104,21 +1193,7 @@ class CenterCrop(RandomCrop):
             if 'imgs' in results:
                 results['imgs'] = self._crop_imgs(results['imgs'], crop_bbox)
         else:
-            lazyop = results['lazy']
-            if lazyop['flip']:
-                raise NotImplementedError('Put Flip at last for now')
-
-            # record crop_bbox in lazyop dict to ensure only crop once in Fuse
-            lazy_left, lazy_top, lazy_right, lazy_bottom = lazyop['crop_bbox']
-            left = left * (lazy_right - lazy_left) / img_w
-            right = right * (lazy_right - lazy_left) / img_w
-            top = top * (lazy_bottom - lazy_top) / img_h
-            bottom = bottom * (lazy_bottom - lazy_top) / img_h
-            lazyop['crop_bbox'] = np.array([(lazy_left + left),
-                                            (lazy_top + top),
-                                            (lazy_left + right),
-                                            (lazy_top + bottom)],
-                                           dtype=np.float32)
+            _lazy_crop(results['lazy'], crop_bbox, (img_h, img_w))
 
         if 'gt_bboxes' in results:
             assert not self.lazy
@@ -1,9 +1,17 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import hashlib
+import json
+import os
+import os.path as osp
+import pickle
 import random
+import warnings
+from typing import Callable, Dict, List, Optional, Union
 
 import mmengine
 import numpy as np
 from mmcv.transforms import BaseTransform, to_tensor
+from mmengine.dataset import Compose
 from mmengine.utils import digit_version
 
 from mmaction.registry import TRANSFORMS
@@ -378,3 +386,196 @@ class ImgAug(BaseTransform):
         results['img_shape'] = (img_h, img_w)
 
         return results
+
+
+@TRANSFORMS.register_module()
+class CacheDecodedClip(BaseTransform):
+    """Cache the clips produced by a decoding sub-pipeline.
+
+    The wrapped transforms, typically the video init, decode and resize
+    transforms of a validation or test pipeline, are only run on a cache
+    miss. Their outputs are stored in ``cache_dir``, keyed by the filename,
+    the frame indices and the config of the wrapped transforms, so later
+    passes over the same clips, e.g. repeated validation with the fixed
+    offsets of ``SampleFrames`` in test mode, skip decoding entirely.
+
+    The cache is shared by all dataloader workers through the file system.
+    It is bounded by ``max_bytes``: each process keeps a running total of the
+    cache size, and every ``scan_interval`` writes, or once the total exceeds
+    ``max_bytes``, measures the directory, so the writes of all workers count
+    towards the bound, and evicts the least recently used clips. The cache
+    may exceed the bound by ``scan_interval`` clips per worker in between.
+    Only wrap deterministic transforms: random crops or flips inside the
+    wrapper would be frozen to their first outcome.
+
+    The cache is not removed when the job ends, so that later jobs can reuse
+    it. If a clip can not be written, e.g. when the disk is full, a warning
+    is given and caching is disabled for the process.
+
+    The transforms should be given as config dicts, which make up the cache
+    key. Other callables are only keyed by their qualified name, so their
+    arguments are not told apart.
+
+    Required Keys:
+
+    - filename or frame_dir
+    - frame_inds
+
+    Added Keys:
+
+    - The keys added or modified by the wrapped transforms.
+
+    Args:
+        transforms (list[dict | callable]): The transforms whose outputs
+            are cached.
+        cache_dir (str): Directory of the cache, e.g. under the work
+            directory. Shared memory such as ``/dev/shm`` is only suitable
+            if it is larger than ``max_bytes``.
+        max_bytes (int): Max total size of the cached clips in bytes.
+            Defaults to 8 GiB.
+        scan_interval (int): The number of writes between measurements of
+            the cache directory. Defaults to 64.
+    """
+
+    def __init__(self,
+                 transforms: List[Union[dict, Callable]],
+                 cache_dir: str,
+                 max_bytes: int = 8 * 1024**3,
+                 scan_interval: int = 64) -> None:
+        assert scan_interval > 0
+        self.transforms = Compose(transforms)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.scan_interval = scan_interval
+        os.makedirs(cache_dir, exist_ok=True)
+        self._config_key = self._get_config_key(transforms)
+        # the cache size at the last measurement, plus the later writes of
+        # this process
+        self._cached_size = None
+        self._num_writes = 0
+        self._disabled = False
+
+    @staticmethod
+    def _get_config_key(transforms: List[Union[dict, Callable]]) -> str:
+        """Get a key of the wrapped transforms which is stable across runs
+        and processes, unlike the default repr of objects."""
+        configs = []
+        for transform in transforms:
+            if isinstance(transform, dict):
+                configs.append(transform)
+            else:
+                warnings.warn(
+                    f'{transform} is not a config dict, so it is only '
+                    'identified by its name in the key of the clip cache')
+                if not hasattr(transform, '__qualname__'):
+                    transform = type(transform)
+                configs.append(
+                    f'{transform.__module__}.{transform.__qualname__}')
+        return json.dumps(configs, sort_keys=True, default=str)
+
+    def _cache_path(self, results: Dict) -> str:
+        hasher = hashlib.sha1(self._config_key.encode())
+        filename = results.get('filename', results.get('frame_dir'))
+        hasher.update(str(filename).encode())
+        frame_inds = np.ascontiguousarray(results['frame_inds'])
+        hasher.update(str(frame_inds.dtype).encode())
+        hasher.update(frame_inds.tobytes())
+        return osp.join(self.cache_dir, f'{hasher.hexdigest()}.pkl')
+
+    def _load(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path, 'rb') as f:
+                cached = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            # missing, evicted by another worker or not completely written
+            return None
+        # mark the clip as recently used
+        os.utime(path)
+        return cached
+
+    def _dump(self, path: str, cached: Dict) -> None:
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            size = osp.getsize(path)
+        except OSError as e:
+            if osp.exists(tmp_path):
+                os.remove(tmp_path)
+            warnings.warn(f'Failed to write the clip cache in '
+                          f'{self.cache_dir}: {e}. Caching is disabled.')
+            self._disabled = True
+            return
+
+        self._num_writes += 1
+        if self._cached_size is not None:
+            self._cached_size += size
+        if self._cached_size is None or \
+                self._cached_size > self.max_bytes or \
+                self._num_writes % self.scan_interval == 0:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Measure the clips written by all processes, and remove the least
+        recently used ones until the cache fits."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pkl'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(entry[1] for entry in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._cached_size = total
+
+    def transform(self, results: Dict) -> Optional[Dict]:
+        """Load the outputs of the wrapped transforms from the cache, or run
+        them and cache their outputs.
+
+        Args:
+            results (dict): The result dict.
+
+        Returns:
+            dict: The result dict.
+        """
+        if self._disabled:
+            return self.transforms(results)
+        path = self._cache_path(results)
+        cached = self._load(path)
+        if cached is not None:
+            results.update(cached)
+            return results
+
+        inputs = dict(results)
+        results = self.transforms(results)
+        if results is None:
+            return None
+        cached = {
+            key: value
+            for key, value in results.items()
+            if key not in inputs or value is not inputs[key]
+        }
+        # open readers can not be stored and are not needed downstream
+        cached.pop('video_reader', None)
+        if 'imgs' in cached and isinstance(cached['imgs'], list):
+            cached['imgs'] = [np.ascontiguousarray(x) for x in cached['imgs']]
+        self._dump(path, cached)
+        return results
+
+    def __repr__(self) -> str:
+        repr_str = (f'{self.__class__.__name__}('
+                    f'transforms={self.transforms}, '
+                    f'cache_dir={self.cache_dir}, '
+                    f'max_bytes={self.max_bytes}, '
+                    f'scan_interval={self.scan_interval})')
+        return repr_str
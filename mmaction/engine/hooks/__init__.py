@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .label_cache_hook import LabelCacheHook
 from .output import OutputHook
 from .visualization_hook import VisualizationHook
 
-__all__ = ['OutputHook', 'VisualizationHook']
+__all__ = ['LabelCacheHook', 'OutputHook', 'VisualizationHook']
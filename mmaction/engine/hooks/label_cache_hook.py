@@ -0,0 +1,52 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from mmengine.dist import all_gather_object, get_world_size, is_main_process
+from mmengine.hooks import Hook
+from mmengine.model import is_model_wrapper
+from mmengine.runner import Runner
+
+from mmaction.registry import HOOKS
+
+
+@HOOKS.register_module()
+class LabelCacheHook(Hook):
+    """Save the training label cache of a localizer after the first epoch.
+
+    The localizer caches the labels of the videos seen in training, e.g.
+    ``BMN`` with ``label_cache_file``. After the first training epoch of a
+    run the caches of all ranks are merged and saved to the
+    ``label_cache_file`` of the model, so that later runs load the labels
+    instead of generating them again. Models without ``label_cache_file``
+    are skipped.
+
+    Example:
+        >>> model = dict(
+        >>>     type='BMN', label_cache_file='work_dirs/bmn_labels.pth', ...)
+        >>> custom_hooks = [dict(type='LabelCacheHook')]
+    """
+
+    priority = 'LOW'
+
+    def __init__(self) -> None:
+        self._saved = False
+
+    def after_train_epoch(self, runner: Runner) -> None:
+        """Merge and save the label cache after the first epoch.
+
+        Args:
+            runner (Runner): The runner of the training process.
+        """
+        if self._saved:
+            return
+        self._saved = True
+        model = runner.model
+        if is_model_wrapper(model):
+            model = model.module
+        if getattr(model, 'label_cache_file', None) is None:
+            return
+
+        if get_world_size() > 1:
+            # each rank only caches the labels of its own samples
+            for label_cache in all_gather_object(model._label_cache):
+                model._label_cache.update(label_cache)
+        if is_main_process():
+            model.dump_label_cache(model.label_cache_file)
@@ -1,6 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .accuracy import (average_precision_at_temporal_iou,
-                       average_recall_at_avg_proposals, confusion_matrix,
+                       average_recall_at_avg_proposals,
+                       average_recall_at_avg_proposals_flat, confusion_matrix,
                        get_weighted_score, interpolated_precision_recall,
                        mean_average_precision, mean_class_accuracy,
                        mmit_mean_average_precision, pairwise_temporal_iou,
@@ -12,7 +13,8 @@ from .multisports_utils import frameAP, link_tubes, videoAP, videoAP_all
 __all__ = [
     'top_k_accuracy', 'mean_class_accuracy', 'confusion_matrix',
     'mean_average_precision', 'get_weighted_score',
-    'average_recall_at_avg_proposals', 'pairwise_temporal_iou',
+    'average_recall_at_avg_proposals', 'average_recall_at_avg_proposals_flat',
+    'pairwise_temporal_iou',
     'average_precision_at_temporal_iou', 'ActivityNetLocalization', 'softmax',
     'interpolated_precision_recall', 'mmit_mean_average_precision',
     'top_k_classes', 'read_labelmap', 'ava_eval', 'results2csv', 'frameAP',
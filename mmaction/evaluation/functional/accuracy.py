@@ -337,51 +337,111 @@ def average_recall_at_avg_proposals(ground_truth,
             under ``AR@AN`` curve.
     """
 
-    total_num_videos = len(ground_truth)
+    gt_segments, gt_counts = [], []
+    proposal_list, proposal_counts = [], []
+    for video_id in ground_truth:
+        this_video_ground_truth = np.asarray(
+            ground_truth[video_id])[..., :2].reshape(-1, 2)
+        this_video_proposals = np.asarray(
+            proposals[video_id])[..., :3].reshape(-1, 3)
+        gt_segments.append(this_video_ground_truth)
+        gt_counts.append(len(this_video_ground_truth))
+        proposal_list.append(this_video_proposals)
+        proposal_counts.append(len(this_video_proposals))
+
+    return average_recall_at_avg_proposals_flat(
+        np.concatenate(gt_segments),
+        np.cumsum([0] + gt_counts),
+        np.concatenate(proposal_list),
+        np.cumsum([0] + proposal_counts),
+        total_num_proposals,
+        max_avg_proposals=max_avg_proposals,
+        temporal_iou_thresholds=temporal_iou_thresholds)
+
+
+def average_recall_at_avg_proposals_flat(gt_segments,
+                                         gt_offsets,
+                                         proposals,
+                                         proposal_offsets,
+                                         total_num_proposals=None,
+                                         max_avg_proposals=None,
+                                         temporal_iou_thresholds=np.linspace(
+                                             0.5, 0.95, 10)):
+    """Flattened version of :func:`average_recall_at_avg_proposals`.
+
+    The ground truths and proposals of all videos are stored in flat tables,
+    with the rows of the i-th video in ``offsets[i]:offsets[i + 1]``. The
+    temporal iou of all (ground truth, retrieved proposal) pairs is computed
+    at once, so there is no Python loop over the videos.
+
+    Args:
+        gt_segments (np.ndarray): ``[init, end]`` of the ground truths of
+            all videos in shape (N, 2).
+        gt_offsets (np.ndarray): Offsets of the ground truths of each video
+            in shape (num_videos + 1, ).
+        proposals (np.ndarray): ``[init, end, score]`` of the proposals of
+            all videos in shape (M, 3).
+        proposal_offsets (np.ndarray): Offsets of the proposals of each
+            video in shape (num_videos + 1, ).
+        total_num_proposals (int | None): Total number of proposals.
+            Default: None, which means ``M``.
+        max_avg_proposals (int | None): Max number of proposals for one video.
+            Default: None.
+        temporal_iou_thresholds (np.ndarray): 1D array with temporal_iou
+            thresholds. Default: ``np.linspace(0.5, 0.95, 10)``.
+
+    Returns:
+        tuple([np.ndarray, np.ndarray, np.ndarray, float]):
+            (recall, average_recall, proposals_per_video, auc), the same as
+            :func:`average_recall_at_avg_proposals`.
+    """
+    gt_offsets = np.asarray(gt_offsets, dtype=np.int64)
+    proposal_offsets = np.asarray(proposal_offsets, dtype=np.int64)
+    proposals = np.asarray(proposals).reshape(-1, 3)
+    total_num_videos = len(gt_offsets) - 1
+    if total_num_proposals is None:
+        total_num_proposals = len(proposals)
 
     if not max_avg_proposals:
         max_avg_proposals = float(total_num_proposals) / total_num_videos
 
     ratio = (max_avg_proposals * float(total_num_videos) / total_num_proposals)
 
-    # For each video, compute temporal_iou scores among the retrieved proposals
-    score_list = []
-    total_num_retrieved_proposals = 0
-    for video_id in ground_truth:
-        # Get proposals for this video.
-        proposals_video_id = proposals[video_id]
-        this_video_proposals = proposals_video_id[:, :2]
-        # Sort proposals by score.
-        sort_idx = proposals_video_id[:, 2].argsort()[::-1]
-        this_video_proposals = this_video_proposals[sort_idx, :].astype(
-            np.float32)
-
-        # Get ground-truth instances associated to this video.
-        ground_truth_video_id = ground_truth[video_id]
-        this_video_ground_truth = ground_truth_video_id[:, :2].astype(
-            np.float32)
-        if this_video_proposals.shape[0] == 0:
-            n = this_video_ground_truth.shape[0]
-            score_list.append(np.zeros((n, 1)))
-            continue
-
-        if this_video_proposals.ndim != 2:
-            this_video_proposals = np.expand_dims(this_video_proposals, axis=0)
-        if this_video_ground_truth.ndim != 2:
-            this_video_ground_truth = np.expand_dims(
-                this_video_ground_truth, axis=0)
-
-        num_retrieved_proposals = np.minimum(
-            int(this_video_proposals.shape[0] * ratio),
-            this_video_proposals.shape[0])
-        total_num_retrieved_proposals += num_retrieved_proposals
-        this_video_proposals = this_video_proposals[:
-                                                    num_retrieved_proposals, :]
-
-        # Compute temporal_iou scores.
-        t_iou = pairwise_temporal_iou(this_video_proposals,
-                                      this_video_ground_truth)
-        score_list.append(t_iou)
+    gt_counts = np.diff(gt_offsets)
+    proposal_counts = np.diff(proposal_offsets)
+    gt_videos = np.repeat(np.arange(total_num_videos), gt_counts)
+    proposal_videos = np.repeat(np.arange(total_num_videos), proposal_counts)
+
+    # Sort proposals by score in each video, the later one first among ties.
+    sort_idx = np.lexsort((-np.arange(len(proposals)), -proposals[:, 2],
+                           proposal_videos))
+    sorted_proposals = proposals[sort_idx, :2].astype(np.float32)
+    gt_segments = np.asarray(gt_segments)[:, :2].astype(np.float32)
+
+    num_retrieved = np.minimum((proposal_counts * ratio).astype(np.int64),
+                               proposal_counts)
+    total_num_retrieved_proposals = num_retrieved.sum()
+
+    # Enumerate the (ground truth, retrieved proposal) pairs of each video,
+    # ordered by ground truth, then by rank of the proposal.
+    pair_counts = num_retrieved[gt_videos]
+    pair_gts = np.repeat(np.arange(len(gt_segments)), pair_counts)
+    pair_ranks = np.arange(pair_counts.sum()) - np.repeat(
+        np.cumsum(pair_counts) - pair_counts, pair_counts)
+    pair_proposals = proposal_offsets[gt_videos[pair_gts]] + pair_ranks
+
+    candidates = sorted_proposals[pair_proposals]
+    targets = gt_segments[pair_gts]
+    tt1 = np.maximum(candidates[:, 0], targets[:, 0])
+    tt2 = np.minimum(candidates[:, 1], targets[:, 1])
+    # Intersection including Non-negative overlap score.
+    segments_intersection = (tt2 - tt1).clip(0)
+    # Segment union.
+    segments_union = ((targets[:, 1] - targets[:, 0]) +
+                      (candidates[:, 1] - candidates[:, 0]) -
+                      segments_intersection)
+    t_iou = (segments_intersection.astype(float) / segments_union).astype(
+        np.float32)
 
     # Given that the length of the videos is really varied, we
     # compute the number of proposals in terms of a ratio of the total
@@ -392,31 +452,21 @@ def average_recall_at_avg_proposals(ground_truth,
     pcn_list = np.arange(1, 101) / 100.0 * (
         max_avg_proposals * float(total_num_videos) /
         total_num_retrieved_proposals)
-    matches = np.empty((total_num_videos, pcn_list.shape[0]))
-    positives = np.empty(total_num_videos)
+    # Get number of proposals as a percentage of total retrieved.
+    pcn_proposals = np.minimum(
+        (num_retrieved[:, None] * pcn_list).astype(np.int32),
+        num_retrieved[:, None])
     recall = np.empty((temporal_iou_thresholds.shape[0], pcn_list.shape[0]))
     # Iterates over each temporal_iou threshold.
     for ridx, temporal_iou in enumerate(temporal_iou_thresholds):
-        # Inspect positives retrieved per video at different
-        # number of proposals (percentage of the total retrieved).
-        for i, score in enumerate(score_list):
-            # Total positives per video.
-            positives[i] = score.shape[0]
-            # Find proposals that satisfies minimum temporal_iou threshold.
-            true_positives_temporal_iou = score >= temporal_iou
-            # Get number of proposals as a percentage of total retrieved.
-            pcn_proposals = np.minimum(
-                (score.shape[1] * pcn_list).astype(np.int32), score.shape[1])
-
-            for j, num_retrieved_proposals in enumerate(pcn_proposals):
-                # Compute the number of matches
-                # for each percentage of the proposals
-                matches[i, j] = np.count_nonzero(
-                    (true_positives_temporal_iou[:, :num_retrieved_proposals]
-                     ).sum(axis=1))
-
-        # Computes recall given the set of matches per video.
-        recall[ridx, :] = matches.sum(axis=0) / positives.sum()
+        # Rank of the first proposal matching each ground truth.
+        first_match = np.full(len(gt_segments), np.iinfo(np.int64).max)
+        hit = t_iou >= temporal_iou
+        hit_gts, first_idx = np.unique(pair_gts[hit], return_index=True)
+        first_match[hit_gts] = pair_ranks[hit][first_idx]
+        # A ground truth is matched when its first match is retrieved.
+        matches = first_match[:, None] < pcn_proposals[gt_videos]
+        recall[ridx, :] = matches.sum(axis=0) / float(len(gt_segments))
 
     # Recall is averaged.
     avg_recall = recall.mean(axis=0)
@@ -475,8 +525,7 @@ def interpolated_precision_recall(precision, recall):
     """
     mprecision = np.hstack([[0], precision, [0]])
     mrecall = np.hstack([[0], recall, [1]])
-    for i in range(len(mprecision) - 1)[::-1]:
-        mprecision[i] = max(mprecision[i], mprecision[i + 1])
+    mprecision = np.maximum.accumulate(mprecision[::-1])[::-1]
     idx = np.where(mrecall[1::] != mrecall[0:-1])[0] + 1
     ap = np.sum((mrecall[idx] - mrecall[idx - 1]) * mprecision[idx])
     return ap
@@ -9,7 +9,7 @@ from collections import defaultdict
 
 import numpy as np
 
-from .ava_evaluation import metrics, np_box_list, np_box_ops
+from .ava_evaluation import metrics
 
 
 def det2csv(results, custom_classes):
@@ -154,49 +154,164 @@ def read_labelmap(labelmap_file):
     return labelmap, class_ids
 
 
-def get_overlaps_and_scores_box_mode(detected_boxes, detected_scores,
-                                     groundtruth_boxes):
-
-    detected_boxlist = np_box_list.BoxList(detected_boxes)
-    detected_boxlist.add_field('scores', detected_scores)
-    gt_non_group_of_boxlist = np_box_list.BoxList(groundtruth_boxes)
-
-    iou = np_box_ops.iou(detected_boxlist.get(), gt_non_group_of_boxlist.get())
-    scores = detected_boxlist.get_field('scores')
-    num_boxes = detected_boxlist.num_boxes()
-    return iou, scores, num_boxes
-
-
-def tpfp_single(tup, threshold=0.5):
-    gt_bboxes, gt_labels, bboxes, labels, scores = tup
-    ret_scores, ret_tp_fp_labels = dict(), dict()
-    all_labels = list(set(labels))
-    for label in all_labels:
-        gt_bbox = np.array(
-            [x for x, y in zip(gt_bboxes, gt_labels) if y == label],
-            dtype=np.float32).reshape(-1, 4)
-        bbox = np.array([x for x, y in zip(bboxes, labels) if y == label],
-                        dtype=np.float32).reshape(-1, 4)
-        score = np.array([x for x, y in zip(scores, labels) if y == label],
-                         dtype=np.float32).reshape(-1)
-        iou, score, num_boxes = get_overlaps_and_scores_box_mode(
-            bbox, score, gt_bbox)
-        if gt_bbox.size == 0:
-            ret_scores[label] = score
-            ret_tp_fp_labels[label] = np.zeros(num_boxes, dtype=bool)
-            continue
-        tp_fp_labels = np.zeros(num_boxes, dtype=bool)
-        if iou.shape[1] > 0:
-            max_overlap_gt_ids = np.argmax(iou, axis=1)
-            is_gt_box_detected = np.zeros(iou.shape[1], dtype=bool)
-            for i in range(num_boxes):
-                gt_id = max_overlap_gt_ids[i]
-                if iou[i, gt_id] >= threshold:
-                    if not is_gt_box_detected[gt_id]:
-                        tp_fp_labels[i] = True
-                        is_gt_box_detected[gt_id] = True
-        ret_scores[label], ret_tp_fp_labels[label] = score, tp_fp_labels
-    return ret_scores, ret_tp_fp_labels
+def load_ava_csv(csv_file, class_whitelist=None):
+    """Loads boxes and class labels from a CSV file in the AVA format into
+    columnar arrays.
+
+    CSV file format described at https://research.google.com/ava/download.html.
+
+    Args:
+        csv_file: A file object.
+        class_whitelist: If provided, boxes corresponding to (integer) class
+        labels not in this set are skipped.
+
+    Returns:
+        dict: The ``keys`` (image keys), ``boxes`` (coordinates
+        [y1, x1, y2, x2]), ``labels`` and ``scores`` of all boxes, in the
+        order of the file. If scores are not provided in the csv, then they
+        will default to 1.0.
+    """
+    rows = list(csv.reader(csv_file))
+    for row in rows:
+        assert len(row) in [7, 8], 'Wrong number of columns: ' + str(row)
+    if len(rows) == 0:
+        return _empty_columns()
+    if any(len(row) == 7 for row in rows):
+        rows = [row if len(row) == 8 else row + ['1.0'] for row in rows]
+
+    table = np.array(rows)
+    timestamps = table[:, 1].astype(np.float64).astype(np.int64)
+    keys = np.char.add(
+        np.char.add(table[:, 0], ','), np.char.zfill(
+            timestamps.astype(str), 4))
+    x1, y1, x2, y2 = table[:, 2:6].astype(np.float32).T
+    columns = dict(
+        keys=keys,
+        boxes=np.stack([y1, x1, y2, x2], axis=1),
+        labels=table[:, 6].astype(np.int64),
+        scores=table[:, 7].astype(np.float32))
+    if class_whitelist:
+        columns = _select_columns(
+            columns, np.isin(columns['labels'], list(class_whitelist)))
+    return columns
+
+
+def det2columns(results, custom_classes=None, class_whitelist=None):
+    """Convert detection results to columnar arrays like
+    :func:`load_ava_csv`, without going through a csv file."""
+    keys, boxes, labels, scores = [], [], [], []
+    for result in results:
+        image_key = make_image_key(result['video_id'], result['timestamp'])
+        for label, bboxes in enumerate(result['outputs']):
+            if len(bboxes) == 0:
+                continue
+            bboxes = np.asarray(bboxes, dtype=np.float32)
+            if custom_classes is not None:
+                actual_label = custom_classes[label + 1]
+            else:
+                actual_label = label + 1
+            keys.append(np.full(len(bboxes), image_key, dtype=object))
+            boxes.append(bboxes[:, [1, 0, 3, 2]])
+            labels.append(np.full(len(bboxes), actual_label, dtype=np.int64))
+            scores.append(bboxes[:, 4])
+    if len(keys) == 0:
+        return _empty_columns()
+
+    columns = dict(
+        keys=np.concatenate(keys).astype(str),
+        boxes=np.concatenate(boxes),
+        labels=np.concatenate(labels),
+        scores=np.concatenate(scores))
+    if class_whitelist:
+        columns = _select_columns(
+            columns, np.isin(columns['labels'], list(class_whitelist)))
+    return columns
+
+
+def _empty_columns():
+    return dict(
+        keys=np.zeros(0, dtype=str),
+        boxes=np.zeros((0, 4), dtype=np.float32),
+        labels=np.zeros(0, dtype=np.int64),
+        scores=np.zeros(0, dtype=np.float32))
+
+
+def _select_columns(columns, index):
+    return {name: column[index] for name, column in columns.items()}
+
+
+def _pairwise_iou(boxes1, boxes2):
+    """IoU of the box pairs ``(boxes1[i], boxes2[i])``, computed the same way
+    as :func:`np_box_ops.iou`."""
+    y_min1, x_min1, y_max1, x_max1 = boxes1.T
+    y_min2, x_min2, y_max2, x_max2 = boxes2.T
+    intersect_heights = np.maximum(
+        np.zeros(len(boxes1)),
+        np.minimum(y_max1, y_max2) - np.maximum(y_min1, y_min2))
+    intersect_widths = np.maximum(
+        np.zeros(len(boxes1)),
+        np.minimum(x_max1, x_max2) - np.maximum(x_min1, x_min2))
+    intersect = intersect_heights * intersect_widths
+    area1 = (y_max1 - y_min1) * (x_max1 - x_min1)
+    area2 = (y_max2 - y_min2) * (x_max2 - x_min2)
+    return intersect / (area1 + area2 - intersect)
+
+
+def tpfp_columns(gt, det, threshold=0.5):
+    """Compute the true/false positive flags of all detections at once.
+
+    Detections and ground truths are grouped by image and class. Within a
+    group, the detections are visited in descending score order and each is
+    matched to the ground truth it overlaps most, which counts as a true
+    positive if the overlap reaches ``threshold`` and no earlier detection
+    was matched to that ground truth.
+
+    Args:
+        gt (dict): Columnar ground truths with integer image ``codes``.
+        det (dict): Columnar detections with integer image ``codes``.
+        threshold (float): The IoU threshold of a true positive.
+            Defaults to 0.5.
+
+    Returns:
+        tuple[np.ndarray]: The image codes, labels, scores and true positive
+        flags of the detections, sorted by image, class and descending score.
+    """
+    # sort by image, class and descending score, ties keep the input order
+    det = _select_columns(
+        det, np.lexsort((-det['scores'], det['labels'], det['codes'])))
+    gt = _select_columns(
+        gt, np.lexsort((-gt['scores'], gt['labels'], gt['codes'])))
+
+    num_labels = max(det['labels'].max(initial=0),
+                     gt['labels'].max(initial=0)) + 1
+    det_groups = det['codes'] * num_labels + det['labels']
+    gt_groups = gt['codes'] * num_labels + gt['labels']
+
+    # enumerate the (detection, ground truth) pairs of each group
+    gt_starts = np.searchsorted(gt_groups, det_groups, side='left')
+    num_gts = np.searchsorted(gt_groups, det_groups, side='right') - gt_starts
+    det_inds = np.repeat(np.arange(len(det_groups)), num_gts)
+    gt_inds = np.repeat(gt_starts, num_gts) + np.arange(
+        num_gts.sum()) - np.repeat(np.cumsum(num_gts) - num_gts, num_gts)
+    ious = _pairwise_iou(det['boxes'][det_inds], gt['boxes'][gt_inds])
+
+    # the first ground truth with the max overlap of each detection
+    order = np.lexsort((gt_inds, -ious, det_inds))
+    matched, first = np.unique(det_inds[order], return_index=True)
+    best_gt = gt_inds[order][first]
+    best_iou = ious[order][first]
+
+    candidates = matched[best_iou >= threshold]
+    candidate_gts = best_gt[best_iou >= threshold]
+    # a ground truth is only detected by its first candidate
+    _, first_match = np.unique(candidate_gts, return_index=True)
+    tp = np.zeros(len(det_groups), dtype=bool)
+    tp[candidates[first_match]] = True
+    return det['codes'], det['labels'], det['scores'], tp
+
+
+def _tpfp_worker(args):
+    return tpfp_columns(*args)
 
 
 # Seems there is at most 100 detections for each image
@@ -207,68 +322,108 @@ def ava_eval(result_file,
              exclude_file,
              verbose=True,
              ignore_empty_frames=True,
-             custom_classes=None):
-    """Perform ava evaluation."""
+             custom_classes=None,
+             num_workers=0):
+    """Perform ava evaluation.
+
+    Args:
+        result_file (str | list[dict]): The csv file of the detection
+            results, or the results of :class:`AVAMetric` to evaluate them
+            without writing a csv file.
+        result_type (str): The type of the evaluation, only 'mAP' is
+            supported.
+        label_file (str): The label map file.
+        ann_file (str): The csv file of the ground truths.
+        exclude_file (str, optional): The csv file of the excluded
+            timestamps.
+        verbose (bool): Whether to print the time of each step and the AP
+            of each class. Defaults to True.
+        ignore_empty_frames (bool): Whether to only evaluate the frames with
+            ground truths. Defaults to True.
+        custom_classes (list[int], optional): The classes to evaluate,
+            prefixed by the background class. Defaults to None.
+        num_workers (int): Number of processes to compute the true and false
+            positives, splitting the frames evenly. 0 computes them in the
+            current process. Defaults to 0.
+
+    Returns:
+        dict: The overall mAP and the mAP of each class group.
+    """
 
     assert result_type in ['mAP']
     start = time.time()
     categories, class_whitelist = read_labelmap(open(label_file))
     if custom_classes is not None:
+        det_classes = custom_classes
         custom_classes = custom_classes[1:]
         assert set(custom_classes).issubset(set(class_whitelist))
         class_whitelist = custom_classes
         categories = [cat for cat in categories if cat['id'] in custom_classes]
+    else:
+        det_classes = None
+    class_names = {cat['id']: cat['name'] for cat in categories}
 
     # loading gt, do not need gt score
-    gt_bboxes, gt_labels, _ = read_csv(open(ann_file), class_whitelist)
+    gt = load_ava_csv(open(ann_file), class_whitelist)
     if verbose:
         print_time('Reading GT results', start)
 
     if exclude_file is not None:
         excluded_keys = read_exclusions(open(exclude_file))
     else:
-        excluded_keys = list()
+        excluded_keys = set()
 
     start = time.time()
-    boxes, labels, scores = read_csv(open(result_file), class_whitelist)
+    if isinstance(result_file, str):
+        det = load_ava_csv(open(result_file), class_whitelist)
+    else:
+        det = det2columns(result_file, det_classes, class_whitelist)
     if verbose:
         print_time('Reading Detection results', start)
 
     start = time.time()
-    all_gt_labels = np.concatenate(list(gt_labels.values()))
-    gt_count = {k: np.sum(all_gt_labels == k) for k in class_whitelist}
-
-    pool = multiprocessing.Pool(32)
-    if ignore_empty_frames:
-        tups = [(gt_bboxes[k], gt_labels[k], boxes[k], labels[k], scores[k])
-                for k in gt_bboxes if k not in excluded_keys]
+    gt_count = {k: int(np.sum(gt['labels'] == k)) for k in class_whitelist}
+
+    # code the evaluated frames in their order of appearance
+    ref_keys = gt['keys'] if ignore_empty_frames else det['keys']
+    eval_keys, first = np.unique(ref_keys, return_index=True)
+    ranks = np.argsort(np.argsort(first))
+    for columns in (gt, det):
+        pos = np.minimum(
+            np.searchsorted(eval_keys, columns['keys']),
+            max(len(eval_keys) - 1, 0))
+        valid = np.zeros(len(columns['keys']), dtype=bool)
+        if len(eval_keys) > 0:
+            valid = eval_keys[pos] == columns['keys']
+        if excluded_keys:
+            valid &= ~np.isin(columns['keys'], list(excluded_keys))
+        columns.update(_select_columns(columns, valid))
+        columns['codes'] = ranks[pos[valid]]
+
+    if num_workers > 0:
+        chunks = [(_select_columns(gt, gt['codes'] % num_workers == i),
+                   _select_columns(det, det['codes'] % num_workers == i))
+                  for i in range(num_workers)]
+        with multiprocessing.Pool(num_workers) as pool:
+            rets = pool.map(_tpfp_worker, chunks)
+        codes, labels, scores, tpfps = map(np.concatenate, zip(*rets))
+        order = np.lexsort((-scores, labels, codes))
+        labels, scores, tpfps = labels[order], scores[order], tpfps[order]
     else:
-        tups = [(gt_bboxes.get(k, np.zeros((0, 4), dtype=np.float32)),
-                 gt_labels.get(k, []), boxes[k], labels[k], scores[k])
-                for k in boxes if k not in excluded_keys]
-    rets = pool.map(tpfp_single, tups)
+        _, labels, scores, tpfps = tpfp_columns(gt, det)
 
     if verbose:
         print_time('Calculating TP/FP', start)
 
     start = time.time()
-    scores, tpfps = defaultdict(list), defaultdict(list)
-    for score, tpfp in rets:
-        for k in score:
-            scores[k].append(score[k])
-            tpfps[k].append(tpfp[k])
-
     cls_AP = []
-    for k in scores:
-        scores[k] = np.concatenate(scores[k])
-        tpfps[k] = np.concatenate(tpfps[k])
+    for k in np.unique(labels).tolist():
+        # stable selection keeps the frame order of the detections
+        index = np.flatnonzero(labels == k)
         precision, recall = metrics.compute_precision_recall(
-            scores[k], tpfps[k], gt_count[k])
+            scores[index], tpfps[index], gt_count[k])
         ap = metrics.compute_average_precision(precision, recall)
-        class_name = [x['name'] for x in categories if x['id'] == k]
-        assert len(class_name) == 1
-        class_name = class_name[0]
-        cls_AP.append((k, class_name, ap))
+        cls_AP.append((k, class_names[k], ap))
     if verbose:
         print_time('Run Evaluator', start)
 
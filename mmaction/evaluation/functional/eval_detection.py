@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import json
+import multiprocessing
 
 import numpy as np
 from mmengine.logging import MMLogger, print_log
@@ -18,13 +19,17 @@ class ActivityNetLocalization:
         tiou_thresholds (np.ndarray): The thresholds of temporal iou to
             evaluate. Default: ``np.linspace(0.5, 0.95, 10)``.
         verbose (bool): Whether to print verbose logs. Default: False.
+        num_workers (int): Number of processes to compute the average
+            precision of the classes in parallel. 0 computes them in the
+            current process. Default: 0.
     """
 
     def __init__(self,
                  ground_truth_filename=None,
                  prediction_filename=None,
                  tiou_thresholds=np.linspace(0.5, 0.95, 10),
-                 verbose=False):
+                 verbose=False,
+                 num_workers=0):
         if not ground_truth_filename:
             raise IOError('Please input a valid ground truth file.')
         if not prediction_filename:
@@ -33,6 +38,7 @@ class ActivityNetLocalization:
         self.prediction_filename = prediction_filename
         self.tiou_thresholds = tiou_thresholds
         self.verbose = verbose
+        self.num_workers = num_workers
         self.ap = None
         self.logger = MMLogger.get_current_instance()
         # Import ground truth and predictions.
@@ -115,20 +121,41 @@ class ActivityNetLocalization:
         ap = np.zeros((len(self.tiou_thresholds), len(self.activity_index)))
 
         # Adaptation to query faster
-        ground_truth_by_label = []
-        prediction_by_label = []
+        def to_arrays(instances, with_score):
+            videos = np.array([x['video-id'] for x in instances], dtype=str)
+            segments = np.array([[x['t-start'], x['t-end']]
+                                 for x in instances]).reshape(-1, 2)
+            labels = np.array([x['label'] for x in instances], dtype=np.int64)
+            if with_score:
+                scores = np.array([x['score'] for x in instances],
+                                  dtype=np.float64)
+                return videos, segments, labels, scores
+            return videos, segments, labels
+
+        gt_videos, gt_segments, gt_labels = to_arrays(self.ground_truth,
+                                                      False)
+        pred_videos, pred_segments, pred_labels, pred_scores = to_arrays(
+            self.prediction, True)
+
+        tasks = []
         for i in range(len(self.activity_index)):
-            ground_truth_by_label.append([])
-            prediction_by_label.append([])
-        for gt in self.ground_truth:
-            ground_truth_by_label[gt['label']].append(gt)
-        for pred in self.prediction:
-            prediction_by_label[pred['label']].append(pred)
-
-        for i in range(len(self.activity_index)):
-            ap_result = compute_average_precision_detection(
-                ground_truth_by_label[i], prediction_by_label[i],
-                self.tiou_thresholds)
+            gt_inds = gt_labels == i
+            pred_inds = pred_labels == i
+            tasks.append(
+                (gt_videos[gt_inds], gt_segments[gt_inds],
+                 pred_videos[pred_inds], pred_segments[pred_inds],
+                 pred_scores[pred_inds], self.tiou_thresholds))
+
+        if self.num_workers > 0:
+            with multiprocessing.Pool(self.num_workers) as pool:
+                ap_results = pool.starmap(
+                    compute_average_precision_detection_arrays, tasks)
+        else:
+            ap_results = [
+                compute_average_precision_detection_arrays(*task)
+                for task in tasks
+            ]
+        for i, ap_result in enumerate(ap_results):
             ap[:, i] = ap_result
 
         return ap
@@ -231,3 +258,125 @@ def compute_average_precision_detection(ground_truth,
                                                   recall_cumsum[t_idx, :])
 
     return ap
+
+
+def compute_average_precision_detection_arrays(gt_videos,
+                                               gt_segments,
+                                               pred_videos,
+                                               pred_segments,
+                                               pred_scores,
+                                               tiou_thresholds=np.linspace(
+                                                   0.5, 0.95, 10)):
+    """Array version of :func:`compute_average_precision_detection`.
+
+    The predictions are matched to the ground truths of their video at all
+    the thresholds at once. The videos are matched in parallel: the k-th
+    prediction of every video is handled in the k-th step, so the number of
+    steps is the max number of predictions in one video instead of the
+    number of predictions.
+
+    Args:
+        gt_videos (np.ndarray): Video id of each ground truth instance in
+            shape (N, ).
+        gt_segments (np.ndarray): ``[t-start, t-end]`` of each ground truth
+            instance in shape (N, 2).
+        pred_videos (np.ndarray): Video id of each prediction in shape (M, ).
+        pred_segments (np.ndarray): ``[t-start, t-end]`` of each prediction
+            in shape (M, 2).
+        pred_scores (np.ndarray): Score of each prediction in shape (M, ).
+        tiou_thresholds (np.ndarray): A 1darray indicates the temporal
+            intersection over union threshold, which is optional.
+            Default: ``np.linspace(0.5, 0.95, 10)``.
+
+    Returns:
+        np.ndarray: Average precision score at each threshold.
+    """
+    tiou_thresholds = np.asarray(tiou_thresholds)
+    num_thresholds = len(tiou_thresholds)
+    num_preds = len(pred_scores)
+    ap = np.zeros(num_thresholds)
+    if num_preds == 0:
+        return ap
+
+    num_positive = float(len(gt_videos))
+    gt_segments = np.asarray(gt_segments, dtype=np.float64).reshape(-1, 2)
+    pred_segments = np.asarray(
+        pred_segments, dtype=np.float64).reshape(-1, 2)
+    # Sort predictions by decreasing score order.
+    order = np.argsort(-np.asarray(pred_scores), kind='stable')
+    pred_videos = np.asarray(pred_videos)[order]
+    pred_segments = pred_segments[order]
+    tp = np.zeros((num_thresholds, num_preds), dtype=bool)
+
+    # Code the videos, predictions of videos without ground truth are all
+    # false positives.
+    video_ids, gt_codes = np.unique(gt_videos, return_inverse=True)
+    pred_codes = np.searchsorted(video_ids, pred_videos)
+    has_gt = np.zeros(num_preds, dtype=bool)
+    found = pred_codes < len(video_ids)
+    has_gt[found] = video_ids[pred_codes[found]] == pred_videos[found]
+
+    if has_gt.any():
+        num_videos = len(video_ids)
+        # Pad the ground truths of each video to ``(num_videos, max_gts)``.
+        gt_order = np.argsort(gt_codes, kind='stable')
+        gt_counts = np.bincount(gt_codes, minlength=num_videos)
+        gt_starts = np.cumsum(gt_counts) - gt_counts
+        gt_cols = np.arange(len(gt_order)) - np.repeat(gt_starts, gt_counts)
+        max_gts = gt_counts.max()
+        padded_gts = np.zeros((num_videos, max_gts, 2))
+        padded_gts[gt_codes[gt_order], gt_cols] = gt_segments[gt_order]
+        gt_valid = np.arange(max_gts) < gt_counts[:, None]
+
+        # Position of each prediction among those of its video.
+        pred_inds = np.flatnonzero(has_gt)
+        pred_inds = pred_inds[np.argsort(
+            pred_codes[pred_inds], kind='stable')]
+        codes = pred_codes[pred_inds]
+        pred_counts = np.bincount(codes, minlength=num_videos)
+        pred_starts = np.cumsum(pred_counts) - pred_counts
+        steps = np.arange(len(pred_inds)) - np.repeat(pred_starts,
+                                                      pred_counts)
+
+        lock_gt = np.zeros((num_thresholds, num_videos, max_gts), dtype=bool)
+        # Group the predictions by step, videos in increasing order.
+        step_order = np.argsort(steps, kind='stable')
+        step_bounds = np.searchsorted(steps[step_order],
+                                      np.arange(pred_counts.max() + 1))
+        for k in range(pred_counts.max()):
+            inds = pred_inds[step_order[step_bounds[k]:step_bounds[k + 1]]]
+            videos = pred_codes[inds]
+            segments = pred_segments[inds][:, None]
+            gts = padded_gts[videos]
+            tt1 = np.maximum(segments[..., 0], gts[..., 0])
+            tt2 = np.minimum(segments[..., 1], gts[..., 1])
+            intersection = (tt2 - tt1).clip(0)
+            union = ((gts[..., 1] - gts[..., 0]) +
+                     (segments[..., 1] - segments[..., 0]) - intersection)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                tiou = (intersection / union).astype(np.float32)
+            tiou[~gt_valid[videos]] = -np.inf
+
+            # The unlocked ground truth with the highest tiou above the
+            # threshold is matched, the last one among ties.
+            candidates = ((tiou >= tiou_thresholds[:, None, None])
+                          & ~lock_gt[:, videos])
+            masked = np.where(candidates, tiou, -np.inf)
+            matched = max_gts - 1 - masked[..., ::-1].argmax(-1)
+            hit = candidates.any(-1)
+            tp[:, inds] = hit
+            t_inds, v_inds = np.nonzero(hit)
+            lock_gt[t_inds, videos[v_inds], matched[t_inds, v_inds]] = True
+
+    fp = ~tp
+    tp_cumsum = np.cumsum(tp, axis=1).astype(np.float64)
+    fp_cumsum = np.cumsum(fp, axis=1).astype(np.float64)
+    recall_cumsum = tp_cumsum / num_positive
+
+    precision_cumsum = tp_cumsum / (tp_cumsum + fp_cumsum)
+
+    for t_idx in range(len(tiou_thresholds)):
+        ap[t_idx] = interpolated_precision_recall(precision_cumsum[t_idx, :],
+                                                  recall_cumsum[t_idx, :])
+
+    return ap
@@ -2,6 +2,7 @@
 from .acc_metric import AccMetric, ConfusionMatrix
 from .anet_metric import ANetMetric
 from .ava_metric import AVAMetric
+from .feature_writer import FeatureWriter
 from .multimodal_metric import VQAMCACC, ReportVQA, RetrievalRecall, VQAAcc
 from .multisports_metric import MultiSportsMetric
 from .retrieval_metric import RetrievalMetric
@@ -10,5 +11,5 @@ from .video_grounding_metric import RecallatTopK
 __all__ = [
     'AccMetric', 'AVAMetric', 'ANetMetric', 'ConfusionMatrix',
     'MultiSportsMetric', 'RetrievalMetric', 'VQAAcc', 'ReportVQA', 'VQAMCACC',
-    'RetrievalRecall', 'RecallatTopK'
+    'RetrievalRecall', 'RecallatTopK', 'FeatureWriter'
 ]
@@ -1,18 +1,41 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-import os
-from datetime import datetime
 from typing import Any, List, Optional, Sequence, Tuple
 
 from mmengine.evaluator import BaseMetric
 
-from mmaction.evaluation import ava_eval, results2csv
+from mmaction.evaluation import ava_eval
 from mmaction.registry import METRICS
 from mmaction.structures import bbox2result
 
 
 @METRICS.register_module()
 class AVAMetric(BaseMetric):
-    """AVA evaluation metric."""
+    """AVA evaluation metric.
+
+    The detections are evaluated in memory, without writing them to a csv
+    file.
+
+    Args:
+        ann_file (str): The csv file of the ground truths.
+        exclude_file (str): The csv file of the excluded timestamps.
+        label_file (str): The label map file.
+        options (tuple[str]): The type of the evaluation, only 'mAP' is
+            supported. Defaults to ``('mAP', )``.
+        action_thr (float): The score threshold of the detections.
+            Defaults to 0.002.
+        num_classes (int): Number of classes, including the background
+            class. Defaults to 81.
+        custom_classes (list[int], optional): The classes to evaluate.
+            Defaults to None.
+        num_workers (int): Number of processes to compute the true and false
+            positives. 0 computes them in the main process. Defaults to 0.
+        collect_device (str): Device name used for collecting results from
+            different ranks during distributed training. Must be 'cpu' or
+            'gpu'. Defaults to 'cpu'.
+        prefix (str, optional): The prefix that will be added in the metric
+            names to disambiguate homonymous metrics of different evaluators.
+            Defaults to None.
+    """
     default_prefix: Optional[str] = 'mAP'
 
     def __init__(self,
@@ -23,6 +46,7 @@ class AVAMetric(BaseMetric):
                  action_thr: float = 0.002,
                  num_classes: int = 81,
                  custom_classes: Optional[List[int]] = None,
+                 num_workers: int = 0,
                  collect_device: str = 'cpu',
                  prefix: Optional[str] = None):
         super().__init__(collect_device=collect_device, prefix=prefix)
@@ -34,6 +58,7 @@ class AVAMetric(BaseMetric):
         self.options = options
         self.action_thr = action_thr
         self.custom_classes = custom_classes
+        self.num_workers = num_workers
         if custom_classes is not None:
             self.custom_classes = list([0] + custom_classes)
 
@@ -71,19 +96,14 @@ class AVAMetric(BaseMetric):
             dict: The computed metrics. The keys are the names of the metrics,
             and the values are corresponding results.
         """
-        time_now = datetime.now().strftime('%Y%m%d_%H%M%S')
-        temp_file = f'AVA_{time_now}_result.csv'
-        results2csv(results, temp_file, self.custom_classes)
-
         eval_results = ava_eval(
-            temp_file,
+            results,
             self.options[0],
             self.label_file,
             self.ann_file,
             self.exclude_file,
             ignore_empty_frames=True,
-            custom_classes=self.custom_classes)
-
-        os.remove(temp_file)
+            custom_classes=self.custom_classes,
+            num_workers=self.num_workers)
 
         return eval_results
@@ -0,0 +1,160 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+from glob import glob
+from typing import Dict, Optional, Sequence, Set
+
+import torch
+from mmengine import dump
+from mmengine.dist import get_dist_info, get_rank
+from mmengine.evaluator import BaseMetric
+from mmengine.logging import print_log
+
+from mmaction.registry import METRICS
+
+PROGRESS_DIRNAME = '.progress'
+
+
+@METRICS.register_module()
+class FeatureWriter(BaseMetric):
+    """Write the features of each video to its own file while testing.
+
+    Unlike ``DumpResults``, which keeps the outputs of all videos in memory
+    and gathers them to the main process, each rank writes the outputs of
+    its videos as soon as the batch is processed, to
+    ``{out_dir}/{video_name}.pkl``. A file is written under a temporary name
+    and renamed when complete, then the video is appended to the progress
+    record of the rank, so an interrupted job can be restarted with the
+    videos in :meth:`load_progress` left out.
+
+    The video name is the ``name_key`` meta information of the data sample,
+    relative to ``data_prefix``, which is the video name in the annotation
+    file for ``VideoDataset`` and ``RawframeDataset``. The key must be in the
+    ``meta_keys`` of ``PackActionInputs``.
+
+    The distributed sampler pads the last batches with samples from the
+    start of the dataset, which may land on another rank than the one which
+    writes them. If ``sample_idx`` is also in the ``meta_keys``, a rank only
+    writes the samples ``rank``, ``rank + world_size``, ... given to it by
+    the unshuffled ``DefaultSampler`` of a test dataloader, so padded
+    samples are skipped.
+
+    Args:
+        out_dir (str): The directory of the feature files.
+        name_key (str): The meta key of the video path, e.g. ``'filename'``
+            or ``'frame_dir'``. Defaults to ``'filename'``.
+        data_prefix (str, optional): The prefix removed from the video path.
+            Defaults to None.
+        collect_device (str): Device name used for collecting results from
+            different ranks during distributed training. Unused, as nothing
+            is collected. Defaults to 'cpu'.
+        prefix (str, optional): The prefix that will be added in the metric
+            names to disambiguate homonymous metrics of different evaluators.
+            Defaults to None.
+    """
+
+    def __init__(self,
+                 out_dir: str,
+                 name_key: str = 'filename',
+                 data_prefix: Optional[str] = None,
+                 collect_device: str = 'cpu',
+                 prefix: Optional[str] = None) -> None:
+        super().__init__(collect_device=collect_device, prefix=prefix)
+        self.out_dir = out_dir
+        self.name_key = name_key
+        self.data_prefix = data_prefix
+        self._written = set()
+        self._progress_file = None
+
+    def _video_name(self, data_sample) -> str:
+        path = data_sample.metainfo[self.name_key]
+        if self.data_prefix:
+            path = osp.relpath(path, self.data_prefix)
+        return path
+
+    def _record(self, video_name: str) -> None:
+        """Append a written video to the progress record of the rank."""
+        if self._progress_file is None:
+            progress_dir = osp.join(self.out_dir, PROGRESS_DIRNAME)
+            os.makedirs(progress_dir, exist_ok=True)
+            self._progress_file = open(
+                osp.join(progress_dir, f'rank{get_rank()}.txt'), 'a')
+        self._progress_file.write(video_name + '\n')
+        self._progress_file.flush()
+
+    def write(self, video_name: str, feature: torch.Tensor) -> None:
+        """Write the feature file of a video and record it.
+
+        Args:
+            video_name (str): The name of the video.
+            feature (torch.Tensor): The feature or score of the video.
+        """
+        out_file = osp.join(self.out_dir, video_name + '.pkl')
+        os.makedirs(osp.dirname(out_file), exist_ok=True)
+        tmp_file = f'{out_file}.{get_rank()}.{os.getpid()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            dump(feature, f, file_format='pkl')
+        os.replace(tmp_file, out_file)
+        self._record(video_name)
+
+    def process(self, data_batch: Dict, data_samples: Sequence) -> None:
+        """Write the outputs of one batch.
+
+        Args:
+            data_batch (dict): A batch of data from the dataloader.
+            data_samples (Sequence): A batch of outputs from the model,
+                features of ``FeatureHead`` or dicts with ``pred_score``.
+        """
+        rank, world_size = get_dist_info()
+        for data_sample, output in zip(data_batch['data_samples'],
+                                       data_samples):
+            # padded samples are written by the rank given the original
+            sample_idx = data_sample.metainfo.get('sample_idx')
+            if sample_idx is not None and sample_idx % world_size != rank:
+                continue
+            video_name = self._video_name(data_sample)
+            # padded samples may also be given to the same rank
+            if video_name in self._written:
+                continue
+            if isinstance(output, dict):
+                output = output['pred_score']
+            self.write(video_name, output.cpu())
+            self._written.add(video_name)
+
+    def compute_metrics(self, results: list) -> dict:
+        return dict()
+
+    def evaluate(self, size: int) -> dict:
+        """Close the progress record, without collecting any results.
+
+        Args:
+            size (int): Length of the entire test dataset.
+
+        Returns:
+            dict: An empty dict.
+        """
+        print_log(
+            f'{len(self._written)} videos written to {self.out_dir}',
+            logger='current')
+        if self._progress_file is not None:
+            self._progress_file.close()
+            self._progress_file = None
+        self._written.clear()
+        return dict()
+
+    @staticmethod
+    def load_progress(out_dir: str) -> Set[str]:
+        """Get the videos written by all ranks of the previous runs.
+
+        Args:
+            out_dir (str): The directory of the feature files.
+
+        Returns:
+            set[str]: The names of the written videos.
+        """
+        written = set()
+        for progress_file in glob(
+                osp.join(out_dir, PROGRESS_DIRNAME, 'rank*.txt')):
+            with open(progress_file) as f:
+                written.update(line.strip() for line in f if line.strip())
+        return written
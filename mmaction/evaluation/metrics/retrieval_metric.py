@@ -1,9 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import copy
 from collections import OrderedDict
+from itertools import zip_longest
 from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
+import torch
+from mmengine.dist import all_gather_object, get_dist_info
 from mmengine.evaluator import BaseMetric
 
 from mmaction.registry import METRICS
@@ -23,6 +26,17 @@ class RetrievalMetric(BaseMetric):
             names to disambiguate homonymous metrics of different evaluators.
             If prefix is not provided in the argument, self.default_prefix
             will be used instead. Defaults to None.
+        chunk_size (int, optional): If set, the ranks of the positive pairs
+            are computed for this many text queries at a time by counting
+            the videos scoring higher, so the full similarity matrix is
+            never built nor sorted. The metrics are the same as the dense
+            computation. Defaults to None.
+        device (str, optional): Device of the chunked ranking, e.g.
+            ``'cuda'``. Defaults to None, which ranks in numpy on CPU.
+        sharded (bool): Whether each rank ranks its own text queries against
+            the video features gathered from all ranks, instead of the main
+            process ranking all queries. It assumes the samples are split
+            across ranks by the default sampler. Defaults to False.
     """
 
     default_prefix = 'retrieval'
@@ -31,8 +45,15 @@ class RetrievalMetric(BaseMetric):
                  metric_list: Union[Tuple[str],
                                     str] = ('R1', 'R5', 'R10', 'MdR', 'MnR'),
                  collect_device: str = 'cpu',
-                 prefix: Optional[str] = None) -> None:
+                 prefix: Optional[str] = None,
+                 chunk_size: Optional[int] = None,
+                 device: Optional[str] = None,
+                 sharded: bool = False) -> None:
         super().__init__(collect_device=collect_device, prefix=prefix)
+        assert chunk_size is None or chunk_size > 0
+        self.chunk_size = chunk_size
+        self.device = device
+        self.sharded = sharded
         if isinstance(metric_list, str):
             metric_list = (metric_list, )
 
@@ -65,6 +86,121 @@ class RetrievalMetric(BaseMetric):
             results['text_feature'] = text_feature
             self.results.append(results)
 
+    def count_ranks(
+            self,
+            text_features: np.ndarray,
+            video_features: np.ndarray,
+            positive_inds: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Count the videos scoring higher than and equal to the positive
+        video of each text query, chunk by chunk.
+
+        Args:
+            text_features (np.ndarray): Normalized text features of shape
+                (M, C).
+            video_features (np.ndarray): Normalized video features of shape
+                (N, C).
+            positive_inds (np.ndarray, optional): Index of the positive
+                video of each text. Defaults to None, which pairs the i-th
+                text with the i-th video.
+
+        Returns:
+            tuple[np.ndarray]: The number of videos with a higher and with
+            an equal similarity than the positive one, including itself.
+        """
+        num_texts = len(text_features)
+        if positive_inds is None:
+            positive_inds = np.arange(num_texts)
+        chunk_size = self.chunk_size or max(num_texts, 1)
+        num_higher = np.zeros(num_texts, dtype=np.int64)
+        num_equal = np.zeros(num_texts, dtype=np.int64)
+        if self.device is not None:
+            video_features = torch.from_numpy(video_features).to(self.device)
+
+        for start in range(0, num_texts, chunk_size):
+            end = min(start + chunk_size, num_texts)
+            rows = np.arange(end - start)
+            cols = positive_inds[start:end]
+            if self.device is None:
+                similarity = text_features[start:end] @ video_features.T
+                positive = similarity[rows, cols][:, None]
+                num_higher[start:end] = (similarity > positive).sum(1)
+                num_equal[start:end] = (similarity == positive).sum(1)
+            else:
+                text_chunk = torch.from_numpy(text_features[start:end]).to(
+                    self.device)
+                similarity = text_chunk @ video_features.T
+                positive = similarity[rows, cols][:, None]
+                num_higher[start:end] = (similarity
+                                         > positive).sum(1).cpu().numpy()
+                num_equal[start:end] = (similarity
+                                        == positive).sum(1).cpu().numpy()
+        return num_higher, num_equal
+
+    @staticmethod
+    def expand_ranks(num_higher: np.ndarray,
+                     num_equal: np.ndarray) -> np.ndarray:
+        """Get the 0-based ranks of the positive pairs from the counts of
+        :meth:`count_ranks`.
+
+        A positive tied with ``n`` other videos yields the ``n + 1`` ranks it
+        could take, the same as the sorted positions matched by the dense
+        computation.
+        """
+        offsets = np.arange(num_equal.sum()) - np.repeat(
+            np.cumsum(num_equal) - num_equal, num_equal)
+        return np.repeat(num_higher, num_equal) + offsets
+
+    def evaluate(self, size: int) -> dict:
+        """Evaluate the model performance of the whole dataset.
+
+        In sharded mode, the video features of all ranks are gathered as the
+        gallery and each rank ranks its own text queries against it, so only
+        the rank counts are collected to the main process.
+
+        Args:
+            size (int): Length of the entire validation dataset.
+
+        Returns:
+            dict: Evaluation metrics dict on the val dataset.
+        """
+        if self.sharded:
+            if len(self.results) > 0:
+                video_features = self._normalize(
+                    np.stack([res['video_feature'] for res in self.results]))
+                text_features = self._normalize(
+                    np.stack([res['text_feature'] for res in self.results]))
+            else:
+                # a rank without samples still joins the collective gather
+                video_features = text_features = np.zeros((0, 0),
+                                                          dtype=np.float32)
+
+            # the default sampler gives the samples ``rank``,
+            # ``rank + world_size``, ... of the dataset to each rank
+            rank, world_size = get_dist_info()
+            gallery = all_gather_object(video_features)
+            gallery = np.stack([
+                feature for features in zip_longest(*gallery)
+                for feature in features if feature is not None
+            ])[:size]
+            positive_inds = np.arange(len(text_features)) * world_size + rank
+            # padded samples are dropped when collecting the results
+            positive_inds = np.minimum(positive_inds, len(gallery) - 1)
+
+            self.results = []
+            if len(text_features) > 0:
+                num_higher, num_equal = self.count_ranks(
+                    text_features, gallery, positive_inds)
+                self.results = [
+                    dict(num_higher=higher, num_equal=equal)
+                    for higher, equal in zip(num_higher, num_equal)
+                ]
+        return super().evaluate(size)
+
+    @staticmethod
+    def _normalize(features: np.ndarray) -> np.ndarray:
+        return features / np.linalg.norm(features, axis=-1, keepdims=True)
+
     def compute_metrics(self, results: List) -> Dict:
         """Compute the metrics from processed results.
 
@@ -76,19 +212,26 @@ class RetrievalMetric(BaseMetric):
             and the values are corresponding results.
         """
 
-        video_features = np.stack([res['video_feature'] for res in results])
-        text_features = np.stack([res['text_feature'] for res in results])
-
-        video_features = video_features / np.linalg.norm(
-            video_features, axis=-1, keepdims=True)
-        text_features = text_features / np.linalg.norm(
-            text_features, axis=-1, keepdims=True)
-
-        similarity = text_features @ video_features.T
-
-        sx = np.sort(-similarity)
-        d = np.diag(-similarity)
-        ind = np.where((sx - d[:, None]) == 0)[1]
+        if 'num_higher' in results[0]:
+            # ranked by each rank in sharded mode
+            ind = self.expand_ranks(
+                np.array([res['num_higher'] for res in results]),
+                np.array([res['num_equal'] for res in results]))
+        else:
+            video_features = self._normalize(
+                np.stack([res['video_feature'] for res in results]))
+            text_features = self._normalize(
+                np.stack([res['text_feature'] for res in results]))
+
+            if self.chunk_size is None:
+                similarity = text_features @ video_features.T
+
+                sx = np.sort(-similarity)
+                d = np.diag(-similarity)
+                ind = np.where((sx - d[:, None]) == 0)[1]
+            else:
+                ind = self.expand_ranks(
+                    *self.count_ranks(text_features, video_features))
 
         metrics = OrderedDict()
         for metric in self.metric_list:
@@ -4,7 +4,7 @@ from mmengine.runner.checkpoint import _load_checkpoint
 
 from mmaction.registry import MODELS
 from .mobilenet_v2 import InvertedResidual, MobileNetV2
-from .resnet_tsm import TemporalShift
+from .resnet_tsm import TemporalShift, set_online_shift
 
 
 @MODELS.register_module()
@@ -51,6 +51,16 @@ class MobileNetV2TSM(MobileNetV2):
         if self.is_shift:
             self.make_temporal_shift()
 
+    def set_online(self, online=True):
+        """Switch to the online mode, which takes one frame of each video at
+        a time and keeps the shifted channels of the previous frames. Calling
+        it again clears the shift buffers, e.g. before a new video.
+
+        Args:
+            online (bool): Whether to use the online mode. Defaults to True.
+        """
+        set_online_shift(self, online)
+
     def load_original_weights(self, logger):
         original_state_dict = _load_checkpoint(
             self.pretrained, map_location='cpu')
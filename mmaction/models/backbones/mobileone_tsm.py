@@ -7,7 +7,7 @@ from mmengine.runner.checkpoint import (_load_checkpoint,
 from mmpretrain.models import MobileOne
 
 from mmaction.registry import MODELS
-from .resnet_tsm import TemporalShift
+from .resnet_tsm import TemporalShift, set_online_shift
 
 
 @MODELS.register_module()
@@ -87,6 +87,16 @@ class MobileOneTSM(MobileOne):
         if self.is_shift:
             self.make_temporal_shift()
 
+    def set_online(self, online: bool = True) -> None:
+        """Switch to the online mode, which takes one frame of each video at
+        a time and keeps the shifted channels of the previous frames. Calling
+        it again clears the shift buffers, e.g. before a new video.
+
+        Args:
+            online (bool): Whether to use the online mode. Defaults to True.
+        """
+        set_online_shift(self, online)
+
     def load_original_weights(self, logger):
         assert self.init_cfg.get('type') == 'Pretrained', (
             'Please specify '
@@ -48,6 +48,12 @@ class TemporalShift(nn.Module):
     `TSM: Temporal Shift Module for Efficient Video Understanding
     <https://arxiv.org/abs/1811.08383>`_
 
+    In the online mode, each call takes one frame of each video, ``[N, C, H,
+    W]``, and the channels shifted forward in time are taken from the
+    previous call, kept in a shift buffer. The channels shifted backward
+    would come from the next frame, which is not seen yet, and are zeros as
+    for the last segment in the offline mode.
+
     Args:
         net (nn.module): Module to make temporal shift.
         num_segments (int): Number of frame segments. Default: 3.
@@ -59,6 +65,8 @@ class TemporalShift(nn.Module):
         self.net = net
         self.num_segments = num_segments
         self.shift_div = shift_div
+        self.online = False
+        self.shift_buffer = None
 
     def forward(self, x):
         """Defines the computation performed at every call.
@@ -69,9 +77,30 @@ class TemporalShift(nn.Module):
         Returns:
             torch.Tensor: The output of the module.
         """
-        x = self.shift(x, self.num_segments, shift_div=self.shift_div)
+        if self.online:
+            x = self.online_shift(x)
+        else:
+            x = self.shift(x, self.num_segments, shift_div=self.shift_div)
         return self.net(x)
 
+    def online_shift(self, x):
+        """Shift the feature of the current frames with the shift buffer of
+        the previous frames, and keep their channels for the next frames.
+
+        Args:
+            x (torch.Tensor): The feature of the current frame of each video.
+
+        Returns:
+            torch.Tensor: The shifted feature.
+        """
+        fold = x.size(1) // self.shift_div
+        past = self.shift_buffer
+        if past is None or past.shape != x[:, fold:2 * fold].shape:
+            past = x.new_zeros(x[:, fold:2 * fold].shape)
+        self.shift_buffer = x[:, fold:2 * fold].detach()
+        return torch.cat((x[:, :fold].new_zeros(x[:, :fold].shape), past,
+                          x[:, 2 * fold:]), 1)
+
     @staticmethod
     def shift(x, num_segments, shift_div=3):
         """Perform temporal shift operation on the feature.
@@ -125,6 +154,20 @@ class TemporalShift(nn.Module):
         return out.view(n, c, h, w)
 
 
+def set_online_shift(model, online=True):
+    """Switch the temporal shift modules of a model to the online mode, or
+    back to the offline mode, clearing their shift buffers.
+
+    Args:
+        model (nn.Module): The model with temporal shift modules.
+        online (bool): Whether to use the online mode. Defaults to True.
+    """
+    for m in model.modules():
+        if isinstance(m, TemporalShift):
+            m.online = online
+            m.shift_buffer = None
+
+
 @MODELS.register_module()
 class ResNetTSM(ResNet):
     """ResNet backbone for TSM.
@@ -252,6 +295,20 @@ class ResNetTSM(ResNet):
         else:
             raise NotImplementedError
 
+    def set_online(self, online=True):
+        """Switch to the online mode, which takes one frame of each video at
+        a time and keeps the shifted channels of the previous frames. Calling
+        it again clears the shift buffers, e.g. before a new video.
+
+        Args:
+            online (bool): Whether to use the online mode. Defaults to True.
+        """
+        if online:
+            assert not self.temporal_pool and len(self.non_local_cfg) == 0, (
+                'The online mode does not support temporal pooling and '
+                'non-local modules')
+        set_online_shift(self, online)
+
     def make_temporal_pool(self):
         """Make temporal pooling between layer1 and layer2, using a 3D max
         pooling layer."""
@@ -23,6 +23,10 @@ class ActionDataPreprocessor(BaseDataPreprocessor):
             Defaults to True.
         blending (dict, optional): Config for batch blending.
             Defaults to None.
+        batch_augment (dict, optional): Config for the training time
+            augmentation of the stacked batch on its device, e.g.
+            ``dict(type='VideoBatchAugment')``, applied before the
+            normalization. Defaults to None.
         format_shape (str): Format shape of input data.
             Defaults to ``'NCHW'``.
     """
@@ -33,6 +37,7 @@ class ActionDataPreprocessor(BaseDataPreprocessor):
                  to_rgb: bool = False,
                  to_float32: bool = True,
                  blending: Optional[dict] = None,
+                 batch_augment: Optional[dict] = None,
                  format_shape: str = 'NCHW') -> None:
         super().__init__()
         self.to_rgb = to_rgb
@@ -68,6 +73,11 @@ class ActionDataPreprocessor(BaseDataPreprocessor):
         else:
             self.blending = None
 
+        if batch_augment is not None:
+            self.batch_augment = MODELS.build(batch_augment)
+        else:
+            self.batch_augment = None
+
     def forward(self,
                 data: Union[dict, Tuple[dict]],
                 training: bool = False) -> Union[dict, Tuple[dict]]:
@@ -111,11 +121,15 @@ class ActionDataPreprocessor(BaseDataPreprocessor):
         return data
 
     def preprocess(self,
-                   inputs: List[torch.Tensor],
+                   inputs: Union[List[torch.Tensor], torch.Tensor],
                    data_samples: SampleList,
                    training: bool = False) -> Tuple:
         # --- Pad and stack --
-        batch_inputs = stack_batch(inputs)
+        if isinstance(inputs, torch.Tensor):
+            # already stacked, e.g. into a slab by ``shm_stack_collate``
+            batch_inputs = inputs
+        else:
+            batch_inputs = stack_batch(inputs)
 
         if self.format_shape == 'MIX2d3d':
             if batch_inputs.ndim == 4:
@@ -134,6 +148,10 @@ class ActionDataPreprocessor(BaseDataPreprocessor):
             else:
                 raise ValueError(f'Invalid format shape: {format_shape}')
 
+        # -- Batch Augment ---
+        if training and self.batch_augment is not None:
+            batch_inputs = self.batch_augment(batch_inputs)
+
         # -- Normalization ---
         if self._enable_normalize:
             if view_shape is None:
@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import math
+import os.path as osp
 
 import numpy as np
 import torch
@@ -7,7 +8,7 @@ import torch.nn as nn
 from mmengine.model import BaseModel
 
 from mmaction.registry import MODELS
-from .utils import post_processing, temporal_iop, temporal_iou
+from .utils import batch_post_processing
 
 
 @MODELS.register_module()
@@ -34,6 +35,14 @@ class BMN(BaseModel):
         hidden_dim_1d (int): Hidden dim for 1d conv. Default: 256.
         hidden_dim_2d (int): Hidden dim for 2d conv. Default: 128.
         hidden_dim_3d (int): Hidden dim for 3d conv. Default: 512.
+        cache_labels (bool): Whether to cache the training labels of each
+            video by its ``video_name``, so that labels are generated only
+            once per video. Default: False.
+        label_cache_file (str, optional): Path of the label cache. If
+            given, ``cache_labels`` is enabled and the cache is loaded at
+            initialization if the file exists. It is written by
+            :meth:`dump_label_cache`, e.g. by ``LabelCacheHook`` after the
+            first training epoch. Default: None.
     """
 
     def __init__(self,
@@ -50,7 +59,9 @@ class BMN(BaseModel):
                  loss_cls=dict(type='BMNLoss'),
                  hidden_dim_1d=256,
                  hidden_dim_2d=128,
-                 hidden_dim_3d=512):
+                 hidden_dim_3d=512,
+                 cache_labels=False,
+                 label_cache_file=None):
         super().__init__()
 
         self.tscale = temporal_dim
@@ -67,6 +78,12 @@ class BMN(BaseModel):
         self.hidden_dim_1d = hidden_dim_1d
         self.hidden_dim_2d = hidden_dim_2d
         self.hidden_dim_3d = hidden_dim_3d
+        self.label_cache_file = label_cache_file
+        self.cache_labels = cache_labels or label_cache_file is not None
+        self._label_cache = dict()
+        if label_cache_file is not None and osp.exists(label_cache_file):
+            self._label_cache.update(
+                torch.load(label_cache_file, map_location='cpu'))
 
         self._get_interp1d_mask()
         nr_groups = 1
@@ -195,8 +212,13 @@ class BMN(BaseModel):
         gt_bbox = [
             sample.gt_instances['gt_bbox'] for sample in batch_data_samples
         ]
+        video_names = [
+            sample.metainfo.get('video_name') for sample in batch_data_samples
+        ]
+        if None in video_names:
+            video_names = None
         label_confidence, label_start, label_end = self.generate_labels(
-            gt_bbox)
+            gt_bbox, video_names)
 
         device = batch_inputs.device
         label_confidence = label_confidence.to(device)
@@ -213,65 +235,97 @@ class BMN(BaseModel):
     def predict(self, batch_inputs, batch_data_samples, **kwargs):
         """Define the computation performed at every call when testing."""
         confidence_map, start, end = self._forward(batch_inputs)
-        start_scores = start[0].cpu().numpy()
-        end_scores = end[0].cpu().numpy()
-        cls_confidence = (confidence_map[0][1]).cpu().numpy()
-        reg_confidence = (confidence_map[0][0]).cpu().numpy()
-
-        max_start = max(start_scores)
-        max_end = max(end_scores)
-
-        # generate the set of start points and end points
-        start_bins = np.zeros(len(start_scores))
-        start_bins[0] = 1  # [1,0,0...,0,0]
-        end_bins = np.zeros(len(end_scores))
-        end_bins[-1] = 1  # [0,0,0...,0,1]
-        for idx in range(1, self.tscale - 1):
-            if start_scores[idx] > start_scores[
-                    idx + 1] and start_scores[idx] > start_scores[idx - 1]:
-                start_bins[idx] = 1
-            elif start_scores[idx] > (0.5 * max_start):
-                start_bins[idx] = 1
-            if end_scores[idx] > end_scores[
-                    idx + 1] and end_scores[idx] > end_scores[idx - 1]:
-                end_bins[idx] = 1
-            elif end_scores[idx] > (0.5 * max_end):
-                end_bins[idx] = 1
-
-        # iterate through all combinations of start_index and end_index
-        new_proposals = []
-        for idx in range(self.tscale):
-            for jdx in range(self.tscale):
-                start_index = jdx
-                end_index = start_index + idx + 1
-                if end_index < self.tscale and start_bins[
-                        start_index] == 1 and end_bins[end_index] == 1:
-                    tmin = start_index / self.tscale
-                    tmax = end_index / self.tscale
-                    tmin_score = start_scores[start_index]
-                    tmax_score = end_scores[end_index]
-                    cls_score = cls_confidence[idx, jdx]
-                    reg_score = reg_confidence[idx, jdx]
-                    score = tmin_score * tmax_score * cls_score * reg_score
-                    new_proposals.append([
-                        tmin, tmax, tmin_score, tmax_score, cls_score,
-                        reg_score, score
-                    ])
-        new_proposals = np.stack(new_proposals)
-        video_info = batch_data_samples[0].metainfo
-        proposal_list = post_processing(new_proposals, video_info,
-                                        self.soft_nms_alpha,
-                                        self.soft_nms_low_threshold,
-                                        self.soft_nms_high_threshold,
-                                        self.post_process_top_k,
-                                        self.feature_extraction_interval)
+        batch_proposals = self._decode_proposals(confidence_map, start, end)
+
+        video_infos = [sample.metainfo for sample in batch_data_samples]
+        proposal_lists = batch_post_processing(
+            batch_proposals, video_infos, self.soft_nms_alpha,
+            self.soft_nms_low_threshold, self.soft_nms_high_threshold,
+            self.post_process_top_k, self.feature_extraction_interval)
         output = [
             dict(
                 video_name=video_info['video_name'],
                 proposal_list=proposal_list)
+            for video_info, proposal_list in zip(video_infos, proposal_lists)
         ]
         return output
 
+    @staticmethod
+    def _generate_boundary_bins(scores):
+        """Select candidate boundary locations from boundary scores.
+
+        A location is selected if it is a local peak or its score is higher
+        than half of the maximum score of the video.
+
+        Args:
+            scores (torch.Tensor): Boundary scores with shape
+                [batch_size, tscale].
+        Returns:
+            torch.Tensor: Boolean mask with shape [batch_size, tscale]. The
+                first and last locations are left unselected.
+        """
+        max_scores = scores.max(dim=1, keepdim=True)[0]
+        inner = scores[:, 1:-1]
+        is_peak = (inner > scores[:, 2:]) & (inner > scores[:, :-2])
+        bins = torch.zeros_like(scores, dtype=torch.bool)
+        bins[:, 1:-1] = is_peak | (inner > 0.5 * max_scores)
+        return bins
+
+    def _decode_proposals(self, confidence_map, start, end):
+        """Decode proposals from the outputs of the whole batch.
+
+        Every (start_index, end_index) pair whose start and end locations are
+        both candidate boundaries is kept as a proposal. The proposals of
+        each video are ordered by duration and then by start index.
+
+        Args:
+            confidence_map (torch.Tensor): Boundary-matching confidence map
+                with shape [batch_size, 2, tscale, tscale].
+            start (torch.Tensor): Start scores with shape
+                [batch_size, tscale].
+            end (torch.Tensor): End scores with shape [batch_size, tscale].
+        Returns:
+            list[np.ndarray]: The proposals of each video, with shape
+                [num_proposals, 7]. Each row is (tmin, tmax, tmin_score,
+                tmax_score, cls_score, reg_score, score).
+        """
+        tscale = self.tscale
+        device = start.device
+        start_bins = self._generate_boundary_bins(start)
+        start_bins[:, 0] = True
+        end_bins = self._generate_boundary_bins(end)
+        end_bins[:, -1] = True
+
+        # the boundary-matching map is indexed by [duration, start_index]
+        durations = torch.arange(tscale, device=device).view(-1, 1)
+        start_inds = torch.arange(tscale, device=device).view(1, -1)
+        end_inds = start_inds + durations + 1
+        valid = end_inds < tscale
+        end_inds = end_inds.clamp(max=tscale - 1)
+        start_inds = start_inds.expand(tscale, tscale)
+
+        pair_mask = (valid[None] & start_bins[:, start_inds]
+                     & end_bins[:, end_inds])
+        batch_inds, duration_inds, start_inds = pair_mask.nonzero(
+            as_tuple=True)
+        end_inds = end_inds[duration_inds, start_inds]
+
+        tmin_scores = start[batch_inds, start_inds]
+        tmax_scores = end[batch_inds, end_inds]
+        cls_scores = confidence_map[batch_inds, 1, duration_inds, start_inds]
+        reg_scores = confidence_map[batch_inds, 0, duration_inds, start_inds]
+        scores = tmin_scores * tmax_scores * cls_scores * reg_scores
+        proposals = torch.stack(
+            (start_inds.to(scores.dtype), end_inds.to(scores.dtype),
+             tmin_scores, tmax_scores, cls_scores, reg_scores, scores),
+            dim=1).cpu().numpy().astype(np.float64)
+        proposals[:, :2] = proposals[:, :2] / tscale
+
+        batch_size = start.shape[0]
+        counts = torch.bincount(
+            batch_inds, minlength=batch_size).cpu().numpy()
+        return np.split(proposals, np.cumsum(counts)[:-1])
+
     @staticmethod
     def _get_interp1d_bin_mask(seg_tmin, seg_tmax, tscale, num_samples,
                                num_samples_per_bin):
@@ -406,62 +460,84 @@ class BMN(BaseModel):
                                                      self.tscale, self.tscale)
         return out
 
-    def generate_labels(self, gt_bbox):
-        """Generate training labels."""
-        # TODO: do this without numpy
-        match_score_confidence_list = []
-        match_score_start_list = []
-        match_score_end_list = []
-        for every_gt_bbox in gt_bbox:
-            gt_iou_map = []
-            every_gt_bbox = every_gt_bbox.cpu()
-            for start, end in every_gt_bbox:
-                if isinstance(start, torch.Tensor):
-                    start = start.numpy()
-                if isinstance(end, torch.Tensor):
-                    end = end.numpy()
-                current_gt_iou_map = temporal_iou(self.match_map[:, 0],
-                                                  self.match_map[:, 1], start,
-                                                  end)
-                current_gt_iou_map = np.reshape(current_gt_iou_map,
-                                                [self.tscale, self.tscale])
-                gt_iou_map.append(current_gt_iou_map)
-            gt_iou_map = np.array(gt_iou_map).astype(np.float32)
-            gt_iou_map = np.max(gt_iou_map, axis=0)
-
-            gt_tmins = every_gt_bbox[:, 0]
-            gt_tmaxs = every_gt_bbox[:, 1]
-
-            gt_len_pad = 3 * (1. / self.tscale)
-
-            gt_start_bboxs = np.stack(
-                (gt_tmins - gt_len_pad / 2, gt_tmins + gt_len_pad / 2), axis=1)
-            gt_end_bboxs = np.stack(
-                (gt_tmaxs - gt_len_pad / 2, gt_tmaxs + gt_len_pad / 2), axis=1)
-
-            match_score_start = []
-            match_score_end = []
-
-            for anchor_tmin, anchor_tmax in zip(self.anchors_tmins,
-                                                self.anchors_tmaxs):
-                match_score_start.append(
-                    np.max(
-                        temporal_iop(anchor_tmin, anchor_tmax,
-                                     gt_start_bboxs[:, 0], gt_start_bboxs[:,
-                                                                          1])))
-                match_score_end.append(
-                    np.max(
-                        temporal_iop(anchor_tmin, anchor_tmax,
-                                     gt_end_bboxs[:, 0], gt_end_bboxs[:, 1])))
-            match_score_confidence_list.append(gt_iou_map)
-            match_score_start_list.append(match_score_start)
-            match_score_end_list.append(match_score_end)
-
-        def to_tensor(x):
-            return torch.Tensor(np.array(x))
-
-        match_score_confidence_list = to_tensor(match_score_confidence_list)
-        match_score_start_list = to_tensor(match_score_start_list)
-        match_score_end_list = to_tensor(match_score_end_list)
-        return (match_score_confidence_list, match_score_start_list,
-                match_score_end_list)
+    def generate_labels(self, gt_bbox, video_names=None):
+        """Generate training labels.
+
+        Args:
+            gt_bbox (list[torch.Tensor]): Normalized groundtruth boxes of
+                each video, with shape [num_gts, 2].
+            video_names (list[str], optional): Names of the videos, used as
+                keys of the label cache. Labels are only cached when
+                ``cache_labels`` is True. Default: None.
+        Returns:
+            tuple[torch.Tensor]: The confidence labels with shape
+                [batch_size, tscale, tscale], the start labels and the end
+                labels with shape [batch_size, tscale], on the device of the
+                model.
+        """
+        device = self.bm_mask.device
+        if not self.cache_labels or video_names is None:
+            return self._generate_labels(gt_bbox, device)
+
+        missing = [
+            i for i, name in enumerate(video_names)
+            if name not in self._label_cache
+        ]
+        if len(missing) > 0:
+            labels = self._generate_labels([gt_bbox[i] for i in missing],
+                                           device)
+            for j, i in enumerate(missing):
+                self._label_cache[video_names[i]] = tuple(
+                    label[j].cpu() for label in labels)
+        labels = zip(*[self._label_cache[name] for name in video_names])
+        return tuple(torch.stack(label).to(device) for label in labels)
+
+    def _generate_labels(self, gt_bbox, device):
+        """Generate training labels of a batch on the given device."""
+        num_gts = [len(every_gt_bbox) for every_gt_bbox in gt_bbox]
+        gt_boxes = torch.zeros(len(gt_bbox), max(num_gts), 2, device=device)
+        for i, every_gt_bbox in enumerate(gt_bbox):
+            gt_boxes[i, :num_gts[i]] = every_gt_bbox.to(device)
+        gt_valid = torch.arange(
+            max(num_gts), device=device)[None] < torch.tensor(
+                num_gts, device=device)[:, None]
+        gt_tmins = gt_boxes[..., 0:1]
+        gt_tmaxs = gt_boxes[..., 1:2]
+
+        # temporal iou between each gt box and each boundary-matching pair
+        match_map = torch.as_tensor(
+            self.match_map, dtype=torch.float, device=device)
+        inter_len = (torch.min(match_map[:, 1], gt_tmaxs) -
+                     torch.max(match_map[:, 0], gt_tmins)).clamp(min=0.)
+        union_len = (match_map[:, 1] - match_map[:, 0]) - inter_len + (
+            gt_tmaxs - gt_tmins)
+        gt_iou_map = (inter_len / union_len) * gt_valid[..., None]
+        gt_iou_map = gt_iou_map.max(dim=1)[0].view(-1, self.tscale,
+                                                   self.tscale)
+
+        # temporal iop between each anchor and each gt boundary region
+        gt_len_pad = 3 * (1. / self.tscale)
+        anchors_tmins = torch.as_tensor(
+            self.anchors_tmins, dtype=torch.float, device=device)
+        anchors_tmaxs = torch.as_tensor(
+            self.anchors_tmaxs, dtype=torch.float, device=device)
+
+        def max_iop(gt_centers):
+            inter_len = (
+                torch.min(anchors_tmaxs, gt_centers + gt_len_pad / 2) -
+                torch.max(anchors_tmins, gt_centers - gt_len_pad / 2)).clamp(
+                    min=0.)
+            iop = inter_len / (anchors_tmaxs - anchors_tmins)
+            return (iop * gt_valid[..., None]).max(dim=1)[0]
+
+        match_score_start = max_iop(gt_tmins)
+        match_score_end = max_iop(gt_tmaxs)
+        return gt_iou_map, match_score_start, match_score_end
+
+    def dump_label_cache(self, filename):
+        """Save the cached training labels to ``filename``.
+
+        The saved file can be passed as ``label_cache_file`` so that labels
+        of a dataset with static annotations are generated only once.
+        """
+        torch.save(self._label_cache, filename)
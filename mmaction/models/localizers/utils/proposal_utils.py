@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import numpy as np
+import torch
 
 
 def temporal_iou(proposal_min, proposal_max, gt_min, gt_max):
@@ -56,41 +57,167 @@ def soft_nms(proposals, alpha, low_threshold, high_threshold, top_k):
         np.ndarray: The updated proposals.
     """
     proposals = proposals[proposals[:, -1].argsort()[::-1]]
-    tstart = list(proposals[:, 0])
-    tend = list(proposals[:, 1])
-    tscore = list(proposals[:, -1])
-    rstart = []
-    rend = []
-    rscore = []
-
-    while len(tscore) > 0 and len(rscore) <= top_k:
-        max_index = np.argmax(tscore)
+    tstart = proposals[:, 0]
+    tend = proposals[:, 1]
+    tscore = proposals[:, -1].copy()
+    remaining = np.ones(len(tscore), dtype=bool)
+    keep_inds = []
+    keep_scores = []
+
+    while remaining.any() and len(keep_inds) <= top_k:
+        max_index = np.argmax(np.where(remaining, tscore, -np.inf))
         max_width = tend[max_index] - tstart[max_index]
-        iou_list = temporal_iou(tstart[max_index], tend[max_index],
-                                np.array(tstart), np.array(tend))
-        iou_exp_list = np.exp(-np.square(iou_list) / alpha)
-
-        for idx, _ in enumerate(tscore):
-            if idx != max_index:
-                current_iou = iou_list[idx]
-                if current_iou > low_threshold + (high_threshold -
-                                                  low_threshold) * max_width:
-                    tscore[idx] = tscore[idx] * iou_exp_list[idx]
-
-        rstart.append(tstart[max_index])
-        rend.append(tend[max_index])
-        rscore.append(tscore[max_index])
-        tstart.pop(max_index)
-        tend.pop(max_index)
-        tscore.pop(max_index)
-
-    rstart = np.array(rstart).reshape(-1, 1)
-    rend = np.array(rend).reshape(-1, 1)
-    rscore = np.array(rscore).reshape(-1, 1)
-    new_proposals = np.concatenate((rstart, rend, rscore), axis=1)
+        iou_list = temporal_iou(tstart[max_index], tend[max_index], tstart,
+                                tend)
+        decay = remaining & (
+            iou_list > low_threshold +
+            (high_threshold - low_threshold) * max_width)
+        decay[max_index] = False
+        tscore[decay] = tscore[decay] * np.exp(
+            -np.square(iou_list[decay]) / alpha)
+
+        keep_inds.append(max_index)
+        keep_scores.append(tscore[max_index])
+        remaining[max_index] = False
+
+    keep_inds = np.array(keep_inds, dtype=np.int64)
+    keep_scores = np.array(keep_scores, dtype=tscore.dtype)
+    new_proposals = np.stack((tstart[keep_inds], tend[keep_inds], keep_scores),
+                             axis=1)
     return new_proposals
 
 
+def temporal_nms(proposals, iou_threshold, top_k=None):
+    """Hard NMS for temporal proposals.
+
+    Args:
+        proposals (np.ndarray): Proposals generated by network. The first two
+            columns are tmin and tmax, and the last column is the score.
+        iou_threshold (float): Proposals overlapping a kept proposal with an
+            IoU higher than this value are suppressed.
+        top_k (int | None): Max number of proposals to keep. If None, all
+            proposals surviving NMS are kept. Default: None.
+    Returns:
+        np.ndarray: The kept proposals, sorted by score in descending order.
+    """
+    proposals = proposals[proposals[:, -1].argsort()[::-1]]
+    tstart = proposals[:, 0]
+    tend = proposals[:, 1]
+    remaining = np.ones(len(proposals), dtype=bool)
+    keep_inds = []
+
+    for idx in range(len(proposals)):
+        if not remaining[idx]:
+            continue
+        keep_inds.append(idx)
+        if top_k is not None and len(keep_inds) >= top_k:
+            break
+        iou_list = temporal_iou(tstart[idx], tend[idx], tstart, tend)
+        remaining &= ~(iou_list > iou_threshold)
+
+    return proposals[np.array(keep_inds, dtype=np.int64)]
+
+
+def batched_soft_nms(proposals, alpha, low_threshold, high_threshold, top_k):
+    """Soft NMS for the temporal proposals of many videos at once.
+
+    The proposals of all videos are padded into one tensor and every step of
+    soft NMS is applied to all videos in parallel, so that the result is the
+    same as calling :func:`soft_nms` on each video.
+
+    Args:
+        proposals (list[torch.Tensor | np.ndarray]): Proposals of each video.
+            The first two columns are tmin and tmax, and the last column is
+            the score.
+        alpha (float): Alpha value of Gaussian decaying function.
+        low_threshold (float): Low threshold for soft nms.
+        high_threshold (float): High threshold for soft nms.
+        top_k (int): Top k values to be considered.
+    Returns:
+        list[torch.Tensor]: The updated proposals of each video, with shape
+            [num_kept, 3].
+    """
+    if len(proposals) == 0:
+        return []
+    proposals = [torch.as_tensor(proposal) for proposal in proposals]
+    batch_size = len(proposals)
+    device = proposals[0].device
+    num_proposals = torch.tensor([len(proposal) for proposal in proposals],
+                                 device=device)
+    max_num = max(int(num_proposals.max()), 1)
+
+    tstart = proposals[0].new_zeros(batch_size, max_num)
+    tend = proposals[0].new_zeros(batch_size, max_num)
+    tscore = proposals[0].new_full((batch_size, max_num), -float('inf'))
+    for i, proposal in enumerate(proposals):
+        order = proposal[:, -1].argsort(descending=True)
+        proposal = proposal[order]
+        tstart[i, :len(proposal)] = proposal[:, 0]
+        tend[i, :len(proposal)] = proposal[:, 1]
+        tscore[i, :len(proposal)] = proposal[:, -1]
+    remaining = torch.arange(
+        max_num, device=device)[None] < num_proposals[:, None]
+
+    batch_inds = torch.arange(batch_size, device=device)
+    neg_inf = tscore.new_tensor(-float('inf'))
+    keep_start, keep_end, keep_score, keep_valid = [], [], [], []
+    for _ in range(top_k + 1):
+        valid = remaining.any(dim=1)
+        if not valid.any():
+            break
+        max_score, max_inds = torch.where(remaining, tscore, neg_inf).max(
+            dim=1)
+        max_start = tstart[batch_inds, max_inds]
+        max_end = tend[batch_inds, max_inds]
+        max_width = max_end - max_start
+
+        inter_len = (torch.min(tend, max_end[:, None]) -
+                     torch.max(tstart, max_start[:, None])).clamp(min=0.)
+        union_len = max_width[:, None] - inter_len + tend - tstart
+        iou = inter_len / union_len
+        decay = remaining & (
+            iou > (low_threshold +
+                   (high_threshold - low_threshold) * max_width)[:, None])
+        decay[batch_inds, max_inds] = False
+        tscore = torch.where(decay, tscore * torch.exp(-iou.square() / alpha),
+                             tscore)
+
+        keep_start.append(max_start)
+        keep_end.append(max_end)
+        keep_score.append(max_score)
+        keep_valid.append(valid)
+        remaining[batch_inds, max_inds] = False
+
+    if len(keep_valid) == 0:
+        return [tstart.new_zeros(0, 3) for _ in range(batch_size)]
+    kept = torch.stack((torch.stack(keep_start, dim=1),
+                        torch.stack(keep_end, dim=1),
+                        torch.stack(keep_score, dim=1)),
+                       dim=2)
+    keep_valid = torch.stack(keep_valid, dim=1)
+    return [kept[i][keep_valid[i]] for i in range(batch_size)]
+
+
+def _format_proposals(result, video_info, post_process_top_k,
+                      feature_extraction_interval):
+    """Convert sorted proposals to a list of dicts in seconds."""
+    video_duration = float(
+        video_info['duration_frame'] // feature_extraction_interval *
+        feature_extraction_interval
+    ) / video_info['duration_frame'] * video_info['duration_second']
+    proposal_list = []
+
+    for j in range(min(post_process_top_k, len(result))):
+        proposal = {}
+        proposal['score'] = float(result[j, -1])
+        proposal['segment'] = [
+            max(0, result[j, 0]) * video_duration,
+            min(1, result[j, 1]) * video_duration
+        ]
+        proposal_list.append(proposal)
+    return proposal_list
+
+
 def post_processing(result, video_info, soft_nms_alpha, soft_nms_low_threshold,
                     soft_nms_high_threshold, post_process_top_k,
                     feature_extraction_interval):
@@ -115,18 +242,39 @@ def post_processing(result, video_info, soft_nms_alpha, soft_nms_low_threshold,
                           soft_nms_high_threshold, post_process_top_k)
 
     result = result[result[:, -1].argsort()[::-1]]
-    video_duration = float(
-        video_info['duration_frame'] // feature_extraction_interval *
-        feature_extraction_interval
-    ) / video_info['duration_frame'] * video_info['duration_second']
-    proposal_list = []
+    return _format_proposals(result, video_info, post_process_top_k,
+                             feature_extraction_interval)
 
-    for j in range(min(post_process_top_k, len(result))):
-        proposal = {}
-        proposal['score'] = float(result[j, -1])
-        proposal['segment'] = [
-            max(0, result[j, 0]) * video_duration,
-            min(1, result[j, 1]) * video_duration
-        ]
-        proposal_list.append(proposal)
-    return proposal_list
+
+def batch_post_processing(results, video_infos, soft_nms_alpha,
+                          soft_nms_low_threshold, soft_nms_high_threshold,
+                          post_process_top_k, feature_extraction_interval):
+    """Post process the temporal proposals of a batch of videos.
+
+    Soft NMS runs on all videos at once with :func:`batched_soft_nms`. The
+    output is the same as calling :func:`post_processing` on each video.
+
+    Args:
+        results (list[np.ndarray | torch.Tensor]): Proposals generated by
+            network for each video.
+        video_infos (list[dict]): Meta data of each video. Required keys are
+            'duration_frame', 'duration_second'.
+        soft_nms_alpha (float): Alpha value of Gaussian decaying function.
+        soft_nms_low_threshold (float): Low threshold for soft nms.
+        soft_nms_high_threshold (float): High threshold for soft nms.
+        post_process_top_k (int): Top k values to be considered.
+        feature_extraction_interval (int): Interval used in feature extraction.
+    Returns:
+        list[list[dict]]: The updated proposals of each video.
+    """
+    nms_results = batched_soft_nms(results, soft_nms_alpha,
+                                   soft_nms_low_threshold,
+                                   soft_nms_high_threshold, post_process_top_k)
+    proposal_lists = []
+    for result, video_info in zip(nms_results, video_infos):
+        result = result.cpu().numpy()
+        result = result[result[:, -1].argsort()[::-1]]
+        proposal_lists.append(
+            _format_proposals(result, video_info, post_process_top_k,
+                              feature_extraction_interval))
+    return proposal_lists
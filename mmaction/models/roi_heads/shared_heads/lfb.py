@@ -4,10 +4,13 @@ import os
 import os.path as osp
 import warnings
 
+import numpy as np
 import torch
 import torch.distributed as dist
 from mmengine.dist import get_dist_info
 
+from mmaction.utils import PackedArrayReader, PackedArrayWriter
+
 try:
     import lmdb
     lmdb_imported = True
@@ -54,13 +57,21 @@ class LFB:
             do cross validation during training, just load the training dataset
             i.e. setting `dataset_modes = ('train')`.
             Default: ('train', 'val').
-        device (str): Where to load lfb. Choices are 'gpu', 'cpu' and 'lmdb'.
-            A 1.65GB half-precision ava lfb (including training and validation)
-            occupies about 2GB GPU memory. Default: 'gpu'.
+        device (str): Where to load lfb. Choices are 'gpu', 'cpu', 'lmdb'
+            and 'packed'. A 1.65GB half-precision ava lfb (including training
+            and validation) occupies about 2GB GPU memory. 'packed' stores
+            the features of all videos in one contiguous memory-mapped array
+            with a (video, second) index, shared read-only through the page
+            cache by all ranks and dataloader workers. Default: 'gpu'.
         lmdb_map_size (int): Map size of lmdb. Default: 4e9.
         construct_lmdb (bool): Whether to construct lmdb. If you have
             constructed lmdb of lfb, you can set to False to skip the
             construction. Default: True.
+        construct_packed (bool): Whether to construct the packed lfb. If you
+            have constructed it, you can set to False to skip the
+            construction. Default: True.
+        packed_dtype (str): Data type of the features in the packed lfb.
+            Default: 'float16'.
     """
 
     def __init__(self,
@@ -71,7 +82,9 @@ class LFB:
                  dataset_modes=('train', 'val'),
                  device='gpu',
                  lmdb_map_size=4e9,
-                 construct_lmdb=True):
+                 construct_lmdb=True,
+                 construct_packed=True,
+                 packed_dtype='float16'):
         if not osp.exists(lfb_prefix_path):
             raise ValueError(
                 f'lfb prefix path {lfb_prefix_path} does not exist!')
@@ -118,9 +131,29 @@ class LFB:
             if world_size > 1:
                 dist.barrier()
             self.lmdb_env = lmdb.open(self.lfb_lmdb_path, readonly=True)
+        elif self.device == 'packed':
+            self.construct_packed = construct_packed
+            self.packed_dtype = packed_dtype
+            self.lfb_packed_path = osp.normpath(
+                osp.join(self.lfb_prefix_path, 'packed'))
+
+            if rank == 0 and self.construct_packed:
+                print('Constructing packed LFB...')
+                self.load_lfb_on_packed()
+
+            # Synchronizes all processes to make sure packed lfb exist.
+            if world_size > 1:
+                dist.barrier()
+            # features of each video, sorted by second
+            self.feature_store = PackedArrayReader(
+                osp.join(self.lfb_packed_path, 'features'))
+            # rows of (second, offset, count) of each video
+            self.index_store = PackedArrayReader(
+                osp.join(self.lfb_packed_path, 'index'))
         else:
-            raise ValueError("Device must be 'gpu', 'cpu' or 'lmdb', ",
-                             f'but get {self.device}.')
+            raise ValueError(
+                "Device must be 'gpu', 'cpu', 'lmdb' or 'packed', ",
+                f'but get {self.device}.')
 
     def load_lfb(self, map_location):
         self.lfb = {}
@@ -157,7 +190,74 @@ class LFB:
 
         print(f'LFB lmdb has been constructed on {self.lfb_lmdb_path}!')
 
+    def load_lfb_on_packed(self):
+        lfb = {}
+        for dataset_mode in self.dataset_modes:
+            lfb_path = osp.normpath(
+                osp.join(self.lfb_prefix_path, f'lfb_{dataset_mode}.pkl'))
+            lfb.update(torch.load(lfb_path, map_location='cpu'))
+
+        feature_writer = PackedArrayWriter(
+            osp.join(self.lfb_packed_path, 'features'), self.packed_dtype)
+        index_writer = PackedArrayWriter(
+            osp.join(self.lfb_packed_path, 'index'), 'int64')
+        for video_id, video_features in lfb.items():
+            feats, index = [], []
+            offset = 0
+            for sec in sorted(video_features):
+                feat = video_features[sec]
+                if isinstance(feat, (list, tuple)):
+                    feat = torch.stack(feat)
+                feats.append(feat.float().numpy())
+                index.append([sec, offset, len(feat)])
+                offset += len(feat)
+            feature_writer.add(
+                video_id,
+                np.concatenate(feats) if feats else np.zeros(
+                    (0, self.lfb_channels)))
+            index_writer.add(video_id, np.array(index).reshape(-1, 3))
+        feature_writer.close()
+        index_writer.close()
+
+        print(f'Packed LFB has been constructed on {self.lfb_packed_path}!')
+
+    def sample_packed_long_term_features(self, video_id, timestamp):
+        """Sample the long term features of a window in one gather from the
+        packed lfb."""
+        window_size, K = self.window_size, self.max_num_sampled_feat
+        start = timestamp - (window_size // 2)
+        index = self.index_store[video_id]
+        lt_feats = torch.zeros(window_size, K, self.lfb_channels)
+        if len(index) == 0:
+            return lt_feats.reshape(-1, self.lfb_channels)
+
+        secs = np.arange(start, start + window_size)
+        pos = np.minimum(np.searchsorted(index[:, 0], secs), len(index) - 1)
+        hit = index[pos, 0] == secs
+        offsets = np.where(hit, index[pos, 1], 0)
+        counts = np.where(hit, index[pos, 2], 0)
+        max_count = int(counts.max())
+        if max_count == 0:
+            return lt_feats.reshape(-1, self.lfb_channels)
+
+        # a random permutation of the roi features of each second, the same
+        # as ``torch.randperm`` per second
+        keys = torch.rand(window_size, max_count)
+        keys[torch.arange(max_count) >= torch.from_numpy(counts)[:, None]] = 2
+        perm = keys.argsort(dim=1)[:, :K].numpy()
+        valid = np.arange(perm.shape[1]) < counts[:, None]
+        rows = (offsets[:, None] + perm)[valid]
+
+        feats = self.feature_store[video_id][rows]
+        lt_feats[:, :perm.shape[1]][torch.from_numpy(valid)] = \
+            torch.from_numpy(feats.astype(np.float32))
+
+        # [window_size * max_num_sampled_feat, lfb_channels]
+        return lt_feats.reshape(-1, self.lfb_channels)
+
     def sample_long_term_features(self, video_id, timestamp):
+        if self.device == 'packed':
+            return self.sample_packed_long_term_features(video_id, timestamp)
         if self.device == 'lmdb':
             with self.lmdb_env.begin(write=False) as txn:
                 buf = txn.get(video_id.encode())
@@ -191,4 +291,6 @@ class LFB:
 
     def __len__(self):
         """The number of videos whose ROI features are stored in LFB."""
+        if self.device == 'packed':
+            return len(self.index_store)
         return len(self.lfb)
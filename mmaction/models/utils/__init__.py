@@ -1,4 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .batch_augments import VideoBatchAugment
 from .blending_utils import (BaseMiniBatchBlending, CutmixBlending,
                              MixupBlending, RandomBatchAugment)
 from .gcn_utils import *  # noqa: F401,F403
@@ -6,5 +7,5 @@ from .graph import Graph
 
 __all__ = [
     'BaseMiniBatchBlending', 'CutmixBlending', 'MixupBlending', 'Graph',
-    'RandomBatchAugment'
+    'RandomBatchAugment', 'VideoBatchAugment'
 ]
@@ -0,0 +1,237 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+from typing import Optional, Sequence, Tuple, Union
+
+import torch
+import torch.nn.functional as F
+from mmengine.utils import is_tuple_of
+
+from mmaction.registry import MODELS
+
+
+def _jitter_range(value: Union[float, Tuple[float]], max_value: float,
+                  base: float) -> Optional[Tuple[float]]:
+    """Get the jitter range like ``ColorJitter``, or None if disabled."""
+    if isinstance(value, tuple):
+        assert base - max_value <= value[0] <= value[1] <= base + max_value
+    else:
+        assert 0 <= value <= max_value
+        value = (base - value, base + value)
+    return None if value == (base, base) else value
+
+
+@MODELS.register_module()
+class VideoBatchAugment:
+    """Random resized crop, flip and color jitter of a batch of clips.
+
+    The augmentations of ``RandomResizedCrop``, ``Resize``, ``Flip`` and
+    ``ColorJitter`` are applied to the stacked batch on its device, so the
+    dataloader workers only decode the frames. Each sample draws its own
+    random parameters, shared by all its frames. The crop, resize and flip
+    are fused into a single bilinear ``grid_sample``.
+
+    The frames of a batch must share the same spatial size, e.g. by resizing
+    them to a fixed shape in the data pipeline, and be in RGB order.
+
+    Args:
+        out_size (int | tuple[int], optional): (w, h) of the output frames.
+            Defaults to None, which keeps the input size.
+        area_range (tuple[float], optional): The candidate area scales range
+            of the crops. Defaults to (0.08, 1.0). If None, the whole frame
+            is used.
+        aspect_ratio_range (tuple[float]): The candidate aspect ratio range
+            of the crops. Defaults to (3 / 4, 4 / 3).
+        max_attempts (int): Max attempts to sample a crop within the ranges,
+            before falling back to the center square. Defaults to 10.
+        flip_ratio (float): Probability of a horizontal flip.
+            Defaults to 0.5.
+        brightness (float | tuple[float]): The jitter range for brightness,
+            if set as a float, the range will be (1 - brightness,
+            1 + brightness). Defaults to 0.
+        contrast (float | tuple[float]): The jitter range for contrast, if
+            set as a float, the range will be (1 - contrast, 1 + contrast).
+            Defaults to 0.
+        saturation (float | tuple[float]): The jitter range for saturation,
+            if set as a float, the range will be (1 - saturation,
+            1 + saturation). Defaults to 0.
+        hue (float | tuple[float]): The jitter range for hue, if set as a
+            float, the range will be (-hue, hue). Defaults to 0.
+    """
+
+    def __init__(self,
+                 out_size: Optional[Union[int, Tuple[int]]] = None,
+                 area_range: Optional[Tuple[float]] = (0.08, 1.0),
+                 aspect_ratio_range: Tuple[float] = (3 / 4, 4 / 3),
+                 max_attempts: int = 10,
+                 flip_ratio: float = 0.5,
+                 brightness: Union[float, Tuple[float]] = 0,
+                 contrast: Union[float, Tuple[float]] = 0,
+                 saturation: Union[float, Tuple[float]] = 0,
+                 hue: Union[float, Tuple[float]] = 0) -> None:
+        if isinstance(out_size, int):
+            out_size = (out_size, out_size)
+        assert out_size is None or is_tuple_of(out_size, int)
+        if area_range is not None:
+            assert 0 < area_range[0] <= area_range[1] <= 1
+        assert 0 < aspect_ratio_range[0] <= aspect_ratio_range[1]
+        assert 0 <= flip_ratio <= 1
+
+        self.out_size = out_size
+        self.area_range = area_range
+        self.aspect_ratio_range = aspect_ratio_range
+        self.max_attempts = max_attempts
+        self.flip_ratio = flip_ratio
+        self.brightness = _jitter_range(brightness, 1, 1)
+        self.contrast = _jitter_range(contrast, 1, 1)
+        self.saturation = _jitter_range(saturation, 1, 1)
+        self.hue = _jitter_range(hue, 0.5, 0)
+
+    def _sample_crops(self, batch_size: int, img_h: int, img_w: int,
+                      device: torch.device) -> Tuple[torch.Tensor]:
+        """Sample the crop of each sample the same way as
+        ``RandomResizedCrop``."""
+        shape = (batch_size, self.max_attempts)
+        min_ar, max_ar = self.aspect_ratio_range
+        aspect_ratios = torch.empty(
+            shape, device=device).uniform_(math.log(min_ar),
+                                           math.log(max_ar)).exp()
+        target_areas = torch.empty(
+            shape, device=device).uniform_(*self.area_range) * img_h * img_w
+        crop_w = torch.sqrt(target_areas * aspect_ratios).round()
+        crop_h = torch.sqrt(target_areas / aspect_ratios).round()
+
+        # the first valid attempt, or the center square as the fallback
+        valid = (crop_w <= img_w) & (crop_h <= img_h)
+        first = valid.int().argmax(dim=1)
+        rows = torch.arange(batch_size, device=device)
+        fallback = torch.full((batch_size, ),
+                              float(min(img_h, img_w)),
+                              device=device)
+        found = valid.any(dim=1)
+        crop_w = torch.where(found, crop_w[rows, first], fallback)
+        crop_h = torch.where(found, crop_h[rows, first], fallback)
+
+        rand = torch.rand((2, batch_size), device=device)
+        x_offset = torch.where(found, (rand[0] * (img_w - crop_w + 1)).floor(),
+                               ((img_w - crop_w) / 2).floor())
+        y_offset = torch.where(found, (rand[1] * (img_h - crop_h + 1)).floor(),
+                               ((img_h - crop_h) / 2).floor())
+        return x_offset, y_offset, crop_w, crop_h
+
+    def _resized_crop_flip(self, imgs: torch.Tensor) -> torch.Tensor:
+        """Crop, resize and flip the frames with one ``grid_sample``."""
+        batch_size, img_h, img_w = imgs.size(0), imgs.size(-2), imgs.size(-1)
+        out_w, out_h = self.out_size or (img_w, img_h)
+        device = imgs.device
+
+        if self.area_range is not None:
+            x_offset, y_offset, crop_w, crop_h = self._sample_crops(
+                batch_size, img_h, img_w, device)
+        else:
+            x_offset = y_offset = torch.zeros(batch_size, device=device)
+            crop_w = torch.full((batch_size, ), float(img_w), device=device)
+            crop_h = torch.full((batch_size, ), float(img_h), device=device)
+        flip = torch.rand(batch_size, device=device) < self.flip_ratio
+
+        # map the normalized output coordinates into the crops
+        theta = torch.zeros((batch_size, 2, 3), device=device)
+        theta[:, 0, 0] = torch.where(flip, -crop_w, crop_w) / img_w
+        theta[:, 0, 2] = (x_offset + crop_w / 2) / img_w * 2 - 1
+        theta[:, 1, 1] = crop_h / img_h
+        theta[:, 1, 2] = (y_offset + crop_h / 2) / img_h * 2 - 1
+
+        flat_imgs = imgs.reshape(batch_size, -1, img_h, img_w)
+        grid = F.affine_grid(
+            theta, (batch_size, flat_imgs.size(1), out_h, out_w),
+            align_corners=False)
+        flat_imgs = F.grid_sample(
+            flat_imgs,
+            grid,
+            mode='bilinear',
+            padding_mode='border',
+            align_corners=False)
+        return flat_imgs.reshape(imgs.shape[:-2] + (out_h, out_w))
+
+    @staticmethod
+    def _rgb_to_grayscale(imgs: torch.Tensor) -> torch.Tensor:
+        r, g, b = imgs.unbind(dim=2)
+        return (0.2989 * r + 0.587 * g + 0.114 * b).unsqueeze(2)
+
+    @staticmethod
+    def _adjust_hue(imgs: torch.Tensor, factor: torch.Tensor) -> torch.Tensor:
+        """Rotate the hue by ``factor`` in the HSV space."""
+        imgs = imgs.clamp(0, 255) / 255
+        r, g, b = imgs.unbind(dim=2)
+        max_c, min_c = imgs.amax(dim=2), imgs.amin(dim=2)
+        delta = max_c - min_c
+        safe_delta = torch.where(delta > 0, delta, torch.ones_like(delta))
+        hue = torch.where(
+            max_c == r, ((g - b) / safe_delta) % 6,
+            torch.where(max_c == g, (b - r) / safe_delta + 2,
+                        (r - g) / safe_delta + 4)) / 6
+        hue = torch.where(delta > 0, hue, torch.zeros_like(hue))
+        saturation = delta / max_c.clamp(min=1e-8)
+
+        # the same offset as ``ColorJitter``, which shifts the 180 OpenCV
+        # hues by ``factor * 255``
+        hue = (hue + factor.squeeze(2) * 255 / 180) % 1
+        n_shape = (1, 1, 3) + (1, ) * (imgs.ndim - 3)
+        n = imgs.new_tensor([5., 3., 1.]).view(n_shape)
+        k = (n + hue.unsqueeze(2) * 6) % 6
+        weights = torch.minimum(k, 4 - k).clamp(0, 1)
+        rgb = max_c.unsqueeze(2) * (1 - saturation.unsqueeze(2) * weights)
+        return rgb * 255
+
+    def _color_jitter(self, imgs: torch.Tensor) -> torch.Tensor:
+        """Jitter the brightness, contrast, saturation and hue like
+        ``ColorJitter``, with the factors drawn per sample."""
+        shape = (imgs.size(0), ) + (1, ) * (imgs.ndim - 1)
+
+        def sample(bounds: Sequence[float]) -> torch.Tensor:
+            return torch.empty(shape, device=imgs.device).uniform_(*bounds)
+
+        if self.brightness is not None:
+            imgs = imgs * sample(self.brightness)
+        if self.contrast is not None:
+            factor = sample(self.contrast)
+            mean = self._rgb_to_grayscale(imgs).mean(
+                dim=(-2, -1), keepdim=True)
+            imgs = factor * imgs + (1 - factor) * mean
+        if self.saturation is not None:
+            factor = sample(self.saturation)
+            imgs = factor * imgs + (1 - factor) * self._rgb_to_grayscale(imgs)
+        if self.hue is not None:
+            imgs = self._adjust_hue(imgs, sample(self.hue))
+        return imgs.clamp(0, 255)
+
+    def __call__(self, imgs: torch.Tensor) -> torch.Tensor:
+        """Augment a batch of clips.
+
+        Args:
+            imgs (torch.Tensor): Stacked frames with the shape of
+                (B, N, C, H, W) or (B, N, C, T, H, W), usually uint8.
+
+        Returns:
+            torch.Tensor: Augmented float frames with the shape of
+            (B, N, C, H', W') or (B, N, C, T, H', W').
+        """
+        imgs = imgs.float()
+        if (self.area_range is not None or self.flip_ratio > 0
+                or self.out_size is not None):
+            imgs = self._resized_crop_flip(imgs)
+        if any(jitter is not None for jitter in
+               (self.brightness, self.contrast, self.saturation, self.hue)):
+            imgs = self._color_jitter(imgs)
+        return imgs
+
+    def __repr__(self) -> str:
+        repr_str = (f'{self.__class__.__name__}('
+                    f'out_size={self.out_size}, '
+                    f'area_range={self.area_range}, '
+                    f'aspect_ratio_range={self.aspect_ratio_range}, '
+                    f'flip_ratio={self.flip_ratio}, '
+                    f'brightness={self.brightness}, '
+                    f'contrast={self.contrast}, '
+                    f'saturation={self.saturation}, '
+                    f'hue={self.hue})')
+        return repr_str
@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from ._utils import (check_norm_state, generate_backbone_demo_inputs,
+from ._utils import (bmn_loop_decode_proposals, check_norm_state,
+                     generate_backbone_demo_inputs,
                      generate_detector_demo_inputs, get_audio_recognizer_cfg,
                      get_cfg, get_detector_cfg, get_localizer_cfg,
                      get_recognizer_cfg, get_similarity_cfg,
@@ -9,5 +10,5 @@ __all__ = [
     'check_norm_state', 'generate_backbone_demo_inputs', 'get_cfg',
     'get_recognizer_cfg', 'get_audio_recognizer_cfg', 'get_localizer_cfg',
     'get_detector_cfg', 'generate_detector_demo_inputs', 'get_skeletongcn_cfg',
-    'get_similarity_cfg'
+    'get_similarity_cfg', 'bmn_loop_decode_proposals'
 ]
@@ -145,3 +145,50 @@ def get_skeletongcn_cfg(fname):
 
 def get_similarity_cfg(fname):
     return get_cfg('retrieval', fname)
+
+
+def bmn_loop_decode_proposals(tscale, confidence_map, start, end):
+    """Decode the BMN proposals of a single video with the per-pair loop.
+
+    It is the reference of the batched decoding of ``BMN``.
+    """
+    start_scores = start.cpu().numpy()
+    end_scores = end.cpu().numpy()
+    cls_confidence = confidence_map[1].cpu().numpy()
+    reg_confidence = confidence_map[0].cpu().numpy()
+    max_start = max(start_scores)
+    max_end = max(end_scores)
+
+    start_bins = np.zeros(len(start_scores))
+    start_bins[0] = 1
+    end_bins = np.zeros(len(end_scores))
+    end_bins[-1] = 1
+    for idx in range(1, tscale - 1):
+        if start_scores[idx] > start_scores[
+                idx + 1] and start_scores[idx] > start_scores[idx - 1]:
+            start_bins[idx] = 1
+        elif start_scores[idx] > (0.5 * max_start):
+            start_bins[idx] = 1
+        if end_scores[idx] > end_scores[
+                idx + 1] and end_scores[idx] > end_scores[idx - 1]:
+            end_bins[idx] = 1
+        elif end_scores[idx] > (0.5 * max_end):
+            end_bins[idx] = 1
+
+    new_proposals = []
+    for idx in range(tscale):
+        for jdx in range(tscale):
+            start_index = jdx
+            end_index = start_index + idx + 1
+            if end_index < tscale and start_bins[
+                    start_index] == 1 and end_bins[end_index] == 1:
+                tmin_score = start_scores[start_index]
+                tmax_score = end_scores[end_index]
+                cls_score = cls_confidence[idx, jdx]
+                reg_score = reg_confidence[idx, jdx]
+                score = tmin_score * tmax_score * cls_score * reg_score
+                new_proposals.append([
+                    start_index / tscale, end_index / tscale, tmin_score,
+                    tmax_score, cls_score, reg_score, score
+                ])
+    return np.stack(new_proposals)
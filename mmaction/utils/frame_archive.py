@@ -0,0 +1,99 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import mmap
+import os
+import struct
+
+import numpy as np
+
+FRAME_ARCHIVE_EXT = '.frames'
+_MAGIC = b'MMAFRM01'
+# number of frames (int64) followed by the magic bytes
+_TRAILER = struct.Struct('<q8s')
+
+
+class FrameArchiveWriter:
+    """Write the encoded frames of a video into a single archive file.
+
+    The archive stores the frame bytes back to back, followed by an offset
+    table of ``num_frames + 1`` int64 values and a trailer holding the number
+    of frames. The file is written to a temporary path and renamed on
+    :meth:`close`, so an existing archive is always complete.
+
+    Args:
+        archive_path (str): Path of the archive file.
+    """
+
+    def __init__(self, archive_path: str) -> None:
+        self.archive_path = archive_path
+        self._tmp_path = f'{archive_path}.tmp'
+        self._file = open(self._tmp_path, 'wb')
+        self._offsets = [0]
+
+    def add(self, frame_bytes: bytes) -> None:
+        """Append the encoded bytes of the next frame, e.g. a JPEG file."""
+        self._file.write(frame_bytes)
+        self._offsets.append(self._offsets[-1] + len(frame_bytes))
+
+    def close(self) -> None:
+        """Write the offset table and move the archive to its final path."""
+        self._file.write(np.array(self._offsets, dtype='<i8').tobytes())
+        self._file.write(_TRAILER.pack(len(self._offsets) - 1, _MAGIC))
+        self._file.close()
+        os.replace(self._tmp_path, self.archive_path)
+
+    def __enter__(self) -> 'FrameArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self._tmp_path)
+
+
+class FrameArchiveReader:
+    """Read frames by index from an archive written by
+    :class:`FrameArchiveWriter`.
+
+    The archive is opened once and memory-mapped, so reading any number of
+    frames of a video costs a single file open.
+
+    Args:
+        archive_path (str): Path of the archive file.
+    """
+
+    def __init__(self, archive_path: str) -> None:
+        self.archive_path = archive_path
+        with open(archive_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        num_frames, magic = _TRAILER.unpack_from(
+            self._mmap,
+            len(self._mmap) - _TRAILER.size)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{archive_path} is not a frame archive')
+        table_start = len(self._mmap) - _TRAILER.size - 8 * (num_frames + 1)
+        self._offsets = np.frombuffer(
+            self._mmap, dtype='<i8', count=num_frames + 1,
+            offset=table_start).copy()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def get(self, index: int) -> bytes:
+        """Get the encoded bytes of the frame at ``index``."""
+        if not 0 <= index < len(self):
+            raise IndexError(f'frame index {index} out of range for '
+                             f'{self.archive_path} with {len(self)} frames')
+        return self._mmap[self._offsets[index]:self._offsets[index + 1]]
+
+    def close(self) -> None:
+        """Release the memory mapping."""
+        self._mmap.close()
+
+    def __enter__(self) -> 'FrameArchiveReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
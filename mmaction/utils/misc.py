@@ -6,7 +6,7 @@ import os.path as osp
 import random
 import string
 from types import FunctionType, ModuleType
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 import cv2
 import mmcv
@@ -36,6 +36,38 @@ def get_shm_dir() -> str:
     return '/dev/shm'
 
 
+def _read_frames(video_path: str, short_side: Optional[int] = None):
+    """Read the frames of a video with OpenCV, resized to ``short_side``."""
+    assert osp.exists(video_path), f'file not exit {video_path}'
+    vid = cv2.VideoCapture(video_path)
+    flag, frame = vid.read()
+    new_h, new_w = None, None
+    while flag:
+        if short_side is not None:
+            if new_h is None:
+                h, w, _ = frame.shape
+                new_w, new_h = mmcv.rescale_size((w, h), (short_side, np.Inf))
+            frame = mmcv.imresize(frame, (new_w, new_h))
+        yield frame
+        flag, frame = vid.read()
+
+
+def frame_decode(video_path: str,
+                 short_side: Optional[int] = None) -> List[np.ndarray]:
+    """Decode the frames of a video into memory, without writing them to
+    disk like :func:`frame_extract`.
+
+    Args:
+        video_path (str): The video path.
+        short_side (int): Target short-side of the output image.
+            Defaults to None, means keeping original shape.
+
+    Returns:
+        list[np.ndarray]: The BGR frames.
+    """
+    return list(_read_frames(video_path, short_side))
+
+
 def frame_extract(video_path: str,
                   short_side: Optional[int] = None,
                   out_dir: str = './tmp'):
@@ -52,27 +84,14 @@ def frame_extract(video_path: str,
     os.makedirs(target_dir, exist_ok=True)
     # Should be able to handle videos up to several hours
     frame_tmpl = osp.join(target_dir, 'img_{:06d}.jpg')
-    assert osp.exists(video_path), f'file not exit {video_path}'
-    vid = cv2.VideoCapture(video_path)
     frames = []
     frame_paths = []
-    flag, frame = vid.read()
-    cnt = 0
-    new_h, new_w = None, None
-    while flag:
-        if short_side is not None:
-            if new_h is None:
-                h, w, _ = frame.shape
-                new_w, new_h = mmcv.rescale_size((w, h), (short_side, np.Inf))
-            frame = mmcv.imresize(frame, (new_w, new_h))
-
+    for cnt, frame in enumerate(_read_frames(video_path, short_side)):
         frames.append(frame)
         frame_path = frame_tmpl.format(cnt + 1)
         frame_paths.append(frame_path)
 
         cv2.imwrite(frame_path, frame)
-        cnt += 1
-        flag, frame = vid.read()
 
     return frame_paths, frames
 
@@ -0,0 +1,126 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import json
+import os
+import os.path as osp
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+DATA_FILENAME = 'data.bin'
+INDEX_FILENAME = 'index.json'
+
+
+class PackedArrayWriter:
+    """Write named arrays into a packed, memory-mappable store.
+
+    All arrays are appended to a single binary file and an index mapping each
+    name to its element offset and shape is written on :meth:`close`. Arrays
+    are added one at a time, so stores larger than the memory can be built.
+    The files are written to temporary paths and moved into place on
+    :meth:`close`, so an existing store is kept intact until the new one is
+    complete, and left intact if writing fails.
+
+    Args:
+        store_dir (str): Directory of the store, created if not existing.
+        dtype (str | np.dtype): Data type of the stored arrays. Arrays of
+            other types are cast. Defaults to ``'float32'``.
+    """
+
+    def __init__(self, store_dir: str, dtype: str = 'float32') -> None:
+        self.store_dir = store_dir
+        self.dtype = np.dtype(dtype)
+        os.makedirs(store_dir, exist_ok=True)
+        self._data_path = osp.join(store_dir, DATA_FILENAME)
+        self._index_path = osp.join(store_dir, INDEX_FILENAME)
+        self._file = open(f'{self._data_path}.tmp', 'wb')
+        self._index = dict()
+        self._offset = 0
+
+    def add(self, name: str, array: np.ndarray) -> None:
+        """Append an array to the store.
+
+        Args:
+            name (str): Key of the array, e.g. the video name.
+            array (np.ndarray): The array to store.
+        """
+        assert name not in self._index, f'{name} is already in the store'
+        array = np.ascontiguousarray(array, dtype=self.dtype)
+        self._file.write(array.tobytes())
+        self._index[name] = [self._offset, list(array.shape)]
+        self._offset += array.size
+
+    def close(self) -> None:
+        """Flush the data file, write the index and move both into
+        place."""
+        self._file.close()
+        index = dict(dtype=self.dtype.str, arrays=self._index)
+        with open(f'{self._index_path}.tmp', 'w') as f:
+            json.dump(index, f)
+        # an old index never describes the new data file
+        if osp.exists(self._index_path):
+            os.remove(self._index_path)
+        os.replace(f'{self._data_path}.tmp', self._data_path)
+        os.replace(f'{self._index_path}.tmp', self._index_path)
+
+    def __enter__(self) -> 'PackedArrayWriter':
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(f'{self._data_path}.tmp')
+
+
+class PackedArrayReader:
+    """Read arrays from a store written by :class:`PackedArrayWriter`.
+
+    The data file is memory-mapped lazily on first access, so the reader can
+    be created in the main process and pickled to dataloader workers, each of
+    which maps the file once and shares the pages through the OS page cache.
+    Arrays are returned as zero-copy views of the mapping.
+
+    Args:
+        store_dir (str): Directory of the store.
+    """
+
+    def __init__(self, store_dir: str) -> None:
+        self.store_dir = store_dir
+        with open(osp.join(store_dir, INDEX_FILENAME)) as f:
+            index = json.load(f)
+        self.dtype = np.dtype(index['dtype'])
+        self.index: Dict[str, Tuple[int, list]] = index['arrays']
+        self._data: Optional[np.memmap] = None
+
+    @property
+    def data(self) -> np.memmap:
+        """np.memmap: The flat copy-on-write mapping of the data file."""
+        if self._data is None:
+            data_file = osp.join(self.store_dir, DATA_FILENAME)
+            if osp.getsize(data_file) == 0:
+                self._data = np.zeros(0, dtype=self.dtype)
+            else:
+                # copy-on-write keeps the views writable for ``from_numpy``
+                # without touching the file on disk
+                self._data = np.memmap(data_file, dtype=self.dtype, mode='c')
+        return self._data
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        offset, shape = self.index[name]
+        size = int(np.prod(shape))
+        return self.data[offset:offset + size].reshape(shape)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_data'] = None
+        return state
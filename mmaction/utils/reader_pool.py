@@ -0,0 +1,83 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class VideoReaderPool:
+    """An LRU pool of open video readers keyed by filename.
+
+    Opening a video container parses its header and index, which is wasted
+    work when the same long video is sampled many times, e.g. by
+    ``RepeatAugDataset`` or when extracting many windows from one recording.
+    The pool keeps up to ``capacity`` readers open and hands out the cached
+    reader for a filename instead of opening it again.
+
+    Readers are never shared across processes: the pool is emptied when it is
+    used in a process other than the one that filled it, such as a forked
+    dataloader worker, and it is pickled without its readers.
+
+    Args:
+        capacity (int): Max number of readers kept open.
+        on_evict (Callable, optional): Called with each reader dropped from
+            the pool, e.g. to remove a temporary file. Defaults to None.
+    """
+
+    def __init__(self,
+                 capacity: int,
+                 on_evict: Optional[Callable[[Any], None]] = None) -> None:
+        assert capacity > 0, 'capacity of the reader pool must be positive'
+        self.capacity = capacity
+        self.on_evict = on_evict
+        self._readers = OrderedDict()
+        self._pid = os.getpid()
+
+    def _check_process(self) -> None:
+        if self._pid != os.getpid():
+            # readers inherited from the parent process are left untouched
+            self._readers = OrderedDict()
+            self._pid = os.getpid()
+
+    def get(self, filename: str, open_fn: Callable[[], Any]) -> Any:
+        """Get the reader of ``filename``, opening it on a miss.
+
+        Args:
+            filename (str): Key of the reader.
+            open_fn (Callable): Function opening a new reader of the file.
+
+        Returns:
+            The cached or newly opened reader.
+        """
+        self._check_process()
+        if filename in self._readers:
+            self._readers.move_to_end(filename)
+            return self._readers[filename]
+
+        reader = open_fn()
+        self._readers[filename] = reader
+        while len(self._readers) > self.capacity:
+            _, evicted = self._readers.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+        return reader
+
+    def clear(self) -> None:
+        """Drop all readers of the pool."""
+        self._check_process()
+        while len(self._readers) > 0:
+            _, evicted = self._readers.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def __contains__(self, filename: str) -> bool:
+        self._check_process()
+        return filename in self._readers
+
+    def __len__(self) -> int:
+        self._check_process()
+        return len(self._readers)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_readers'] = OrderedDict()
+        return state
@@ -1,14 +1,20 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os
 import os.path as osp
+import time
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest import TestCase
 
+import numpy as np
 import torch
+from mmengine.dataset import Compose, pseudo_collate
 from mmengine.testing import assert_dict_has_keys
 from parameterized import parameterized
 
-from mmaction.apis import (detection_inference, inference_recognizer,
+from mmaction.apis import (RealtimeInferenceRunner, batch_detection_inference,
+                           batch_pose_inference, detection_inference,
+                           inference_long_video, inference_recognizer,
                            init_recognizer, pose_inference)
 from mmaction.structures import ActionDataSample
 from mmaction.utils import frame_extract, get_str_type
@@ -68,6 +74,137 @@ class TestInference(TestCase):
             self.assertIsInstance(result, ActionDataSample)
             self.assertTrue(result.pred_score.shape, (400, ))
 
+    def test_inference_long_video(self):
+        project_dir = osp.abspath(osp.dirname(osp.dirname(__file__)))
+        config_file = osp.join(
+            project_dir, '..', 'configs/recognition/tsn/'
+            'tsn_imagenet-pretrained-r50_8xb32-1x1x3-100e_kinetics400-rgb.py')
+        model = init_recognizer(config_file, device='cpu')
+        frames = list(np.random.randint(0, 256, (20, 64, 80, 3), np.uint8))
+        test_pipeline = [
+            dict(type='DecordInit'),
+            dict(
+                type='SampleFrames',
+                clip_len=1,
+                frame_interval=1,
+                num_clips=4,
+                test_mode=True),
+            dict(type='DecordDecode'),
+            dict(type='Resize', scale=(-1, 64)),
+            dict(type='CenterCrop', crop_size=56),
+            dict(type='FormatShape', input_format='NCHW'),
+            dict(type='PackActionInputs')
+        ]
+
+        # 5 clips of 4 frames, windows of 2 clips
+        results, stats = inference_long_video(
+            model,
+            frames,
+            window_clips=2,
+            batch_size=3,
+            decode_chunk=6,
+            test_pipeline=test_pipeline)
+        assert len(results) == 4
+        assert stats['num_clips'] == 5 and stats['num_windows'] == 4
+        assert stats['fps'] > 0
+        assert results[1].clip_inds == (1, 3)
+        assert results[1].frame_range == (4, 12)
+
+        # the same as the head on the features of each clip
+        clip_pipeline = Compose(
+            [dict(type='ArrayDecode')] + test_pipeline[3:])
+        feats = []
+        with torch.no_grad():
+            for start in range(0, 20, 4):
+                data = clip_pipeline(
+                    dict(
+                        array=frames[start:start + 4],
+                        frame_inds=np.arange(4),
+                        modality='RGB',
+                        num_clips=1,
+                        clip_len=4))
+                inputs = model.data_preprocessor(
+                    pseudo_collate([data]))['inputs']
+                feat, kwargs = model.extract_feat(inputs, test_mode=True)
+                feats.append(feat)
+            for i, result in enumerate(results):
+                expected = model.cls_head.predict(
+                    torch.cat(feats[i:i + 2]), [ActionDataSample()],
+                    **kwargs)[0]
+                assert torch.allclose(
+                    result.pred_score, expected.pred_score, atol=1e-5)
+
+        # a window with every clip of a short video
+        results, stats = inference_long_video(
+            model,
+            frames,
+            window_clips=8,
+            window_stride=2,
+            test_pipeline=test_pipeline)
+        assert len(results) == 1
+        assert results[0].clip_inds == (0, 5)
+
+    def test_realtime_inference_runner(self):
+        project_dir = osp.abspath(osp.dirname(osp.dirname(__file__)))
+        config_file = osp.join(
+            project_dir, '..', 'configs/recognition/tsn/'
+            'tsn_imagenet-pretrained-r50_8xb32-1x1x3-100e_kinetics400-rgb.py')
+        model = init_recognizer(config_file, device='cpu')
+        frames = np.random.randint(0, 256, (10, 64, 80, 3), np.uint8)
+        test_pipeline = [
+            dict(type='DecordInit'),
+            dict(
+                type='SampleFrames',
+                clip_len=1,
+                frame_interval=1,
+                num_clips=4,
+                test_mode=True),
+            dict(type='DecordDecode'),
+            dict(type='Resize', scale=(-1, 64)),
+            dict(type='CenterCrop', crop_size=56),
+            dict(type='FormatShape', input_format='NCHW'),
+            dict(type='PackActionInputs')
+        ]
+
+        callback_results = []
+        runner = RealtimeInferenceRunner(
+            model,
+            test_pipeline=test_pipeline,
+            callback=callback_results.append)
+        assert runner.sample_length == 4
+        assert runner.get_result() is None
+        with runner:
+            for frame in frames:
+                runner.push(frame)
+            # the window of the last frames is always recognized
+            for _ in range(600):
+                result = runner.get_result()
+                if result is not None and result.frame_range == (6, 10):
+                    break
+                time.sleep(0.1)
+        assert result.frame_range == (6, 10)
+        assert callback_results[-1] is result
+        assert len(callback_results) + runner.num_dropped <= 7
+
+        window_pipeline = Compose(test_pipeline[3:])
+        data = window_pipeline(
+            dict(
+                imgs=list(frames[6:]),
+                img_shape=(64, 80),
+                original_shape=(64, 80),
+                modality='RGB',
+                num_clips=4,
+                clip_len=1))
+        with torch.no_grad():
+            expected = model.test_step(pseudo_collate([data]))[0]
+        assert torch.allclose(
+            result.pred_score, expected.pred_score, atol=1e-5)
+
+        latency = runner.latency()
+        for stage in ('snapshot', 'preprocess', 'queue', 'forward', 'total'):
+            assert latency[stage]['count'] >= 1
+            assert latency[stage]['mean'] >= 0
+
     def test_detection_inference(self):
         from mmdet.apis import init_detector
         from mmdet.structures import DetDataSample
@@ -108,6 +245,19 @@ class TestInference(TestCase):
                 self.assertTrue(results[0].shape, (4, ))
                 self.assertIsInstance(data_samples[0], DetDataSample)
 
+                # test batched inference, on the frame paths or a video
+                batch_results, data_samples = batch_detection_inference(
+                    model, None, frm_paths, batch_size=3, device=device)
+                self.assertEqual(len(batch_results), 10)
+                self.assertIsInstance(data_samples[0], DetDataSample)
+                for result, batch_result in zip(results, batch_results):
+                    np.testing.assert_allclose(
+                        result, batch_result, rtol=1e-3, atol=1e-2)
+                batch_results, _ = batch_detection_inference(
+                    model, None, video_path, batch_size=4, device=device)
+                num_frames = len(os.listdir(osp.dirname(frm_paths[0])))
+                self.assertEqual(len(batch_results), num_frames)
+
     def test_pose_inference(self):
         from mmpose.apis import init_model
         from mmpose.structures import PoseDataSample
@@ -153,3 +303,18 @@ class TestInference(TestCase):
                 assert_dict_has_keys(results[0], ('keypoints', 'bbox_scores',
                                                   'bboxes', 'keypoint_scores'))
                 self.assertIsInstance(data_samples[0], PoseDataSample)
+
+                # test batched inference, with a frame of no detection
+                det_results[1] = det_results[1][:0]
+                results, _ = pose_inference(
+                    model, None, frm_paths, det_results, device=device)
+                batch_results, data_samples = batch_pose_inference(
+                    model, None, frm_paths, det_results, batch_size=3)
+                self.assertEqual(len(batch_results), 10)
+                self.assertIsInstance(data_samples[0], PoseDataSample)
+                for result, batch_result in zip(results, batch_results):
+                    np.testing.assert_allclose(
+                        result['keypoints'],
+                        batch_result['keypoints'],
+                        rtol=1e-3,
+                        atol=1e-2)
@@ -0,0 +1,68 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+from mmengine.dataset import pseudo_collate
+from torch.utils.data import DataLoader, Dataset
+
+from mmaction.datasets import SharedMemorySlabPool, shm_stack_collate
+from mmaction.structures import ActionDataSample
+
+
+class PackedDataset(Dataset):
+
+    def __len__(self):
+        return 10
+
+    def __getitem__(self, idx):
+        inputs = torch.full((2, 3, 4, 8, 8), idx, dtype=torch.uint8)
+        return dict(
+            inputs=inputs, data_samples=ActionDataSample().set_gt_label(idx))
+
+
+def test_slab_pool():
+    pool = SharedMemorySlabPool(num_slabs=2)
+    slabs = [pool.get(4, (3, 8, 8), torch.uint8) for _ in range(3)]
+    assert all(slab.is_shared() for slab in slabs)
+    assert slabs[0].shape == (4, 3, 8, 8)
+    # the ring is reused
+    assert slabs[2].data_ptr() == slabs[0].data_ptr()
+    assert slabs[1].data_ptr() != slabs[0].data_ptr()
+
+    # a smaller batch uses a part of the slab, a larger one replaces it
+    assert pool.get(2, (3, 8, 8), torch.uint8).shape == (2, 3, 8, 8)
+    slab = pool.get(6, (3, 8, 8), torch.uint8)
+    assert slab.shape == (6, 3, 8, 8)
+    assert slab.data_ptr() != slabs[2].data_ptr()
+
+    # the slabs are dropped with a new sample shape
+    pool.get(4, (3, 4, 4), torch.uint8)
+    assert len(pool._slabs) == 1
+
+
+def test_shm_stack_collate():
+    dataset = PackedDataset()
+    data_batch = [dataset[i] for i in range(3)]
+    batch = shm_stack_collate(data_batch)
+    expected = pseudo_collate(data_batch)
+    assert batch['inputs'].shape == (3, 2, 3, 4, 8, 8)
+    assert torch.equal(batch['inputs'], torch.stack(expected['inputs']))
+    labels = [sample.gt_label.item() for sample in batch['data_samples']]
+    assert labels == [0, 1, 2]
+
+    # inputs of different shapes are not stacked
+    data_batch[0]['inputs'] = data_batch[0]['inputs'][:1]
+    batch = shm_stack_collate(data_batch)
+    assert isinstance(batch['inputs'], list)
+
+    # the batches of the workers are sent in shared memory
+    dataloader = DataLoader(
+        dataset,
+        batch_size=4,
+        num_workers=2,
+        collate_fn=shm_stack_collate)
+    labels = []
+    for batch in dataloader:
+        assert batch['inputs'].is_shared()
+        for inputs, sample in zip(batch['inputs'], batch['data_samples']):
+            assert (inputs == sample.gt_label).all()
+            labels.append(sample.gt_label.item())
+    assert labels == list(range(10))
@@ -232,6 +232,21 @@ def test_format_shape():
 
     assert repr(format_shape) == "FormatShape(input_format='NCTHW')"
 
+    # a cropped view of a clip buffer is formatted without copying
+    buffer = np.random.randint(0, 256, (6, 64, 80, 3), np.uint8)
+    results = dict(imgs=buffer[:, 8:56, 10:70], num_clips=2, clip_len=3)
+    imgs = format_shape(results)['imgs']
+    assert imgs.shape == (2, 3, 3, 48, 60)
+    assert np.shares_memory(imgs, buffer)
+    assert_array_equal(imgs[1, :, 0],
+                       buffer[3, 8:56, 10:70].transpose(2, 0, 1))
+
+    # reversed views are compacted
+    results = dict(imgs=buffer[:, :, ::-1], num_clips=2, clip_len=3)
+    imgs = format_shape(results)['imgs']
+    assert not np.shares_memory(imgs, buffer)
+    assert all(stride > 0 for stride in imgs.strides)
+
     # `NCTHW_Heatmap` input format
     results = dict(
         imgs=np.random.randn(12, 17, 56, 56), num_clips=2, clip_len=6)
@@ -1,23 +1,31 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import copy
 import os.path as osp
+import pickle
 import platform
+from fractions import Fraction
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 import mmcv
 import numpy as np
 import pytest
 import torch
 from mmengine.testing import assert_dict_has_keys
-from numpy.testing import assert_array_almost_equal
+from numpy.testing import assert_array_almost_equal, assert_array_equal
 
 from mmaction.datasets.transforms import (DecordDecode, DecordInit,
                                           GenerateLocalizationLabels,
                                           LoadAudioFeature, LoadHVULabel,
                                           LoadLocalizationFeature,
+                                          LoadPackedLocalizationFeature,
                                           LoadProposals, LoadRGBFromFile,
-                                          OpenCVDecode, OpenCVInit, PIMSDecode,
+                                          OpenCVDecode, OpenCVInit,
+                                          PackedFrameDecode, PIMSDecode,
                                           PIMSInit, PyAVDecode,
                                           PyAVDecodeMotionVector, PyAVInit)
+from mmaction.utils import (FrameArchiveReader, FrameArchiveWriter,
+                            PackedArrayWriter)
 
 from mmaction.datasets.transforms import RawFrameDecode  # isort:skip
 
@@ -112,8 +120,22 @@ class TestDecode(BaseTestLoading):
         pyav_init_result = pyav_init(video_result)
         assert assert_dict_has_keys(pyav_init_result, target_keys)
         assert pyav_init_result['total_frames'] == 300
-        assert repr(
-            pyav_init) == f'{pyav_init.__class__.__name__}(io_backend=disk)'
+        assert repr(pyav_init) == (f'{pyav_init.__class__.__name__}('
+                                   f'io_backend=disk, reader_pool_size=0)')
+
+    def test_pyav_init_reader_pool(self):
+        pyav_init = PyAVInit(reader_pool_size=1)
+        pyav_decode = PyAVDecode()
+        frame_inds = np.arange(0, self.total_frames, 2)
+        imgs = []
+        for _ in range(2):
+            video_result = copy.deepcopy(self.video_results)
+            video_result['frame_inds'] = frame_inds
+            video_result = pyav_decode(pyav_init(video_result))
+            imgs.append(np.stack(video_result['imgs']))
+        assert len(pyav_init.reader_pool) == 1
+        # the reused container decodes from the start again
+        np.testing.assert_array_equal(imgs[0], imgs[1])
 
     def test_pyav_decode(self):
         target_keys = ['frame_inds', 'imgs', 'original_shape']
@@ -270,7 +292,15 @@ class TestDecode(BaseTestLoading):
 
         assert repr(decord_init) == (f'{decord_init.__class__.__name__}('
                                      f'io_backend=disk, '
-                                     f'num_threads=1)')
+                                     f'num_threads=1, '
+                                     f'reader_pool_size=0)')
+
+    def test_decord_init_reader_pool(self):
+        decord_init = DecordInit(reader_pool_size=1)
+        first = decord_init(copy.deepcopy(self.video_results))['video_reader']
+        second = decord_init(copy.deepcopy(self.video_results))['video_reader']
+        assert first is second
+        assert self.video_results['filename'] in decord_init.reader_pool
 
     def test_decord_decode(self):
         target_keys = ['frame_inds', 'imgs', 'original_shape']
@@ -333,7 +363,103 @@ class TestDecode(BaseTestLoading):
         assert np.shape(decord_decode_result['imgs']) == (len(
             video_result['frame_inds']), 256, 340, 3)
         assert repr(decord_decode) == (f'{decord_decode.__class__.__name__}('
-                                       f'mode=efficient)')
+                                       f'mode=efficient, contiguous=False)')
+
+        # all modes fill one clip buffer
+        for mode in ['accurate', 'efficient', 'seek']:
+            imgs = dict()
+            for contiguous in [False, True]:
+                video_result = copy.deepcopy(self.video_results)
+                video_result['frame_inds'] = np.array([1, 4, 4, 7])
+                video_result = DecordInit()(video_result)
+                decord_decode = DecordDecode(mode=mode, contiguous=contiguous)
+                imgs[contiguous] = decord_decode(video_result)['imgs']
+            buffer = imgs[True]
+            assert isinstance(buffer, np.ndarray)
+            assert buffer.flags.c_contiguous
+            assert_array_equal(buffer, np.stack(imgs[False]))
+
+    def test_seek_decode(self):
+        # unsorted, repeated and sparse indices spanning several GOPs
+        frame_inds = np.array([250, 3, 4, 4, 120, 0, 299, 121, 60])
+
+        for init, decode in [(DecordInit, DecordDecode),
+                             (PyAVInit, PyAVDecode)]:
+            imgs = dict()
+            for mode in ['accurate', 'seek']:
+                video_result = copy.deepcopy(self.video_results)
+                video_result['frame_inds'] = frame_inds.copy()
+                video_result = decode(mode=mode)(init()(video_result))
+                imgs[mode] = np.stack(video_result['imgs'])
+            assert imgs['seek'].shape == (len(frame_inds), 256, 340, 3)
+            np.testing.assert_array_equal(imgs['seek'], imgs['accurate'])
+
+        class NoDemuxContainer:
+            """Fail on demuxing the packets of the whole video."""
+
+            def __init__(self, container):
+                self.container = container
+
+            def __getattr__(self, name):
+                assert name != 'demux'
+                return getattr(self.container, name)
+
+        # the key frames are not listed by reading the whole video
+        video_result = PyAVInit()(copy.deepcopy(self.video_results))
+        seek_imgs = PyAVDecode._seek_decode(
+            NoDemuxContainer(video_result['video_reader']), frame_inds.copy())
+        np.testing.assert_array_equal(np.stack(seek_imgs), imgs['accurate'])
+
+        video_result = copy.deepcopy(self.video_results)
+        video_result['frame_inds'] = frame_inds.copy()
+        imgs = DecordDecode(mode='seek')(DecordInit()(video_result))['imgs']
+        # repeated indices do not share the array
+        assert imgs[2] is not imgs[3]
+
+    @staticmethod
+    def _write_video(path, durations, max_b_frames=0):
+        """Write a video of 64x48 frames of different colors, each lasting
+        ``durations[i]`` hundredths of a second."""
+        import av
+
+        with av.open(path, 'w') as container:
+            stream = container.add_stream(
+                'mpeg4',
+                rate=25,
+                options=dict(g='8', bf=str(max_b_frames)))
+            stream.width, stream.height = 64, 48
+            stream.pix_fmt = 'yuv420p'
+            stream.codec_context.time_base = Fraction(1, 100)
+            pts = 0
+            for idx, duration in enumerate(durations):
+                frame = av.VideoFrame.from_ndarray(
+                    np.full((48, 64, 3), idx * 7 % 256, dtype=np.uint8),
+                    format='rgb24')
+                frame.pts = pts
+                frame.time_base = Fraction(1, 100)
+                pts += duration
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+            for packet in stream.encode():
+                container.mux(packet)
+
+    def test_pyav_seek_decode_streams(self):
+        frame_inds = np.array([57, 2, 3, 30, 9, 58, 16, 40])
+        with TemporaryDirectory() as tmp_dir:
+            # B-frames with a constant frame rate, and a variable frame rate
+            for name, durations, max_b_frames in [
+                ('bframes.mp4', [4] * 60, 2),
+                ('vfr.mp4', [4, 2, 6] * 20, 0)
+            ]:
+                filename = osp.join(tmp_dir, name)
+                self._write_video(filename, durations, max_b_frames)
+                imgs = dict()
+                for mode in ['accurate', 'seek']:
+                    video_result = PyAVInit()(dict(filename=filename))
+                    video_result['frame_inds'] = frame_inds.copy()
+                    imgs[mode] = np.stack(
+                        PyAVDecode(mode=mode)(video_result)['imgs'])
+                assert_array_equal(imgs['seek'], imgs['accurate'])
 
     def test_opencv_init(self):
         target_keys = ['new_path', 'video_reader', 'total_frames']
@@ -344,7 +470,13 @@ class TestDecode(BaseTestLoading):
         assert opencv_init_result['total_frames'] == len(
             opencv_init_result['video_reader'])
         assert repr(opencv_init) == (f'{opencv_init.__class__.__name__}('
-                                     f'io_backend=disk)')
+                                     f'io_backend=disk, '
+                                     f'reader_pool_size=0)')
+
+        opencv_init = OpenCVInit(reader_pool_size=2)
+        first = opencv_init(copy.deepcopy(self.video_results))['video_reader']
+        second = opencv_init(copy.deepcopy(self.video_results))['video_reader']
+        assert first is second
 
     def test_opencv_decode(self):
         target_keys = ['frame_inds', 'imgs', 'original_shape']
@@ -530,7 +662,106 @@ class TestDecode(BaseTestLoading):
             assert results['original_shape'] == (240, 320)
             assert repr(frame_selector) == (
                 f'{frame_selector.__class__.__name__}(io_backend=disk, '
-                f'decoding_backend=turbojpeg)')
+                f'decoding_backend=turbojpeg, num_threads=0, '
+                f'share_duplicates=False, contiguous=False)')
+
+    def test_rawframe_decode_threads(self):
+        inputs = copy.deepcopy(self.frame_results)
+        inputs['frame_inds'] = np.array([1, 2, 2, 3, 5, 5, 5])
+        results = RawFrameDecode()(copy.deepcopy(inputs))
+
+        # concurrent loading gives the same frames in the same order
+        frame_selector = RawFrameDecode(num_threads=4)
+        threaded_results = frame_selector(copy.deepcopy(inputs))
+        assert len(threaded_results['imgs']) == 7
+        for img, threaded_img in zip(results['imgs'],
+                                     threaded_results['imgs']):
+            assert_array_equal(img, threaded_img)
+        assert threaded_results['imgs'][1] is not threaded_results['imgs'][2]
+
+        # duplicated frames are shared
+        frame_selector = RawFrameDecode(num_threads=2, share_duplicates=True)
+        shared_results = frame_selector(copy.deepcopy(inputs))
+        assert shared_results['imgs'][1] is shared_results['imgs'][2]
+        assert shared_results['imgs'][4] is shared_results['imgs'][6]
+        assert shared_results['imgs'][0] is not shared_results['imgs'][1]
+
+        # frames are written into one clip buffer
+        buffer_selector = RawFrameDecode(num_threads=2, contiguous=True)
+        buffer_results = buffer_selector(copy.deepcopy(inputs))
+        assert isinstance(buffer_results['imgs'], np.ndarray)
+        assert buffer_results['imgs'].flags.c_contiguous
+        assert_array_equal(buffer_results['imgs'], np.stack(results['imgs']))
+        assert buffer_results['original_shape'] == (240, 320)
+
+        # the thread pool is not pickled to dataloader workers
+        frame_selector = pickle.loads(pickle.dumps(frame_selector))
+        assert frame_selector._executor is None
+        assert len(frame_selector(copy.deepcopy(inputs))['imgs']) == 7
+        assert repr(frame_selector) == (
+            f'{frame_selector.__class__.__name__}(io_backend=disk, '
+            f'decoding_backend=cv2, num_threads=2, share_duplicates=True, '
+            f'contiguous=False)')
+
+    def test_packed_frame_decode(self):
+        inputs = copy.deepcopy(self.frame_results)
+        inputs['frame_inds'] = np.array([1, 3, 3, 5])
+        results = RawFrameDecode()(copy.deepcopy(inputs))
+
+        with TemporaryDirectory() as tmp_dir:
+            with FrameArchiveWriter(osp.join(tmp_dir, 'imgs.frames')) as w:
+                for i in range(self.total_frames):
+                    frame_path = osp.join(self.img_dir,
+                                          self.filename_tmpl.format(i + 1))
+                    with open(frame_path, 'rb') as f:
+                        w.add(f.read())
+
+            inputs['frame_dir'] = osp.join(tmp_dir, 'imgs')
+            frame_decode = PackedFrameDecode(num_threads=2)
+            packed_results = frame_decode(copy.deepcopy(inputs))
+            assert packed_results['original_shape'] == (240, 320)
+            assert len(packed_results['imgs']) == 4
+            for img, packed_img in zip(results['imgs'],
+                                       packed_results['imgs']):
+                assert_array_equal(img, packed_img)
+
+            # frame indices are relative to start_index
+            inputs['start_index'] = 0
+            inputs['frame_inds'] = np.array([0, 2, 2, 4])
+            packed_results = frame_decode(copy.deepcopy(inputs))
+            for img, packed_img in zip(results['imgs'],
+                                       packed_results['imgs']):
+                assert_array_equal(img, packed_img)
+
+            # the archive is closed after decoding, or kept in the pool
+            with patch.object(
+                    FrameArchiveReader, 'close', autospec=True) as close:
+                frame_decode(copy.deepcopy(inputs))
+                close.assert_called_once()
+            assert frame_decode._reader is None
+            pooled_decode = PackedFrameDecode(reader_pool_size=1)
+            pooled_decode(copy.deepcopy(inputs))
+            archive_path = osp.join(tmp_dir, 'imgs.frames')
+            assert archive_path in pooled_decode.reader_pool
+            reader = pooled_decode.reader_pool.get(archive_path, None)
+            packed_results = pooled_decode(copy.deepcopy(inputs))
+            assert pooled_decode.reader_pool.get(archive_path, None) is reader
+            assert_array_equal(results['imgs'][1], packed_results['imgs'][1])
+            pooled_decode.reader_pool.clear()
+
+            with pytest.raises(IndexError):
+                inputs['frame_inds'] = np.array([self.total_frames])
+                frame_decode(copy.deepcopy(inputs))
+            assert frame_decode._reader is None
+
+            with pytest.raises(NotImplementedError):
+                inputs['modality'] = 'Flow'
+                frame_decode(copy.deepcopy(inputs))
+
+        assert repr(frame_decode) == (
+            f'{frame_decode.__class__.__name__}(archive_ext=.frames, '
+            f'decoding_backend=cv2, num_threads=2, share_duplicates=False, '
+            f'contiguous=False, reader_pool_size=0)')
 
     def test_pyav_decode_motion_vector(self):
         pyav_init = PyAVInit()
@@ -624,6 +855,22 @@ class TestLoad(BaseTestLoading):
         assert repr(load_localization_feature
                     ) == f'{load_localization_feature.__class__.__name__}'
 
+    def test_load_packed_localization_feature(self):
+        action_result = copy.deepcopy(self.action_results)
+        raw_feature = LoadLocalizationFeature()(
+            copy.deepcopy(action_result))['raw_feature']
+
+        with TemporaryDirectory() as tmp_dir:
+            with PackedArrayWriter(tmp_dir) as writer:
+                writer.add(action_result['video_name'], raw_feature)
+            load_packed_feature = LoadPackedLocalizationFeature(tmp_dir)
+            result = load_packed_feature(action_result)
+            assert result['raw_feature'].shape == (400, 5)
+            assert_array_almost_equal(result['raw_feature'], raw_feature)
+            assert repr(load_packed_feature) == (
+                f'{load_packed_feature.__class__.__name__}'
+                f'(store_path={tmp_dir})')
+
     def test_load_proposals(self):
         target_keys = [
             'bsp_feature', 'tmin', 'tmax', 'tmin_score', 'tmax_score',
@@ -119,7 +119,8 @@ class TestPoseTransforms:
                                              'with_limb=False, skeletons=(), '
                                              'double=False, left_kp=(1,), '
                                              'right_kp=(2,), left_limb=(0,), '
-                                             'right_limb=(1,), scaling=1.0)')
+                                             'right_limb=(1,), scaling=1.0, '
+                                             'batched=False, device=cpu)')
         return_results = generate_pose_target(copy.deepcopy(results))
         assert return_results['imgs'].shape == (8, 3, 64, 64)
         assert_array_almost_equal(return_results['imgs'][0],
@@ -224,6 +225,36 @@ class TestPoseTransforms:
         return_results = generate_pose_target(results)
         assert_array_almost_equal(return_results['imgs'], 0)
 
+    @staticmethod
+    def test_generate_pose_target_batched():
+        rng = np.random.RandomState(0)
+        # 2 persons, 6 frames, 17 keypoints, partly outside the image and
+        # with a few (near) zero scores and collapsed limbs
+        kp = rng.uniform(-10, 74, size=(2, 6, 17, 2)).astype(np.float32)
+        kp[0, :, 1] = kp[0, :, 0] + 0.3
+        kpscore = rng.uniform(0, 1, size=(2, 6, 17)).astype(np.float32)
+        kpscore[1, :, :3] = 0
+        results = dict(
+            img_shape=(64, 48),
+            keypoint=kp,
+            keypoint_score=kpscore,
+            modality='Pose')
+
+        for kwargs in [
+                dict(with_kp=True),
+                dict(with_kp=False, with_limb=True),
+                dict(with_kp=True, with_limb=True, use_score=False),
+                dict(with_kp=False, with_limb=True, double=True),
+                dict(with_kp=True, scaling=0.5, sigma=1.2),
+        ]:
+            expected = GeneratePoseTarget(**kwargs)(copy.deepcopy(results))
+            batched = GeneratePoseTarget(
+                batched=True, **kwargs)(copy.deepcopy(results))
+            assert batched['imgs'].dtype == np.float32
+            assert batched['imgs'].shape == expected['imgs'].shape
+            assert_array_almost_equal(
+                batched['imgs'], expected['imgs'], decimal=5)
+
     @staticmethod
     def test_pose_compact():
         results = {}
@@ -5,7 +5,7 @@ import mmcv
 import numpy as np
 import pytest
 from mmengine.testing import assert_dict_has_keys
-from numpy.testing import assert_array_almost_equal
+from numpy.testing import assert_array_almost_equal, assert_array_equal
 
 from mmaction.datasets.transforms import (CenterCrop, ColorJitter, Flip, Fuse,
                                           MultiScaleCrop, RandomCrop,
@@ -791,6 +791,110 @@ class TestLazy:
                                 f'(scale={(341, 256)}, keep_ratio={False}, ' +
                                 f'interpolation=bilinear, lazy={True})')
 
+    @staticmethod
+    def test_fuse():
+        # a crop after a flip is mapped back to the unflipped images
+        imgs = list(np.random.rand(2, 64, 80, 3))
+        pipeline = [
+            Flip(flip_ratio=1, lazy=True),
+            RandomCrop(size=32, lazy=True),
+            Flip(flip_ratio=0, lazy=True)
+        ]
+        results = dict(imgs=imgs, modality='RGB')
+        for transform in pipeline:
+            results = transform(results)
+        left, top, right, bottom = results['crop_bbox']
+        fused_imgs = Fuse()(results)['imgs']
+        expected = [np.fliplr(img)[top:bottom, left:right] for img in imgs]
+        assert_array_equal(fused_imgs, expected)
+
+        # two flips of the same direction cancel out
+        results = dict(imgs=imgs, modality='RGB')
+        for transform in [
+                Flip(flip_ratio=1, lazy=True),
+                Flip(flip_ratio=1, lazy=True)
+        ]:
+            results = transform(results)
+        assert_array_equal(Fuse()(results)['imgs'], imgs)
+        with pytest.raises(NotImplementedError):
+            results = Flip(
+                flip_ratio=1, lazy=True)(dict(imgs=imgs, modality='RGB'))
+            Flip(flip_ratio=1, direction='vertical', lazy=True)(results)
+
+        # crop, resize and flip in one warpAffine
+        imgs = list(np.random.randint(0, 256, (2, 64, 80, 3), np.uint8))
+        for direction in ['horizontal', 'vertical']:
+            lazy_results = dict(imgs=imgs, modality='RGB')
+            results = dict(imgs=[img.copy() for img in imgs], modality='RGB')
+            for lazy in [True, False]:
+                pipeline = [
+                    CenterCrop(crop_size=(48, 40), lazy=lazy),
+                    Flip(flip_ratio=1, direction=direction, lazy=lazy),
+                    Resize(scale=(96, 80), keep_ratio=False, lazy=lazy)
+                ]
+                for transform in pipeline:
+                    if lazy:
+                        lazy_results = transform(lazy_results)
+                    else:
+                        results = transform(results)
+            lazy_results = Fuse()(lazy_results)
+            assert lazy_results['img_shape'] == (80, 96)
+            for fused_img, img in zip(lazy_results['imgs'], results['imgs']):
+                assert fused_img.shape == (80, 96, 3)
+                assert np.abs(fused_img.astype(int) - img).max() <= 1
+
+        # the flow-x frames are inverted by a lazy flip
+        imgs = list(np.random.randint(0, 256, (4, 64, 64), np.uint8))
+        results = dict(imgs=imgs, modality='Flow')
+        results = Flip(flip_ratio=1, lazy=True)(results)
+        fused_imgs = Fuse()(results)['imgs']
+        assert_array_equal(fused_imgs[0], 255 - np.fliplr(imgs[0]))
+        assert_array_equal(fused_imgs[1], np.fliplr(imgs[1]))
+
+    @staticmethod
+    def test_clip_buffer():
+        buffer = np.random.randint(0, 256, (4, 64, 80, 3), np.uint8)
+        imgs = list(buffer)
+
+        # a crop is a view of the clip buffer
+        results = RandomCrop(size=32)(dict(imgs=buffer))
+        left, top, right, bottom = results['crop_bbox']
+        assert isinstance(results['imgs'], np.ndarray)
+        assert np.shares_memory(results['imgs'], buffer)
+        assert_array_equal(results['imgs'], buffer[:, top:bottom,
+                                                   left:right])
+
+        # a resize writes into a new clip buffer
+        for interpolation in ['bilinear', 'area']:
+            resize = Resize(
+                scale=(40, 30), keep_ratio=False, interpolation=interpolation)
+            resized = resize(dict(imgs=buffer))['imgs']
+            expected = resize(dict(imgs=imgs))['imgs']
+            assert isinstance(resized, np.ndarray)
+            assert resized.shape == (4, 30, 40, 3)
+            assert_array_equal(resized, np.stack(expected))
+
+        # the fused transforms keep the clip buffer
+        for pipeline in [[CenterCrop(crop_size=48, lazy=True)],
+                         [
+                             CenterCrop(crop_size=48, lazy=True),
+                             Flip(flip_ratio=1, lazy=True)
+                         ],
+                         [
+                             CenterCrop(crop_size=48, lazy=True),
+                             Resize(scale=(32, 32), lazy=True),
+                             Flip(flip_ratio=1, lazy=True)
+                         ]]:
+            buffer_results = dict(imgs=buffer.copy(), modality='RGB')
+            list_results = dict(imgs=list(buffer.copy()), modality='RGB')
+            for transform in pipeline + [Fuse()]:
+                buffer_results = transform(buffer_results)
+                list_results = transform(list_results)
+            assert isinstance(buffer_results['imgs'], np.ndarray)
+            assert all(stride > 0 for stride in buffer_results['imgs'].strides)
+            assert_array_equal(buffer_results['imgs'],
+                               np.stack(list_results['imgs']))
+
     @staticmethod
     def test_flip_lazy():
         with pytest.raises(ValueError):
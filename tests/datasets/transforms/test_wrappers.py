@@ -1,10 +1,14 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
 import numpy as np
 import pytest
 from mmengine.testing import assert_dict_has_keys
 from numpy.testing import assert_array_almost_equal
 
-from mmaction.datasets.transforms import CenterCrop, ImgAug
+from mmaction.datasets.transforms import CacheDecodedClip, CenterCrop, ImgAug
 
 
 def check_flip(origin_imgs, result_imgs, flip_type):
@@ -115,3 +119,104 @@ class TestAugumentations:
         assert_dict_has_keys(resize_results, target_keys)
         assert resize_results['img_shape'] == (32, 32)
         assert repr(ImgAug_resize) == f'ImgAug(transforms={transforms})'
+
+
+def test_cache_decoded_clip():
+    calls = []
+
+    def fake_decode(results):
+        calls.append(results['filename'])
+        results['imgs'] = [
+            np.full((8, 8, 3), idx, dtype=np.uint8)
+            for idx in results['frame_inds']
+        ]
+        results['img_shape'] = (8, 8)
+        results['video_reader'] = None
+        return results
+
+    def make_results(filename, frame_inds):
+        return dict(filename=filename, frame_inds=np.array(frame_inds))
+
+    with TemporaryDirectory() as tmp_dir:
+        with pytest.warns(UserWarning, match='not a config dict'):
+            cache = CacheDecodedClip([fake_decode], cache_dir=tmp_dir)
+        first = cache(make_results('a.mp4', [1, 2, 3]))
+        second = cache(make_results('a.mp4', [1, 2, 3]))
+        assert calls == ['a.mp4']
+        assert second['img_shape'] == (8, 8)
+        np.testing.assert_array_equal(
+            np.stack(first['imgs']), np.stack(second['imgs']))
+
+        # other frame indices or videos are cache misses
+        cache(make_results('a.mp4', [1, 2, 4]))
+        cache(make_results('b.mp4', [1, 2, 3]))
+        assert calls == ['a.mp4', 'a.mp4', 'b.mp4']
+        assert len(os.listdir(tmp_dir)) == 3
+
+        # the least recently used clips are evicted
+        clip_bytes = os.path.getsize(
+            os.path.join(tmp_dir, os.listdir(tmp_dir)[0]))
+        cache = CacheDecodedClip([fake_decode],
+                                 cache_dir=tmp_dir,
+                                 max_bytes=clip_bytes * 2)
+        cache(make_results('c.mp4', [1, 2, 3]))
+        assert len(os.listdir(tmp_dir)) == 2
+
+    def cache_size(cache_dir):
+        return sum(
+            os.path.getsize(os.path.join(cache_dir, name))
+            for name in os.listdir(cache_dir))
+
+    # the running total of the writes triggers the eviction, without
+    # measuring the directory after every write
+    with TemporaryDirectory() as tmp_dir:
+        cache = CacheDecodedClip([fake_decode],
+                                 cache_dir=tmp_dir,
+                                 max_bytes=clip_bytes * 3,
+                                 scan_interval=100)
+        with patch.object(cache, '_evict', wraps=cache._evict) as evict:
+            for idx in range(10):
+                cache(make_results(f'{idx}.mp4', [1, 2, 3]))
+                assert cache_size(tmp_dir) <= clip_bytes * 3
+            assert evict.call_count < 10
+
+    # the writes of all the processes sharing the cache count towards the
+    # bound at each measurement
+    with TemporaryDirectory() as tmp_dir:
+        caches = [
+            CacheDecodedClip([fake_decode],
+                             cache_dir=tmp_dir,
+                             max_bytes=clip_bytes * 3,
+                             scan_interval=1) for _ in range(2)
+        ]
+        for idx in range(8):
+            caches[idx % 2](make_results(f'{idx}.mp4', [1, 2, 3]))
+            assert cache_size(tmp_dir) <= clip_bytes * 3
+
+    # caching is disabled if the cache can not be written
+    with TemporaryDirectory() as tmp_dir:
+        cache = CacheDecodedClip([fake_decode], cache_dir=tmp_dir)
+        calls.clear()
+        with patch('pickle.dump', side_effect=OSError(28, 'No space')):
+            with pytest.warns(UserWarning, match='Caching is disabled'):
+                results = cache(make_results('a.mp4', [1, 2, 3]))
+        assert len(results['imgs']) == 3
+        assert os.listdir(tmp_dir) == []
+        cache(make_results('a.mp4', [1, 2, 3]))
+        assert calls == ['a.mp4', 'a.mp4']
+        assert os.listdir(tmp_dir) == []
+
+    # the cache key of config dicts is stable across instances
+    with TemporaryDirectory() as tmp_dir:
+        transforms = [
+            dict(type='ArrayDecode'),
+            dict(type='FormatShape', input_format='NCHW')
+        ]
+        key = CacheDecodedClip(transforms, cache_dir=tmp_dir)._config_key
+        assert CacheDecodedClip(
+            transforms, cache_dir=tmp_dir)._config_key == key
+        other = CacheDecodedClip(
+            [dict(type='ArrayDecode'),
+             dict(type='FormatShape', input_format='NCTHW')],
+            cache_dir=tmp_dir)
+        assert other._config_key != key
@@ -1,6 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import os.path as osp
 import platform
+from collections import defaultdict
 from unittest import TestCase
 
 import numpy as np
@@ -72,6 +73,27 @@ def test_ava_detection():
     detection = ava_eval(result_path, 'mAP', label_map, gt_path, None)
     assert_array_almost_equal(detection['overall'], 0.09385522)
 
+    detection = ava_eval(
+        result_path, 'mAP', label_map, gt_path, None, num_workers=2)
+    assert_array_almost_equal(detection['overall'], 0.09385522)
+
+    # evaluate in-memory results without a csv file
+    results = defaultdict(lambda: [np.zeros((0, 5), np.float32)] * 3)
+    with open(result_path) as f:
+        for line in f:
+            video_id, timestamp, *bbox, label, score = line.strip().split(',')
+            outputs = list(results[(video_id, int(timestamp))])
+            det = np.array([[*map(float, bbox), float(score)]], np.float32)
+            outputs[int(label) - 1] = np.concatenate(
+                [outputs[int(label) - 1], det])
+            results[(video_id, int(timestamp))] = outputs
+    results = [
+        dict(video_id=video_id, timestamp=timestamp, outputs=outputs)
+        for (video_id, timestamp), outputs in results.items()
+    ]
+    detection = ava_eval(results, 'mAP', label_map, gt_path, None)
+    assert_array_almost_equal(detection['overall'], 0.09385522)
+
 
 def test_multisport_detection():
     data_prefix = osp.normpath(
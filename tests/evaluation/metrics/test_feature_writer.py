@@ -0,0 +1,70 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+from glob import glob
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import torch
+from mmengine import load
+
+from mmaction.evaluation.metrics import FeatureWriter
+from mmaction.registry import METRICS
+from mmaction.structures import ActionDataSample
+
+
+def generate_batch(video_names, data_prefix):
+    data_samples = [
+        ActionDataSample(metainfo=dict(filename=osp.join(data_prefix, name)))
+        for name in video_names
+    ]
+    return dict(data_samples=data_samples)
+
+
+def test_feature_writer():
+    with TemporaryDirectory() as tmpdir:
+        metric = METRICS.build(
+            dict(type='FeatureWriter', out_dir=tmpdir, data_prefix='/videos'))
+        feats = torch.randn(3, 4, 16)
+        metric.process(
+            generate_batch(['a.mp4', 'b.mp4'], '/videos'), feats[:2])
+        # features are written per batch
+        assert torch.equal(load(osp.join(tmpdir, 'a.mp4.pkl')), feats[0])
+        assert FeatureWriter.load_progress(tmpdir) == {'a.mp4', 'b.mp4'}
+
+        # scores of the data samples, in subdirectories
+        scores = [dict(pred_score=torch.rand(5)) for _ in range(2)]
+        metric.process(
+            generate_batch(['sub/c.mp4', 'a.mp4'], '/videos'), scores)
+        assert torch.equal(
+            load(osp.join(tmpdir, 'sub', 'c.mp4.pkl')),
+            scores[0]['pred_score'])
+        # repeated samples are written once
+        assert torch.equal(load(osp.join(tmpdir, 'a.mp4.pkl')), feats[0])
+
+        # nothing is collected
+        assert metric.evaluate(4) == dict()
+        assert metric.results == []
+
+        # a restarted job appends to the progress records
+        metric = FeatureWriter(out_dir=tmpdir, data_prefix='/videos')
+        metric.process(generate_batch(['d.mp4'], '/videos'), feats[2:])
+        metric.evaluate(1)
+        assert FeatureWriter.load_progress(tmpdir) == {
+            'a.mp4', 'b.mp4', 'sub/c.mp4', 'd.mp4'
+        }
+        assert glob(osp.join(tmpdir, '*.tmp')) == []
+
+    # the samples padded by the distributed sampler are skipped by the
+    # ranks they are not originally given to
+    with TemporaryDirectory() as tmpdir:
+        metric = FeatureWriter(out_dir=tmpdir, data_prefix='/videos')
+        data_batch = generate_batch(['a.mp4', 'b.mp4', 'c.mp4'], '/videos')
+        for sample_idx, data_sample in zip([3, 0, 1],
+                                           data_batch['data_samples']):
+            data_sample.set_metainfo(dict(sample_idx=sample_idx))
+        with patch(
+                'mmaction.evaluation.metrics.feature_writer.get_dist_info',
+                return_value=(1, 2)):
+            metric.process(data_batch, torch.randn(3, 4))
+        assert FeatureWriter.load_progress(tmpdir) == {'a.mp4', 'c.mp4'}
+        assert not osp.exists(osp.join(tmpdir, 'b.mp4.pkl'))
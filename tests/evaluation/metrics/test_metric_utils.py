@@ -1,15 +1,18 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
 import random
 
 import numpy as np
 import pytest
 from numpy.testing import assert_array_almost_equal, assert_array_equal
 
-from mmaction.evaluation.functional import (average_recall_at_avg_proposals,
-                                            confusion_matrix,
-                                            get_weighted_score,
-                                            pairwise_temporal_iou,
-                                            top_k_classes)
+from mmaction.evaluation.functional import (
+    ActivityNetLocalization, average_recall_at_avg_proposals,
+    average_recall_at_avg_proposals_flat, confusion_matrix, get_weighted_score,
+    pairwise_temporal_iou, top_k_classes)
+from mmaction.evaluation.functional.eval_detection import (
+    compute_average_precision_detection,
+    compute_average_precision_detection_arrays)
 
 
 def test_top_k_accurate_classes():
@@ -114,6 +117,81 @@ def test_average_recall_at_avg_proposals():
     assert auc == 99.0
 
 
+def test_average_recall_at_avg_proposals_flat():
+    # the same as `ground_truth1` and `proposals1`, plus a video without
+    # proposals
+    gt_segments = np.array([[0, 1], [1, 2], [0, 1], [1, 2], [0, 1]])
+    proposals = np.array([[0, 1, 1], [1, 2, 1], [0, 1, 1], [1, 2, 1]])
+    recall, avg_recall, proposals_per_video, auc = (
+        average_recall_at_avg_proposals_flat(gt_segments, [0, 2, 4, 5],
+                                             proposals, [0, 2, 4, 4]))
+    expected = average_recall_at_avg_proposals(
+        {
+            'v_test1': gt_segments[0:2],
+            'v_test2': gt_segments[2:4],
+            'v_test3': gt_segments[4:5]
+        }, {
+            'v_test1': proposals[0:2],
+            'v_test2': proposals[2:4],
+            'v_test3': np.zeros((0, 3))
+        }, 4)
+    assert_array_equal(recall, expected[0])
+    assert_array_equal(avg_recall, expected[1])
+    assert_array_almost_equal(proposals_per_video, expected[2])
+    assert auc == expected[3]
+    # the gt without proposals is never recalled
+    assert_array_equal(recall[:, -1], [0.8] * 10)
+
+
+def test_compute_average_precision_detection_arrays():
+    rng = np.random.RandomState(0)
+    gt_videos = rng.choice(['v0', 'v1', 'v2', 'v3'], 30)
+    gt_segments = np.sort(rng.rand(30, 2) * 10, axis=1)
+    # `v4` has no ground truth
+    pred_videos = rng.choice(['v0', 'v1', 'v2', 'v4'], 100)
+    pred_segments = np.sort(rng.rand(100, 2) * 10, axis=1)
+    pred_scores = rng.rand(100)
+
+    ground_truth = [
+        {
+            'video-id': video,
+            't-start': start,
+            't-end': end
+        } for video, (start, end) in zip(gt_videos, gt_segments)
+    ]
+    prediction = [{
+        'video-id': video,
+        't-start': start,
+        't-end': end,
+        'score': score
+    } for video, (start, end), score in zip(pred_videos, pred_segments,
+                                            pred_scores)]
+    thresholds = np.linspace(0.1, 0.9, 9)
+    ap = compute_average_precision_detection_arrays(gt_videos, gt_segments,
+                                                    pred_videos,
+                                                    pred_segments,
+                                                    pred_scores, thresholds)
+    assert_array_almost_equal(
+        ap,
+        compute_average_precision_detection(ground_truth, prediction,
+                                            thresholds))
+
+    ap = compute_average_precision_detection_arrays(gt_videos, gt_segments,
+                                                    [], np.zeros((0, 2)), [],
+                                                    thresholds)
+    assert_array_equal(ap, np.zeros(9))
+
+    data_prefix = osp.normpath(
+        osp.join(osp.dirname(__file__), '../../data/eval_localization'))
+    gt_file = osp.join(data_prefix, 'gt.json')
+    result_file = osp.join(data_prefix, 'result.json')
+    detection = ActivityNetLocalization(gt_file, result_file)
+    parallel_detection = ActivityNetLocalization(
+        gt_file, result_file, num_workers=2)
+    assert_array_almost_equal(detection.evaluate()[0],
+                              parallel_detection.evaluate()[0])
+
+
 def test_get_weighted_score():
     score_a = [
         np.array([-0.2203, -0.7538, 1.8789, 0.4451, -0.2526]),
@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from unittest import TestCase
+from unittest.mock import patch
 
 import numpy as np
 import pytest
@@ -54,6 +55,46 @@ def test_acc_metric():
     assert eval_results['MdR'] == eval_results['MnR'] == 1.0
 
 
+def test_chunked_retrieval_metric():
+    _, predictions = generate_data(num_samples=37, random_label=True)
+    # duplicated videos produce tied similarities
+    predictions[3]['features']['video_feature'] = predictions[4]['features'][
+        'video_feature'].clone()
+
+    metric = RetrievalMetric()
+    metric.process(None, predictions)
+    expected = metric.compute_metrics(metric.results)
+
+    for chunk_size, device in [(1, None), (8, None), (100, None), (8, 'cpu')]:
+        metric = RetrievalMetric(chunk_size=chunk_size, device=device)
+        metric.process(None, predictions)
+        eval_results = metric.compute_metrics(metric.results)
+        assert eval_results.keys() == expected.keys()
+        for key, value in expected.items():
+            assert eval_results[key] == pytest.approx(value)
+
+    # a single process shards all queries to itself
+    metric = RetrievalMetric(sharded=True, chunk_size=8)
+    metric.process(None, predictions)
+    eval_results = metric.evaluate(len(predictions))
+    for key, value in expected.items():
+        assert eval_results[f'retrieval/{key}'] == pytest.approx(value)
+
+    # a rank without samples still joins the gather of the gallery
+    gallery = np.random.randn(3, 10).astype(np.float32)
+    metric = RetrievalMetric(sharded=True)
+    module = 'mmaction.evaluation.metrics.retrieval_metric'
+    with patch(f'{module}.get_dist_info', return_value=(1, 2)), \
+            patch(f'{module}.all_gather_object',
+                  side_effect=lambda obj: [gallery, obj]) as gather, \
+            patch('mmengine.evaluator.BaseMetric.evaluate',
+                  return_value=dict()):
+        metric.evaluate(3)
+    gather.assert_called_once()
+    assert gather.call_args[0][0].shape[0] == 0
+    assert metric.results == []
+
+
 class TestRetrievalRecall(TestCase):
 
     def test_evaluate(self):
@@ -43,3 +43,11 @@ def test_mobilenetv2_tsm_backbone():
     mobilenetv2_tsm_15.init_weights()
     feat = mobilenetv2_tsm_15(imgs)
     assert feat.shape == torch.Size([8, 1920, 2, 2])
+
+    # online mode, one frame at a time
+    mobilenetv2_tsm_15.eval()
+    mobilenetv2_tsm_15.set_online()
+    with torch.no_grad():
+        for img in imgs[:3]:
+            feat = mobilenetv2_tsm_15(img[None])
+            assert feat.shape == torch.Size([1, 1920, 2, 2])
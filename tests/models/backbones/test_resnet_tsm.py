@@ -128,3 +128,33 @@ class Test_ResNet_TSM(TestCase):
         imgs = generate_backbone_demo_inputs(input_shape)
         feat = resnet_tsm_50_full(imgs)
         assert feat.shape == torch.Size([8, 2048, 1, 1])
+
+    def test_resnet_tsm_online(self):
+        # online shift of one frame at a time
+        imgs = torch.randn(2, 4, 16, 3, 3)
+        temporal_shift = TemporalShift(nn.Identity(), num_segments=4)
+        offline = temporal_shift(imgs.view(-1, 16, 3, 3)).view(imgs.shape)
+        temporal_shift.online = True
+        for t in range(4):
+            online = temporal_shift(imgs[:, t])
+            # the channels from the next frame are not seen yet
+            assert (online[:, :2] == 0).all()
+            assert torch.equal(online[:, 2:], offline[:, t, 2:])
+
+        resnet_tsm_50 = ResNetTSM(50, pretrained2d=False)
+        resnet_tsm_50.init_weights()
+        resnet_tsm_50.eval()
+        resnet_tsm_50.set_online()
+        with torch.no_grad():
+            feats = [resnet_tsm_50(img[None]) for img in self.imgs[:3]]
+            assert feats[0].shape == torch.Size([1, 2048, 2, 2])
+            # the buffers are cleared for a new video
+            resnet_tsm_50.set_online()
+            assert torch.allclose(resnet_tsm_50(self.imgs[:1]), feats[0])
+            resnet_tsm_50.set_online(False)
+            assert resnet_tsm_50(self.imgs).shape == (8, 2048, 2, 2)
+
+        resnet_tsm_50_temporal_pool = ResNetTSM(
+            50, pretrained2d=False, temporal_pool=True)
+        with pytest.raises(AssertionError):
+            resnet_tsm_50_temporal_pool.set_online()
@@ -56,6 +56,27 @@ def test_data_preprocessor():
     assert data['data_samples'][0].gt_label.shape == (5, )
     assert data['data_samples'][1].gt_label.shape == (5, )
 
+    psr = ActionDataPreprocessor(
+        mean=[123.675, 116.28, 103.53],
+        std=[58.395, 57.12, 57.375],
+        format_shape='NCTHW',
+        batch_augment=dict(type='VideoBatchAugment', out_size=112))
+    data = psr(deepcopy(raw_data), training=True)
+    assert data['inputs'].shape == (2, 1, 3, 8, 112, 112)
+    # only augment the batch in training
+    data = psr(deepcopy(raw_data))
+    assert data['inputs'].shape == (2, 1, 3, 8, 224, 224)
+
+    # inputs stacked by the collate function
+    psr = ActionDataPreprocessor(
+        mean=[123.675, 116.28, 103.53],
+        std=[58.395, 57.12, 57.375],
+        format_shape='NCTHW')
+    stacked_data = deepcopy(raw_data)
+    stacked_data['inputs'] = torch.stack(stacked_data['inputs'])
+    assert_array_equal(
+        psr(stacked_data)['inputs'], psr(deepcopy(raw_data))['inputs'])
+
     raw_data = generate_dummy_data(2, (1, 3, 224, 224))
     psr = ActionDataPreprocessor(
         mean=[123.675, 116.28, 103.53],
@@ -1,5 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
 import platform
+from types import SimpleNamespace
 
 import numpy as np
 import pytest
@@ -7,9 +9,11 @@ import torch
 from mmcv.transforms import to_tensor
 from mmengine.structures import InstanceData
 
+from mmaction.engine.hooks import LabelCacheHook
+from mmaction.models.localizers.utils import temporal_iop, temporal_iou
 from mmaction.registry import MODELS
 from mmaction.structures import ActionDataSample
-from mmaction.testing import get_localizer_cfg
+from mmaction.testing import bmn_loop_decode_proposals, get_localizer_cfg
 from mmaction.utils import register_all_modules
 
 register_all_modules()
@@ -86,3 +90,102 @@ def test_bmn_tensor():
         with torch.no_grad():
             one_raw_feature = [torch.rand(400, 100)]
             localizer_bmn(one_raw_feature, data_samples=None, mode='tensor')
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Windows mem limit')
+def test_bmn_decode_proposals():
+    model_cfg = get_localizer_cfg(
+        'bmn/bmn_2xb8-400x100-9e_activitynet-feature.py')
+    localizer_bmn = MODELS.build(model_cfg.model)
+    tscale = localizer_bmn.tscale
+
+    confidence_map = torch.rand(3, 2, tscale, tscale)
+    start = torch.rand(3, tscale)
+    end = torch.rand(3, tscale)
+    batch_proposals = localizer_bmn._decode_proposals(confidence_map, start,
+                                                      end)
+    assert len(batch_proposals) == 3
+    for i, proposals in enumerate(batch_proposals):
+        expected = bmn_loop_decode_proposals(tscale, confidence_map[i],
+                                            start[i], end[i])
+        assert proposals.shape == expected.shape
+        np.testing.assert_allclose(proposals, expected, rtol=1e-6)
+
+    # predict handles every video of the batch
+    data_samples = [get_localization_data_sample() for _ in range(2)]
+    with torch.no_grad():
+        raw_feature = [torch.rand(400, 100), torch.rand(400, 100)]
+        results = localizer_bmn(raw_feature, data_samples, mode='predict')
+    assert len(results) == 2
+    assert all(result['video_name'] == 'v_test' for result in results)
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Windows mem limit')
+def test_bmn_generate_labels(tmp_path):
+    model_cfg = get_localizer_cfg(
+        'bmn/bmn_2xb8-400x100-9e_activitynet-feature.py')
+    localizer_bmn = MODELS.build(model_cfg.model)
+    tscale = localizer_bmn.tscale
+    gt_bbox = [
+        torch.tensor([[0.1, 0.3], [0.375, 0.625]]),
+        torch.tensor([[0.2, 0.9]])
+    ]
+    label_confidence, label_start, label_end = localizer_bmn.generate_labels(
+        gt_bbox)
+    assert label_confidence.shape == (2, tscale, tscale)
+    assert label_start.shape == (2, tscale)
+    assert label_end.shape == (2, tscale)
+
+    # compare with the per-box numpy computation
+    match_map = localizer_bmn.match_map
+    anchors = (np.array(localizer_bmn.anchors_tmins),
+               np.array(localizer_bmn.anchors_tmaxs))
+    gt_len_pad = 3 * (1. / tscale)
+    for i, every_gt_bbox in enumerate(gt_bbox):
+        every_gt_bbox = every_gt_bbox.numpy()
+        gt_iou_map = [
+            temporal_iou(match_map[:, 0], match_map[:, 1], start, end)
+            for start, end in every_gt_bbox
+        ]
+        gt_iou_map = np.max(gt_iou_map, axis=0).reshape(tscale, tscale)
+        start_score = [
+            temporal_iop(*anchors, tmin - gt_len_pad / 2,
+                         tmin + gt_len_pad / 2)
+            for tmin in every_gt_bbox[:, 0]
+        ]
+        end_score = [
+            temporal_iop(*anchors, tmax - gt_len_pad / 2,
+                         tmax + gt_len_pad / 2)
+            for tmax in every_gt_bbox[:, 1]
+        ]
+        start_score = np.max(start_score, axis=0)
+        end_score = np.max(end_score, axis=0)
+        np.testing.assert_allclose(
+            label_confidence[i].numpy(), gt_iou_map, atol=1e-5)
+        np.testing.assert_allclose(
+            label_start[i].numpy(), start_score, atol=1e-5)
+        np.testing.assert_allclose(label_end[i].numpy(), end_score, atol=1e-5)
+
+    # labels are cached by video name
+    localizer_bmn.cache_labels = True
+    labels = localizer_bmn.generate_labels(gt_bbox, ['v_1', 'v_2'])
+    assert set(localizer_bmn._label_cache) == {'v_1', 'v_2'}
+    cached_labels = localizer_bmn.generate_labels(
+        [torch.tensor([[0., 1.]])] * 2, ['v_2', 'v_1'])
+    assert torch.equal(cached_labels[0][0], labels[0][1])
+    assert torch.equal(cached_labels[1][1], labels[1][0])
+
+    # the cache is saved after the first epoch and loaded by later runs
+    label_cache_file = str(tmp_path / 'bmn_labels.pth')
+    model_cfg.model.label_cache_file = label_cache_file
+    localizer_bmn = MODELS.build(model_cfg.model)
+    assert localizer_bmn.cache_labels
+    assert len(localizer_bmn._label_cache) == 0
+    localizer_bmn.generate_labels(gt_bbox, ['v_1', 'v_2'])
+    hook = LabelCacheHook()
+    hook.after_train_epoch(SimpleNamespace(model=localizer_bmn))
+    assert osp.exists(label_cache_file)
+    localizer_bmn.generate_labels(gt_bbox[:1], ['v_3'])
+    hook.after_train_epoch(SimpleNamespace(model=localizer_bmn))
+    localizer_bmn = MODELS.build(model_cfg.model)
+    assert set(localizer_bmn._label_cache) == {'v_1', 'v_2'}
@@ -3,12 +3,14 @@ import os.path as osp
 
 import numpy as np
 import pytest
+import torch
 from numpy.testing import assert_array_almost_equal, assert_array_equal
 
-from mmaction.models.localizers.utils import (generate_bsp_feature,
+from mmaction.models.localizers.utils import (batched_soft_nms,
+                                              generate_bsp_feature,
                                               generate_candidate_proposals,
                                               soft_nms, temporal_iop,
-                                              temporal_iou)
+                                              temporal_iou, temporal_nms)
 
 
 def test_temporal_iou():
@@ -39,6 +41,47 @@ def test_soft_nms():
     assert_array_equal(proposal_list, [[0., 0.95, 0.6], [0., 0.4, 0.4]])
 
 
+def test_temporal_nms():
+    proposals = np.array([[0., 1., 0.5], [0., 0.4, 0.4], [0., 0.95, 0.6],
+                          [0.5, 0.8, 0.3]])
+    kept = temporal_nms(proposals, 0.5)
+    assert_array_equal(kept,
+                       [[0., 0.95, 0.6], [0., 0.4, 0.4], [0.5, 0.8, 0.3]])
+    kept = temporal_nms(proposals, 0.5, top_k=1)
+    assert_array_equal(kept, [[0., 0.95, 0.6]])
+    kept = temporal_nms(proposals, 1.)
+    assert_array_equal(kept[:, -1], [0.6, 0.5, 0.4, 0.3])
+
+
+def test_batched_soft_nms():
+    proposals = np.array([[0., 1., 1., 1., 0.5, 0.5],
+                          [0., 0.4, 1., 1., 0.4, 0.4],
+                          [0., 0.95, 1., 1., 0.6, 0.6]])
+    proposal_list = batched_soft_nms([proposals], 0.75, 0.65, 0.9, 1)
+    assert len(proposal_list) == 1
+    assert_array_equal(proposal_list[0].numpy(),
+                       [[0., 0.95, 0.6], [0., 0.4, 0.4]])
+
+    # the result matches soft_nms on each video
+    rng = np.random.RandomState(0)
+    batch = []
+    for num in [30, 1, 0, 50]:
+        tmin = rng.rand(num) * 0.8
+        tmax = tmin + rng.rand(num) * 0.2 + 0.01
+        batch.append(np.stack((tmin, tmax, rng.rand(num)), axis=1))
+    results = batched_soft_nms(batch, 0.4, 0.5, 0.9, 10)
+    for proposals, result in zip(batch, results):
+        expected = soft_nms(proposals, 0.4, 0.5, 0.9, 10)
+        assert_array_almost_equal(result.numpy(), expected)
+
+    results = batched_soft_nms([torch.from_numpy(p) for p in batch], 0.4,
+                               0.5, 0.9, 10)
+    assert all(isinstance(result, torch.Tensor) for result in results)
+
+    # no videos
+    assert batched_soft_nms([], 0.4, 0.5, 0.9, 10) == []
+
+
 def test_generate_candidate_proposals():
     video_list = [0, 1]
     video_infos = [
@@ -1,7 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import numpy as np
 
-from mmaction.models.localizers.utils import post_processing
+from mmaction.models.localizers.utils import (batch_post_processing,
+                                              post_processing)
 
 
 def test_post_processing():
@@ -32,3 +33,22 @@ def test_post_processing():
     assert isinstance(proposal_list[0], dict)
     assert proposal_list[0]['score'] == 0.5
     assert proposal_list[0]['segment'] == [0., 100.0]
+
+
+def test_batch_post_processing():
+    results = [
+        np.array([[0., 1., 1., 1., 0.5, 0.5], [0., 0.4, 1., 1., 0.4, 0.4],
+                  [0., 0.95, 1., 1., 0.6, 0.6]]),
+        np.array([[0., 1., 1., 1., 0.5, 0.5]])
+    ]
+    video_info = dict(
+        video_name='v_test',
+        duration_second=100,
+        duration_frame=960,
+        feature_frame=960)
+    proposal_lists = batch_post_processing(results, [video_info] * 2, 0.75,
+                                           0.65, 0.9, 2, 16)
+    assert len(proposal_lists) == 2
+    for result, proposal_list in zip(results, proposal_lists):
+        assert proposal_list == post_processing(result, video_info, 0.75,
+                                                0.65, 0.9, 2, 16)
@@ -1,9 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import os.path as osp
+import shutil
+from tempfile import TemporaryDirectory
 
 import torch
 
 from mmaction.models import FBOHead
+from mmaction.models.roi_heads.shared_heads.lfb import LFB
 
 
 def test_fbo_head():
@@ -65,3 +68,44 @@ def test_fbo_head():
     fbo_head.init_weights()
     out = fbo_head(st_feat, rois, img_metas)
     assert out.shape == (1, 32, 1, 1, 1)
+
+
+def test_packed_lfb():
+    lfb_prefix_path = osp.normpath(
+        osp.join(osp.dirname(__file__), '../../data/lfb'))
+
+    with TemporaryDirectory() as tmp_dir:
+        shutil.copy(osp.join(lfb_prefix_path, 'lfb_unittest.pkl'), tmp_dir)
+        lfb_cfg = dict(
+            lfb_prefix_path=tmp_dir,
+            max_num_sampled_feat=100,
+            window_size=60,
+            lfb_channels=16,
+            dataset_modes=('unittest'))
+        lfb = LFB(device='cpu', **lfb_cfg)
+        packed_lfb = LFB(device='packed', packed_dtype='float32', **lfb_cfg)
+        assert len(packed_lfb) == len(lfb)
+
+        for img_key in ['video_1,930', 'video_1,0', lfb_key(lfb)]:
+            expected = lfb[img_key].reshape(60, 100, 16)
+            feats = packed_lfb[img_key].reshape(60, 100, 16)
+            assert feats.shape == expected.shape
+            # all roi features of a second are sampled in a random order
+            torch.testing.assert_close(feats.sum(1), expected.sum(1))
+            assert torch.equal((feats != 0).any(-1).sum(1),
+                               (expected != 0).any(-1).sum(1))
+
+        # fewer features than in a second are sampled without replacement
+        packed_lfb = LFB(
+            device='packed',
+            construct_packed=False,
+            **dict(lfb_cfg, max_num_sampled_feat=1))
+        feats = packed_lfb[lfb_key(lfb)]
+        assert feats.shape == (60, 16)
+
+
+def lfb_key(lfb):
+    """Get the key of a window centered on a stored second."""
+    video_id = next(iter(lfb.lfb))
+    sec = next(iter(lfb.lfb[video_id]))
+    return f'{video_id},{sec}'
@@ -0,0 +1,47 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import pytest
+import torch
+from numpy.testing import assert_array_almost_equal
+
+from mmaction.models import VideoBatchAugment
+
+
+def test_video_batch_augment():
+    with pytest.raises(AssertionError):
+        VideoBatchAugment(area_range=(0, 1))
+    with pytest.raises(AssertionError):
+        VideoBatchAugment(hue=0.6)
+
+    # NCHW imgs
+    imgs = torch.randint(0, 256, (4, 8, 3, 64, 48), dtype=torch.uint8)
+    augment = VideoBatchAugment(
+        out_size=32, brightness=0.5, contrast=0.5, saturation=0.5, hue=0.1)
+    outputs = augment(imgs)
+    assert outputs.shape == (4, 8, 3, 32, 32)
+    assert outputs.dtype == torch.float32
+    assert outputs.min() >= 0 and outputs.max() <= 255
+
+    # NCTHW imgs
+    imgs = torch.randint(0, 256, (2, 1, 3, 4, 64, 48), dtype=torch.uint8)
+    outputs = augment(imgs)
+    assert outputs.shape == (2, 1, 3, 4, 32, 32)
+
+    # without a crop, the resize and flip are exact
+    augment = VideoBatchAugment(area_range=None, flip_ratio=1.)
+    outputs = augment(imgs)
+    assert_array_almost_equal(outputs, imgs.flip(-1).float(), decimal=3)
+    augment = VideoBatchAugment(area_range=None, flip_ratio=0.)
+    assert_array_almost_equal(augment(imgs), imgs.float(), decimal=3)
+
+    # the hue is rotated back after a full turn of the offsets
+    imgs = torch.rand(2, 1, 3, 4, 8, 8) * 255
+    factor = torch.full((2, 1, 1, 1, 1, 1), 180 / 255)
+    assert_array_almost_equal(
+        VideoBatchAugment._adjust_hue(imgs, factor), imgs, decimal=2)
+    assert_array_almost_equal(
+        VideoBatchAugment._adjust_hue(imgs, factor * 0), imgs, decimal=2)
+
+    assert repr(VideoBatchAugment()) == (
+        'VideoBatchAugment(out_size=None, area_range=(0.08, 1.0), '
+        f'aspect_ratio_range={(3 / 4, 4 / 3)}, flip_ratio=0.5, '
+        'brightness=None, contrast=None, saturation=None, hue=None)')
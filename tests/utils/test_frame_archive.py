@@ -0,0 +1,40 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from mmaction.utils import FrameArchiveReader, FrameArchiveWriter
+
+
+def test_frame_archive():
+    frames = [b'frame0', b'', b'frame_two', bytes(range(256))]
+    with TemporaryDirectory() as tmp_dir:
+        archive_path = osp.join(tmp_dir, 'video.frames')
+        with FrameArchiveWriter(archive_path) as writer:
+            for frame in frames:
+                writer.add(frame)
+        assert os.listdir(tmp_dir) == ['video.frames']
+
+        with FrameArchiveReader(archive_path) as reader:
+            assert len(reader) == 4
+            for i, frame in enumerate(frames):
+                assert reader.get(i) == frame
+            with pytest.raises(IndexError):
+                reader.get(4)
+
+        # a failed write leaves no archive behind
+        failed_path = osp.join(tmp_dir, 'failed.frames')
+        with pytest.raises(RuntimeError):
+            with FrameArchiveWriter(failed_path) as writer:
+                writer.add(b'frame0')
+                raise RuntimeError
+        assert not osp.exists(failed_path)
+        assert os.listdir(tmp_dir) == ['video.frames']
+
+        not_archive = osp.join(tmp_dir, 'img.jpg')
+        with open(not_archive, 'wb') as f:
+            f.write(b'0' * 64)
+        with pytest.raises(ValueError):
+            FrameArchiveReader(not_archive)
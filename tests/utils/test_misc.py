@@ -4,9 +4,10 @@ import os.path as osp
 import platform
 from tempfile import TemporaryDirectory
 
+import numpy as np
 import pytest
 
-from mmaction.utils import frame_extract
+from mmaction.utils import frame_decode, frame_extract
 
 
 @pytest.mark.skipif(platform.system() == 'Windows', reason='Windows mem limit')
@@ -24,3 +25,15 @@ def test_frame_extract():
         frame_paths, frames = frame_extract(video_path, out_dir=tmp_dir)
         assert osp.exists(tmp_dir) and \
             len(os.listdir(f'{tmp_dir}/test')) == len(frame_paths)
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='Windows mem limit')
+def test_frame_decode():
+    data_prefix = osp.normpath(osp.join(osp.dirname(__file__), '../data'))
+    video_path = osp.join(data_prefix, 'test.mp4')
+    with TemporaryDirectory() as tmp_dir:
+        _, extracted = frame_extract(
+            video_path, short_side=100, out_dir=tmp_dir)
+    frames = frame_decode(video_path, short_side=100)
+    assert len(frames) == len(extracted)
+    np.testing.assert_array_equal(frames[0], extracted[0])
@@ -0,0 +1,54 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import pickle
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pytest
+import torch
+
+from mmaction.utils import PackedArrayReader, PackedArrayWriter
+
+
+def test_packed_array_store():
+    arrays = dict(
+        v_1=np.random.rand(400, 100),
+        v_2=np.random.rand(400, 7),
+        v_3=np.ones(3))
+    with TemporaryDirectory() as tmp_dir:
+        with PackedArrayWriter(tmp_dir) as writer:
+            for name, array in arrays.items():
+                writer.add(name, array)
+            with pytest.raises(AssertionError):
+                writer.add('v_1', arrays['v_1'])
+
+        reader = PackedArrayReader(tmp_dir)
+        assert len(reader) == 3
+        assert 'v_2' in reader and 'v_4' not in reader
+        assert list(reader) == ['v_1', 'v_2', 'v_3']
+        for name, array in arrays.items():
+            loaded = reader[name]
+            assert loaded.dtype == np.float32
+            assert loaded.shape == array.shape
+            np.testing.assert_allclose(loaded, array, rtol=1e-6)
+            # views of the mapping are writable without touching the file
+            assert torch.from_numpy(loaded).shape == array.shape
+
+        # the mapping is reopened after pickling, e.g. in dataloader workers
+        reader = pickle.loads(pickle.dumps(reader))
+        assert reader._data is None
+        np.testing.assert_allclose(reader['v_3'], arrays['v_3'])
+
+        # a failed write leaves the existing store intact
+        with pytest.raises(RuntimeError):
+            with PackedArrayWriter(tmp_dir) as writer:
+                writer.add('v_4', np.zeros(5))
+                raise RuntimeError
+        reader = PackedArrayReader(tmp_dir)
+        assert list(reader) == ['v_1', 'v_2', 'v_3']
+        np.testing.assert_allclose(reader['v_3'], arrays['v_3'])
+        assert sorted(os.listdir(tmp_dir)) == ['data.bin', 'index.json']
+
+        with PackedArrayWriter(tmp_dir, dtype='float16'):
+            pass
+        assert len(PackedArrayReader(tmp_dir)) == 0
@@ -0,0 +1,42 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import pickle
+
+import pytest
+
+from mmaction.utils import VideoReaderPool
+
+
+def test_video_reader_pool():
+    with pytest.raises(AssertionError):
+        VideoReaderPool(0)
+
+    evicted = []
+    opened = []
+
+    def open_fn(name):
+
+        def _open():
+            opened.append(name)
+            return f'reader_{name}'
+
+        return _open
+
+    pool = VideoReaderPool(2, on_evict=evicted.append)
+    assert pool.get('a', open_fn('a')) == 'reader_a'
+    assert pool.get('b', open_fn('b')) == 'reader_b'
+    # hit, moves `a` to the most recently used end
+    assert pool.get('a', open_fn('a')) == 'reader_a'
+    assert opened == ['a', 'b']
+
+    pool.get('c', open_fn('c'))
+    assert evicted == ['reader_b']
+    assert 'a' in pool and 'c' in pool and 'b' not in pool
+    assert len(pool) == 2
+
+    # pickled pools do not carry the readers
+    restored = pickle.loads(pickle.dumps(VideoReaderPool(2)))
+    assert len(restored) == 0
+
+    pool.clear()
+    assert len(pool) == 0
+    assert evicted == ['reader_b', 'reader_a', 'reader_c']
@@ -0,0 +1,133 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+"""This file is for benchmarking the AR@AN computation of ``ANetMetric``. The
+command line to run this file is:
+
+$ python tools/analysis_tools/bench_ar_an.py
+
+It compares the per-video loop with the flattened computation of
+``average_recall_at_avg_proposals_flat`` on random proposals, with the
+scale of the ActivityNet validation set by default.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mmaction.evaluation import (average_recall_at_avg_proposals_flat,
+                                 pairwise_temporal_iou)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark AR@AN')
+    parser.add_argument(
+        '--num-videos', type=int, default=4728, help='number of videos')
+    parser.add_argument(
+        '--num-proposals',
+        type=int,
+        default=100,
+        help='number of proposals per video')
+    parser.add_argument(
+        '--max-gts', type=int, default=5, help='max ground truths per video')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='number of timed runs')
+    args = parser.parse_args()
+    return args
+
+
+def loop_average_recall(ground_truth, proposals, total_num_proposals,
+                        max_avg_proposals, temporal_iou_thresholds):
+    """The per-video loop of AR@AN."""
+    total_num_videos = len(ground_truth)
+    ratio = (max_avg_proposals * float(total_num_videos) / total_num_proposals)
+
+    score_list = []
+    total_num_retrieved_proposals = 0
+    for video_id in ground_truth:
+        proposals_video_id = proposals[video_id]
+        sort_idx = np.argsort(proposals_video_id[:, 2], kind='stable')[::-1]
+        this_video_proposals = proposals_video_id[sort_idx, :2].astype(
+            np.float32)
+        this_video_ground_truth = ground_truth[video_id].astype(np.float32)
+        num_retrieved_proposals = np.minimum(
+            int(this_video_proposals.shape[0] * ratio),
+            this_video_proposals.shape[0])
+        total_num_retrieved_proposals += num_retrieved_proposals
+        this_video_proposals = this_video_proposals[:num_retrieved_proposals]
+        score_list.append(
+            pairwise_temporal_iou(this_video_proposals,
+                                  this_video_ground_truth))
+
+    pcn_list = np.arange(1, 101) / 100.0 * (
+        max_avg_proposals * float(total_num_videos) /
+        total_num_retrieved_proposals)
+    matches = np.empty((total_num_videos, pcn_list.shape[0]))
+    positives = np.empty(total_num_videos)
+    recall = np.empty((temporal_iou_thresholds.shape[0], pcn_list.shape[0]))
+    for ridx, temporal_iou in enumerate(temporal_iou_thresholds):
+        for i, score in enumerate(score_list):
+            positives[i] = score.shape[0]
+            true_positives_temporal_iou = score >= temporal_iou
+            pcn_proposals = np.minimum(
+                (score.shape[1] * pcn_list).astype(np.int32), score.shape[1])
+            for j, num_retrieved_proposals in enumerate(pcn_proposals):
+                matches[i, j] = np.count_nonzero(
+                    (true_positives_temporal_iou[:, :num_retrieved_proposals]
+                     ).sum(axis=1))
+        recall[ridx, :] = matches.sum(axis=0) / positives.sum()
+    return recall
+
+
+def main():
+    args = parse_args()
+    rng = np.random.RandomState(0)
+    thresholds = np.linspace(0.5, 0.95, 10)
+
+    gt_counts = rng.randint(1, args.max_gts + 1, args.num_videos)
+    gt_segments = np.sort(rng.uniform(0, 100, (gt_counts.sum(), 2)), axis=1)
+    num_proposals = args.num_videos * args.num_proposals
+    segments = np.sort(rng.uniform(0, 100, (num_proposals, 2)), axis=1)
+    scores = rng.uniform(0, 1, (num_proposals, 1))
+    proposals = np.hstack([segments, scores])
+    gt_offsets = np.cumsum(np.concatenate([[0], gt_counts]))
+    proposal_offsets = np.arange(args.num_videos + 1) * args.num_proposals
+
+    ground_truth = {
+        i: gt_segments[gt_offsets[i]:gt_offsets[i + 1]]
+        for i in range(args.num_videos)
+    }
+    proposal_dict = {
+        i: proposals[proposal_offsets[i]:proposal_offsets[i + 1]]
+        for i in range(args.num_videos)
+    }
+
+    loop_times, flat_times = [], []
+    for _ in range(args.repeat):
+        tic = time.perf_counter()
+        expected = loop_average_recall(ground_truth, proposal_dict,
+                                       num_proposals, args.num_proposals,
+                                       thresholds)
+        loop_times.append(time.perf_counter() - tic)
+
+        tic = time.perf_counter()
+        recall, _, _, auc = average_recall_at_avg_proposals_flat(
+            gt_segments,
+            gt_offsets,
+            proposals,
+            proposal_offsets,
+            max_avg_proposals=args.num_proposals,
+            temporal_iou_thresholds=thresholds)
+        flat_times.append(time.perf_counter() - tic)
+
+    np.testing.assert_allclose(recall, expected)
+
+    loop_time = np.median(loop_times)
+    flat_time = np.median(flat_times)
+    print(f'videos: {args.num_videos}, ground truths: {gt_counts.sum()}, '
+          f'proposals: {num_proposals}, AUC: {auc:.2f}')
+    print(f'per-video loop:   {loop_time:.3f} s')
+    print(f'flattened tables: {flat_time:.3f} s')
+    print(f'speedup: {loop_time / flat_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
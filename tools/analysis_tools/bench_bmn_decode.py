@@ -0,0 +1,75 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+"""This file is for benchmarking the proposal decoding of BMN. The command
+line to run this file is:
+
+$ python tools/analysis_tools/bench_bmn_decode.py [config filename]
+
+It compares the per-pair Python decoding loop with the batched decoding used
+by ``BMN.predict`` on random network outputs.
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from mmengine import Config
+
+from mmaction.registry import MODELS
+from mmaction.testing import bmn_loop_decode_proposals
+from mmaction.utils import register_all_modules
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark BMN proposal decoding')
+    parser.add_argument('config', help='BMN config file path')
+    parser.add_argument(
+        '--batch-size', type=int, default=16, help='number of videos')
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='number of timed runs')
+    parser.add_argument(
+        '--device', default='cpu', help='device the outputs are placed on')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    register_all_modules()
+
+    cfg = Config.fromfile(args.config)
+    model = MODELS.build(cfg.model)
+    tscale = model.tscale
+
+    confidence_map = torch.rand(
+        args.batch_size, 2, tscale, tscale, device=args.device)
+    start = torch.rand(args.batch_size, tscale, device=args.device)
+    end = torch.rand(args.batch_size, tscale, device=args.device)
+
+    loop_times, batch_times = [], []
+    for _ in range(args.repeat):
+        tic = time.perf_counter()
+        expected = [
+            bmn_loop_decode_proposals(tscale, confidence_map[i], start[i],
+                                      end[i])
+            for i in range(args.batch_size)
+        ]
+        loop_times.append(time.perf_counter() - tic)
+
+        tic = time.perf_counter()
+        results = model._decode_proposals(confidence_map, start, end)
+        batch_times.append(time.perf_counter() - tic)
+
+    for result, target in zip(results, expected):
+        np.testing.assert_allclose(result, target, rtol=1e-6)
+
+    loop_time = np.median(loop_times)
+    batch_time = np.median(batch_times)
+    print(f'tscale: {tscale}, batch size: {args.batch_size}')
+    print(f'loop decoding:    {loop_time * 1000:.2f} ms / batch')
+    print(f'batched decoding: {batch_time * 1000:.2f} ms / batch')
+    print(f'speedup: {loop_time / batch_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
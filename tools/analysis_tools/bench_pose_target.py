@@ -0,0 +1,74 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+"""This file is for benchmarking the pseudo heatmap generation of
+``GeneratePoseTarget``. The command line to run this file is:
+
+$ python tools/analysis_tools/bench_pose_target.py
+
+It compares the per-frame loop with the batched generation on random
+skeletons, with the shapes of PoseC3D training by default.
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+
+from mmaction.datasets.transforms import GeneratePoseTarget
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark GeneratePoseTarget')
+    parser.add_argument(
+        '--num-frames', type=int, default=48, help='number of frames')
+    parser.add_argument(
+        '--num-persons', type=int, default=2, help='number of persons')
+    parser.add_argument(
+        '--img-size', type=int, default=56, help='size of the heatmaps')
+    parser.add_argument(
+        '--with-limb', action='store_true', help='generate limb heatmaps')
+    parser.add_argument(
+        '--device', default='cpu', help='device of the batched generation')
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='number of timed runs')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    size = args.img_size
+    rng = np.random.RandomState(0)
+    results = dict(
+        img_shape=(size, size),
+        keypoint=rng.uniform(
+            0, size, size=(args.num_persons, args.num_frames, 17, 2)),
+        keypoint_score=rng.uniform(
+            0, 1, size=(args.num_persons, args.num_frames, 17)),
+        modality='Pose')
+    kwargs = dict(with_kp=not args.with_limb, with_limb=args.with_limb)
+    loop = GeneratePoseTarget(**kwargs)
+    batched = GeneratePoseTarget(batched=True, device=args.device, **kwargs)
+
+    loop_times, batch_times = [], []
+    for _ in range(args.repeat):
+        tic = time.perf_counter()
+        expected = loop(copy.deepcopy(results))['imgs']
+        loop_times.append(time.perf_counter() - tic)
+
+        tic = time.perf_counter()
+        heatmaps = batched(copy.deepcopy(results))['imgs']
+        batch_times.append(time.perf_counter() - tic)
+
+    np.testing.assert_allclose(heatmaps, expected, atol=1e-5)
+
+    loop_time = np.median(loop_times)
+    batch_time = np.median(batch_times)
+    print(f'heatmaps: {expected.shape}, persons: {args.num_persons}')
+    print(f'loop generation:    {loop_time * 1000:.2f} ms / sample')
+    print(f'batched generation: {batch_time * 1000:.2f} ms / sample')
+    print(f'speedup: {loop_time / batch_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ import numpy as np
 import scipy.interpolate
 from mmengine import dump, load
 
+from mmaction.utils import PackedArrayWriter
+
 args = None
 
 
@@ -16,7 +18,11 @@ def parse_args():
     parser.add_argument('--rgb', default='', help='rgb feature root')
     parser.add_argument('--flow', default='', help='flow feature root')
     parser.add_argument('--dest', default='', help='dest root')
-    parser.add_argument('--output-format', default='csv')
+    parser.add_argument(
+        '--output-format',
+        default='csv',
+        choices=['csv', 'pkl', 'packed'],
+        help='packed writes all videos into one memory-mapped feature store')
     args = parser.parse_args()
     return args
 
@@ -70,6 +76,9 @@ def merge_feat(name):
     rgb_feat = pool_feature(rgb_feat)
     flow_feat = pool_feature(flow_feat)
     feat = np.concatenate([rgb_feat, flow_feat], axis=-1)
+    if args.output_format == 'packed':
+        # written by the main process into a single store
+        return name, feat
     if not osp.exists(args.dest):
         os.system(f'mkdir -p {args.dest}')
     if args.output_format == 'pkl':
@@ -96,7 +105,13 @@ def main():
     # for feat in rgb_feat:
     #     merge_feat(feat)
     pool = multiprocessing.Pool(32)
-    pool.map(merge_feat, rgb_feat)
+    if args.output_format == 'packed':
+        with PackedArrayWriter(args.dest) as writer:
+            for name, feat in pool.imap(merge_feat, rgb_feat):
+                writer.add(osp.splitext(name)[0], feat.T)
+    else:
+        pool.map(merge_feat, rgb_feat)
+    pool.close()
 
 
 if __name__ == '__main__':
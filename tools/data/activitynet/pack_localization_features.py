@@ -0,0 +1,51 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import os
+import os.path as osp
+
+import numpy as np
+from mmengine import load
+from mmengine.utils import track_iter_progress
+
+from mmaction.utils import PackedArrayWriter
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Pack localization features into a memory-mapped store')
+    parser.add_argument('src', help='directory of csv or pkl feature files')
+    parser.add_argument('dest', help='directory of the packed feature store')
+    parser.add_argument(
+        '--ext',
+        default='csv',
+        choices=['csv', 'pkl'],
+        help='extension of the feature files')
+    parser.add_argument(
+        '--dtype', default='float32', help='data type of the stored features')
+    args = parser.parse_args()
+    return args
+
+
+def load_feature(path, ext):
+    """Load a feature file with shape (temporal_dim, feat_dim)."""
+    if ext == 'csv':
+        return np.loadtxt(path, dtype=np.float32, delimiter=',', skiprows=1)
+    return np.asarray(load(path))
+
+
+def main():
+    args = parse_args()
+    files = sorted(
+        file for file in os.listdir(args.src)
+        if file.endswith(f'.{args.ext}'))
+
+    with PackedArrayWriter(args.dest, dtype=args.dtype) as writer:
+        for file in track_iter_progress(files):
+            feature = load_feature(osp.join(args.src, file), args.ext)
+            # stored as (feat_dim, temporal_dim), the layout of `raw_feature`
+            writer.add(osp.splitext(file)[0], feature.T)
+    print(f'Packed {len(files)} videos into {args.dest}')
+
+
+if __name__ == '__main__':
+    main()
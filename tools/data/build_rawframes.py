@@ -9,15 +9,82 @@ import warnings
 import logging
 from multiprocessing import Lock, Pool
 
+import cv2
 import mmcv
 import numpy as np
 
+from mmaction.utils import FRAME_ARCHIVE_EXT, FrameArchiveWriter
+
+
 def process_batches(video_list, batch_size):
     """Create batches from the video list."""
     video_list = list(video_list)  # Convert zip object to a list
     for i in range(0, len(video_list), batch_size):
         yield video_list[i:i + batch_size]
-        
+
+
+def resize_frame(vr_frame):
+    """Resize a decoded frame according to the resize arguments."""
+    w, h, _ = np.shape(vr_frame)
+    if args.new_short == 0:
+        if args.new_width == 0 or args.new_height == 0:
+            # Keep original shape
+            return vr_frame
+        return mmcv.imresize(vr_frame, (args.new_width, args.new_height))
+    if min(h, w) == h:
+        new_h = args.new_short
+        new_w = int((new_h / h) * w)
+    else:
+        new_w = args.new_short
+        new_h = int((new_w / w) * h)
+    return mmcv.imresize(vr_frame, (new_h, new_w))
+
+
+def build_frame_archive(full_path, out_full_path, vid_path):
+    """Pack the rgb frames of a video into a single frame archive.
+
+    The frames are decoded from the video with OpenCV, or read from an
+    existing rawframe directory if ``--input-frames`` is set, and stored as
+    JPEG bytes in ``{out_full_path}/{video_name}.frames``.
+
+    Returns:
+        int: 0 if the archive was built successfully, otherwise -1.
+    """
+    video_name = osp.splitext(osp.basename(vid_path))[0]
+    archive_path = osp.join(out_full_path, video_name + FRAME_ARCHIVE_EXT)
+    if osp.exists(archive_path):
+        logging.info(f'Frame archive already exists: {archive_path}. '
+                     f'Skipping {vid_path}')
+        return 0
+
+    os.makedirs(out_full_path, exist_ok=True)
+    try:
+        with FrameArchiveWriter(archive_path) as writer:
+            if args.input_frames:
+                frame_paths = sorted(
+                    glob.glob(osp.join(full_path, 'img_*.jpg')))
+                if len(frame_paths) == 0:
+                    raise ValueError(f'No rgb frames found in {full_path}')
+                for frame_path in frame_paths:
+                    with open(frame_path, 'rb') as f:
+                        writer.add(f.read())
+            else:
+                vr = mmcv.VideoReader(full_path)
+                for i, vr_frame in enumerate(vr):
+                    if vr_frame is None:
+                        warnings.warn(
+                            'Length inconsistent!'
+                            f'Early stop with {i + 1} out of {len(vr)} frames.'
+                        )
+                        break
+                    _, img_bytes = cv2.imencode('.jpg', resize_frame(vr_frame))
+                    writer.add(img_bytes.tobytes())
+    except Exception:
+        logging.exception(f'Failed to build the frame archive of {vid_path}')
+        return -1
+    return 0
+
+
 def extract_frame(vid_item):
     """Generate optical flow using dense flow.
 
@@ -38,7 +105,10 @@ def extract_frame(vid_item):
     run_success = -1
 
     if task == 'rgb':
-        if args.use_opencv:
+        if args.out_format == 'packed':
+            run_success = build_frame_archive(full_path, out_full_path,
+                                              vid_path)
+        elif args.use_opencv:
             # Not like using denseflow,
             # Use OpenCV will not make a sub directory with the video name
             try:
@@ -62,23 +132,7 @@ def extract_frame(vid_item):
                 vr = mmcv.VideoReader(full_path)
                 for i, vr_frame in enumerate(vr):
                     if vr_frame is not None:
-                        w, h, _ = np.shape(vr_frame)
-                        if args.new_short == 0:
-                            if args.new_width == 0 or args.new_height == 0:
-                                # Keep original shape
-                                out_img = vr_frame
-                            else:
-                                out_img = mmcv.imresize(
-                                    vr_frame,
-                                    (args.new_width, args.new_height))
-                        else:
-                            if min(h, w) == h:
-                                new_h = args.new_short
-                                new_w = int((new_h / h) * w)
-                            else:
-                                new_w = args.new_short
-                                new_h = int((new_w / w) * h)
-                            out_img = mmcv.imresize(vr_frame, (new_h, new_w))
+                        out_img = resize_frame(vr_frame)
                         mmcv.imwrite(out_img,
                                      f'{out_full_path}/img_{i + 1:05d}.jpg')
                     else:
@@ -229,8 +283,9 @@ def parse_args():
         '--out-format',
         type=str,
         default='jpg',
-        choices=['jpg', 'h5', 'png'],
-        help='output format')
+        choices=['jpg', 'h5', 'png', 'packed'],
+        help='output format, packed writes the rgb frames of each video into '
+        'a single frame archive')
     parser.add_argument(
         '--ext',
         type=str,
@@ -295,7 +350,7 @@ if __name__ == '__main__':
                 os.makedirs(new_dir)
 
     if args.input_frames:
-        logging.info(f'Reading rgb frames from folder: {args.src_dirpython feature_extraction.py}')
+        logging.info(f'Reading rgb frames from folder: {args.src_dir}')
         fullpath_list = glob.glob(args.src_dir + '/*' * args.level)
         logging.info(f'Total number of rgb frame folders found: {len(fullpath_list)}')
     else:
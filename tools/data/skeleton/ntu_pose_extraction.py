@@ -3,13 +3,11 @@ import abc
 import argparse
 import os.path as osp
 from collections import defaultdict
-from tempfile import TemporaryDirectory
 
 import mmengine
 import numpy as np
 
-from mmaction.apis import detection_inference, pose_inference
-from mmaction.utils import frame_extract
+from mmaction.apis import batch_detection_inference, batch_pose_inference
 
 args = abc.abstractproperty()
 args.det_config = 'demo/demo_configs/faster-rcnn_r50-caffe_fpn_ms-1x_coco-person.py'  # noqa: E501
@@ -17,6 +15,7 @@ args.det_checkpoint = 'https://download.openmmlab.com/mmdetection/v2.0/faster_rc
 args.det_score_thr = 0.5
 args.pose_config = 'demo/demo_configs/td-hm_hrnet-w32_8xb64-210e_coco-256x192_infer.py'  # noqa: E501
 args.pose_checkpoint = 'https://download.openmmlab.com/mmpose/top_down/hrnet/hrnet_w32_coco_256x192-c78dce93_20200708.pth'  # noqa: E501
+args.batch_size = 16
 
 
 def intersection(b0, b1):
@@ -229,14 +228,19 @@ def ntu_det_postproc(vid, det_results):
         return bboxes2bbox(det_results, len(det_results))
 
 
-def pose_inference_with_align(args, frame_paths, det_results):
+def pose_inference_with_align(args, vid, det_results):
     # filter frame without det bbox
     det_results = [
         frm_dets for frm_dets in det_results if frm_dets.shape[0] > 0
     ]
 
-    pose_results, _ = pose_inference(args.pose_config, args.pose_checkpoint,
-                                     frame_paths, det_results, args.device)
+    pose_results, _ = batch_pose_inference(
+        args.pose_config,
+        args.pose_checkpoint,
+        vid,
+        det_results,
+        args.device,
+        batch_size=args.batch_size)
     # align the num_person among frames
     num_persons = max([pose['keypoints'].shape[0] for pose in pose_results])
     num_points = pose_results[0]['keypoints'].shape[1]
@@ -255,23 +259,21 @@ def pose_inference_with_align(args, frame_paths, det_results):
 
 
 def ntu_pose_extraction(vid, skip_postproc=False):
-    tmp_dir = TemporaryDirectory()
-    frame_paths, _ = frame_extract(vid, out_dir=tmp_dir.name)
-    det_results, _ = detection_inference(
+    det_results, _ = batch_detection_inference(
         args.det_config,
         args.det_checkpoint,
-        frame_paths,
+        vid,
         args.det_score_thr,
         device=args.device,
-        with_score=True)
+        with_score=True,
+        batch_size=args.batch_size)
 
     if not skip_postproc:
         det_results = ntu_det_postproc(vid, det_results)
 
     anno = dict()
 
-    keypoints, scores = pose_inference_with_align(args, frame_paths,
-                                                  det_results)
+    keypoints, scores = pose_inference_with_align(args, vid, det_results)
     anno['keypoint'] = keypoints
     anno['keypoint_score'] = scores
     anno['frame_dir'] = osp.splitext(osp.basename(vid))[0]
@@ -279,7 +281,6 @@ def ntu_pose_extraction(vid, skip_postproc=False):
     anno['original_shape'] = (1080, 1920)
     anno['total_frames'] = keypoints.shape[1]
     anno['label'] = int(osp.basename(vid).split('A')[1][:3]) - 1
-    tmp_dir.cleanup()
 
     return anno
 
@@ -291,6 +292,11 @@ def parse_args():
     parser.add_argument('output', type=str, help='output pickle name')
     parser.add_argument('--device', type=str, default='cuda:0')
     parser.add_argument('--skip-postproc', action='store_true')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=16,
+        help='number of frames of each batch of detection and pose')
     args = parser.parse_args()
     return args
 
@@ -301,5 +307,6 @@ if __name__ == '__main__':
     args.video = global_args.video
     args.output = global_args.output
     args.skip_postproc = global_args.skip_postproc
+    args.batch_size = global_args.batch_size
     anno = ntu_pose_extraction(args.video, args.skip_postproc)
     mmengine.dump(anno, args.output)
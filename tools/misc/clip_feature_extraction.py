@@ -3,11 +3,13 @@ import argparse
 import os
 import os.path as osp
 import config
-import torch
-from mmengine import dump, list_from_file, load
+from mmengine import list_from_file
 from mmengine.config import Config, DictAction
+from mmengine.dist import is_main_process
 from mmengine.runner import Runner
 
+from mmaction.evaluation import FeatureWriter
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -221,94 +223,64 @@ def merge_args(cfg, args):
             preprocessor_cfg.type = 'LongVideoDataPreprocessor'
             preprocessor_cfg['num_frames'] = clip_len
 
-    # -------------------- Dump predictions --------------------
-    args.dump = osp.join(args.output_prefix, 'total_feats.pkl')
-    dump_metric = dict(type='DumpResults', out_file_path=args.dump)
-    cfg.test_evaluator = [dump_metric]
+    # -------------------- Write predictions --------------------
+    # each rank writes the file of a video as soon as it is processed
+    if cfg.test_dataloader.dataset.type == 'RawframeDataset':
+        name_key, data_prefix = 'frame_dir', args.video_root.get('img')
+    else:
+        name_key, data_prefix = 'filename', args.video_root.get('video')
+    for transform in test_pipeline:
+        if transform.type == 'PackActionInputs':
+            meta_keys = transform.get(
+                'meta_keys', ('img_shape', 'img_key', 'video_id', 'timestamp'))
+            # ``sample_idx`` tells the samples padded by the sampler
+            transform['meta_keys'] = tuple(meta_keys) + tuple(
+                key for key in (name_key, 'sample_idx')
+                if key not in meta_keys)
+    feature_writer = dict(
+        type='FeatureWriter',
+        out_dir=args.output_prefix,
+        name_key=name_key,
+        data_prefix=data_prefix)
+    cfg.test_evaluator = [feature_writer]
     cfg.work_dir = osp.join(args.output_prefix, 'work_dir')
 
     return cfg
 
 
 def filter_existing_videos(args):
-    """Filter out videos that already have extracted features."""
+    """Filter out videos that already have extracted features.
+
+    The videos recorded by ``FeatureWriter`` in previous runs are skipped,
+    as well as the ones whose feature file exists, e.g. from older runs.
+    """
     video_list = list_from_file(args.video_list)
-    video_names = [line.split(' ')[0] for line in video_list]
-    
-    # Check which videos don't have feature files yet
+    written = FeatureWriter.load_progress(args.output_prefix)
     videos_to_process = []
-    videos_with_features = []
-    
-    for i, video_name in enumerate(video_names):
+    for line in video_list:
+        video_name = line.split(' ')[0]
         output_file = osp.join(args.output_prefix, video_name + '.pkl')
-        if not osp.exists(output_file):
-            videos_to_process.append(video_list[i])
-        else:
-            videos_with_features.append(video_name)
-    
-    config.logger.info(f"Found {len(videos_with_features)} videos with existing features, {len(videos_to_process)} videos to process")
-    
-    # If no videos need processing, return early
+        if video_name not in written and not osp.exists(output_file):
+            videos_to_process.append(line)
+
+    config.logger.info(
+        f'Found {len(video_list) - len(videos_to_process)} videos with '
+        f'existing features, {len(videos_to_process)} videos to process')
     if not videos_to_process:
-        config.logger.info("All videos already have extracted features. Skipping feature extraction.")
         return False
-    
-    # Create a temporary filtered video list file if some videos need processing
+
+    # Create a temporary filtered video list file if some videos are done
     if len(videos_to_process) < len(video_list):
         temp_video_list = args.video_list + '.temp'
         with open(temp_video_list, 'w') as f:
             f.write('\n'.join(videos_to_process))
         args.video_list = temp_video_list
-        config.logger.info(f"Created temporary video list with {len(videos_to_process)} videos to process")
-    
-    return True
-
-
-def split_feats(args):
-    config.logger.info("Splitting features and saving individual files.")
-    total_feats = load(args.dump)
-    
-    # If you're dumping prediction scores instead of features
-    if args.dump_score:
-        total_feats = [sample['pred_scores']['item'] for sample in total_feats]
+        config.logger.info('Created temporary video list with '
+                           f'{len(videos_to_process)} videos to process')
 
-    video_list = list_from_file(args.video_list)
-    video_list = [line.split(' ')[0] for line in video_list]
+    return True
 
-    # Track processing statistics
-    processed_count = 0
-    skipped_count = 0
 
-    # Process each video sequentially
-    for video_name, feature in zip(video_list, total_feats):
-        output_file = osp.join(args.output_prefix, video_name + '.pkl')
-        
-        # Check if the feature file already exists
-        if osp.exists(output_file):
-            config.logger.debug(f"Feature file already exists for {video_name}, skipping.")
-            skipped_count += 1
-            continue
-        
-        config.logger.debug(f"Saving features for video: {video_name}")
-        
-        # Save the features for the current video
-        dump(feature, output_file)
-        processed_count += 1
-        
-        # Explicitly clear GPU memory after processing each video
-        torch.cuda.empty_cache()  # This ensures the memory is freed after each video
-
-    # After processing all videos, remove the total features dump file
-    if osp.exists(args.dump):
-        os.remove(args.dump)
-    
-    # Clean up temporary video list file if it was created
-    if args.video_list.endswith('.temp'):
-        os.remove(args.video_list)
-        config.logger.info("Cleaned up temporary video list file")
-    
-    config.logger.info(f"Feature splitting completed. Processed: {processed_count}, Skipped: {skipped_count}")
-    
 def main():
     args = parse_args()
 
@@ -330,10 +302,12 @@ def main():
     # build the runner from config
     runner = Runner.from_cfg(cfg)
 
-    # start testing
+    # start testing, the features are written while testing
     runner.test()
 
-    split_feats(args)
+    # Clean up temporary video list file if it was created
+    if args.video_list.endswith('.temp') and is_main_process():
+        os.remove(args.video_list)
 
 
 if __name__ == '__main__':